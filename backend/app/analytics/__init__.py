@@ -0,0 +1,9 @@
+# backend/app/analytics/__init__.py
+"""
+Analytics de ventas sobre tablas de rollups (ver rollups.py), alimentadas
+por el outbox de órdenes (outbox.py) y por el backfill histórico (backfill.py).
+"""
+from .outbox import append_order_created, consume_batch
+from .rollups import fold_orders, rebuild_rollups
+
+__all__ = ["append_order_created", "consume_batch", "fold_orders", "rebuild_rollups"]
@@ -0,0 +1,101 @@
+# backend/app/analytics/backfill.py
+"""
+Backfill de los rollups desde el historial de órdenes.
+
+Parte el rango en tramos de --chunk-days días y los recalcula en paralelo
+(--workers hilos, cada uno con su sesión y su commit). Sólo toca la parte
+"backfill" de los rollups (órdenes sin evento en el outbox), así que se
+puede correr con la API y el worker del outbox andando.
+
+    python -m backend.app.analytics.backfill --start 2024-01-01 --end 2024-12-31 --workers 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from sqlalchemy import Date, func, select
+from sqlalchemy.exc import OperationalError
+
+from ..db import SessionLocal
+from ..models.models import Order
+from .rollups import rebuild_rollups
+
+MAX_RETRIES = 5
+
+
+def day_chunks(start: date, end: date, chunk_days: int) -> list[tuple[date, date]]:
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def order_date_range() -> tuple[date, date] | None:
+    db = SessionLocal()
+    try:
+        day = func.date(Order.created_at, type_=Date)
+        first, last = db.execute(select(func.min(day), func.max(day))).one()
+    finally:
+        db.close()
+    return (first, last) if first else None
+
+
+def backfill_chunk(start: date, end: date) -> int:
+    """Recalcula un tramo en su propia transacción. Reintenta si la base está ocupada."""
+    for attempt in range(MAX_RETRIES):
+        db = SessionLocal()
+        try:
+            days = rebuild_rollups(db, start, end)
+            db.commit()
+            return days
+        except OperationalError:
+            # SQLite serializa escritores: "database is locked" si otro tramo tarda
+            db.rollback()
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(0.2 * 2 ** attempt)
+        finally:
+            db.close()
+    return 0
+
+
+def backfill(start: date, end: date, chunk_days: int = 7, workers: int = 4, log=print) -> int:
+    """Backfill de [start, end]. Devuelve la cantidad de días con ventas."""
+    chunks = day_chunks(start, end, chunk_days)
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(backfill_chunk, s, e): (s, e) for s, e in chunks}
+        for i, fut in enumerate(as_completed(futures), 1):
+            s, e = futures[fut]
+            days = fut.result()
+            total += days
+            log(f"[{i}/{len(chunks)}] {s} → {e}: {days} días con ventas")
+    return total
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill de rollups de ventas desde el historial")
+    parser.add_argument("--start", type=date.fromisoformat, help="primer día (por defecto, la primera orden)")
+    parser.add_argument("--end", type=date.fromisoformat, help="último día (por defecto, la última orden)")
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    start, end = args.start, args.end
+    if start is None or end is None:
+        rng = order_date_range()
+        if rng is None:
+            print("No hay órdenes para procesar.")
+            return
+        start, end = start or rng[0], end or rng[1]
+
+    t0 = time.perf_counter()
+    days = backfill(start, end, chunk_days=args.chunk_days, workers=args.workers)
+    print(f"✅ Backfill {start} → {end}: {days} días en {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,556 @@
+# backend/app/analytics/columnar.py
+"""
+Motor columnar en memoria para los dashboards locales (vendedor / comprador).
+
+Cada renglón vendido es una fila en arrays de NumPy:
+- seller, buyer, product, category, order: índices densos (int32) a
+  diccionarios del motor
+- day (días desde 1970), month (meses desde 1970), qty, amount (qty × precio)
+- f_order / f_seller / f_seller_cat: True en el primer renglón de la orden
+  (en total / para ese vendedor / para vendedor+categoría), así los pedidos
+  se cuentan con un sum o un bincount, sin np.unique.
+
+La "base" está ordenada por vendedor: el dashboard de un vendedor es un
+slice contiguo (searchsorted) y para compradores hay una permutación
+ordenada por comprador. Las órdenes nuevas entran por el outbox (desde el
+último id visto) a una "cola" chica que se filtra con una máscara; cuando la
+cola supera el 10 % de la base se funde con ella y se reordena.
+
+Con eso, KPIs, series y tops de un vendedor con 100k+ renglones son unos
+pocos bincount/argpartition sobre el slice (milisegundos, ver
+benchmarks/bench_local_dashboard.py).
+
+Los requests sólo leen un _Snapshot inmutable (arrays + copias congeladas de
+los diccionarios); quien refresca arma uno nuevo y lo publica reemplazando
+la referencia. La carga completa y el catch-up del outbox los hace el worker
+SalesEngineRefresher (la carga arranca con la app, no en el primer request);
+sin workers, el request que encuentra el snapshot vencido se pone al día sin
+hacer esperar a los demás.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session
+
+from ..db import ReadSessionLocal
+from ..models.models import Order, OrderEvent, OrderItem, Product, ProductComment, User
+from .outbox import ORDER_CREATED, OUTBOX_GAP_WAIT
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "2"))
+COMPACT_RATIO = 0.1
+COMPACT_MIN_ROWS = 50_000
+LOAD_CHUNK = 50_000
+TOP_N = 5
+RECENT_N = 5
+MONTHS = 12
+DELTA_DAYS = 30
+
+_EPOCH = date(1970, 1, 1).toordinal()
+_RAW = {
+    "seller": np.int32, "buyer": np.int32, "product": np.int32, "category": np.int32,
+    "order": np.int32, "day": np.int32, "month": np.int32, "qty": np.int32, "amount": np.int64,
+}
+_FLAGS = ("f_order", "f_seller", "f_seller_cat")
+
+
+class _Lookup:
+    """Diccionario congelado: valor -> índice denso y la tupla inversa."""
+
+    def __init__(self, values: tuple, idx: dict):
+        self.values = values
+        self._idx = idx
+
+    def get(self, value) -> int:
+        return self._idx.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class _Dictionary:
+    """valor -> índice denso (lo usa sólo quien refresca; los requests ven freeze())."""
+
+    def __init__(self):
+        self.values: list = []
+        self._idx: dict = {}
+        self._frozen = _Lookup((), {})
+
+    def add(self, value) -> int:
+        idx = self._idx.get(value)
+        if idx is None:
+            idx = self._idx[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def freeze(self) -> _Lookup:
+        """Copia para un snapshot; si no hubo altas, la misma de antes."""
+        if len(self._frozen) != len(self.values):
+            self._frozen = _Lookup(tuple(self.values), dict(self._idx))
+        return self._frozen
+
+
+class _Snapshot:
+    """Estado inmutable que leen los requests (se reemplaza entero al refrescar)."""
+
+    def __init__(self, base: dict, tail: dict, sellers: _Lookup, buyers: _Lookup,
+                 products: _Lookup, categories: _Lookup, order_ids: tuple, product_names: tuple):
+        self.base = base
+        self.tail = tail
+        self.sellers = sellers
+        self.buyers = buyers
+        self.products = products
+        self.categories = categories
+        self.order_ids = order_ids
+        self.product_names = product_names
+        # base va ordenada por vendedor: por comprador hay que reordenar por orden
+        # (los índices de orden crecen con el tiempo) para que quede cronológico
+        self.buyer_perm = np.lexsort((base["order"], base["buyer"]))
+        self.buyer_sorted = base["buyer"][self.buyer_perm]
+
+
+def _empty() -> dict:
+    cols = {k: np.empty(0, dtype) for k, dtype in _RAW.items()}
+    cols.update({k: np.empty(0, bool) for k in _FLAGS})
+    return cols
+
+
+def _concat(parts: list[dict]) -> dict:
+    parts = [p for p in parts if len(p["seller"])]
+    if not parts:
+        return _empty()
+    if len(parts) == 1:
+        return parts[0]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _first_of(*cols: np.ndarray) -> np.ndarray:
+    """True en la primera fila de cada combinación de valores de cols."""
+    n = len(cols[0])
+    flag = np.zeros(n, bool)
+    if n == 0:
+        return flag
+    perm = np.lexsort(cols[::-1])  # estable: dentro de cada grupo queda la fila más vieja primero
+    new = np.ones(n, bool)
+    new[1:] = np.logical_or.reduce([np.diff(c[perm]) != 0 for c in cols])
+    flag[perm[new]] = True
+    return flag
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Índices de los k mayores valores (> 0), de mayor a menor."""
+    nz = np.flatnonzero(values)
+    if nz.size > k:
+        nz = nz[np.argpartition(values[nz], -k)[-k:]]
+    return nz[np.argsort(-values[nz], kind="stable")]
+
+
+def _period(month: int) -> str:
+    return f"{1970 + month // 12}-{month % 12 + 1:02d}"
+
+
+def _delta_label(cur: float, prev: float) -> str | None:
+    if not prev:
+        return None
+    return f"{(cur - prev) / prev * 100:+.0f}% vs {DELTA_DAYS} días anteriores"
+
+
+def _status_code(status: str | None) -> str:
+    # "En camino" -> "EN_CAMINO", como lo espera el front
+    return (status or "").upper().replace(" ", "_")
+
+
+class ColumnarSales:
+    def __init__(self, refresh_seconds: float = ANALYTICS_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._snap: _Snapshot | None = None
+        self._checked = 0.0
+        self._last_event_id = 0
+        # True si un worker lo mantiene al día: los requests no refrescan
+        self.background = False
+        # estado del que refresca (bajo _lock); los requests leen sólo el snapshot
+        self._sellers = _Dictionary()
+        self._buyers = _Dictionary()
+        self._products = _Dictionary()
+        self._categories = _Dictionary()
+        self._order_ids: list[str] = []
+        self._product_names: list[str] = []
+        self._product_seller: dict[str, str | None] = {}
+
+    # ---------- carga ----------
+    def _columns(self, rows) -> dict:
+        """
+        Filas (order_id, buyer_id, created_at, product_id, product_name,
+        category, qty, unit_price, seller_id) -> arrays sin flags. Los
+        renglones de una orden tienen que venir juntos.
+        """
+        n = len(rows)
+        out = {k: np.empty(n, dtype) for k, dtype in _RAW.items()}
+        seller, buyer, product, category = out["seller"], out["buyer"], out["product"], out["category"]
+        order, day, month, qty, amount = out["order"], out["day"], out["month"], out["qty"], out["amount"]
+        last_order = self._order_ids[-1] if self._order_ids else None
+        for i, (order_id, buyer_id, created_at, product_id, name, cat, q, price, seller_id) in enumerate(rows):
+            if order_id != last_order:
+                self._order_ids.append(order_id)
+                last_order = order_id
+            p = self._products.add(product_id or "")
+            if p == len(self._product_names):
+                self._product_names.append(name or "")
+            seller[i] = self._sellers.add(seller_id)
+            buyer[i] = self._buyers.add(buyer_id)
+            product[i] = p
+            category[i] = self._categories.add(cat or "")
+            order[i] = len(self._order_ids) - 1
+            day[i] = created_at.toordinal() - _EPOCH
+            month[i] = (created_at.year - 1970) * 12 + created_at.month - 1
+            qty[i] = q
+            amount[i] = q * price
+        return out
+
+    @staticmethod
+    def _with_flags(cols: dict) -> dict:
+        order = cols["order"]
+        f_order = np.ones(len(order), bool)
+        f_order[1:] = order[1:] != order[:-1]
+        cols["f_order"] = f_order
+        cols["f_seller"] = _first_of(order, cols["seller"])
+        cols["f_seller_cat"] = _first_of(order, cols["seller"], cols["category"])
+        return cols
+
+    @staticmethod
+    def _sorted_by_seller(cols: dict) -> dict:
+        perm = np.argsort(cols["seller"], kind="stable")  # estable: sigue en orden cronológico
+        return {k: v[perm] for k, v in cols.items()}
+
+    def _publish(self, base: dict, tail: dict) -> None:
+        prev = self._snap
+        order_ids = tuple(self._order_ids) if prev is None or len(prev.order_ids) != len(self._order_ids) \
+            else prev.order_ids
+        names = tuple(self._product_names) if prev is None or len(prev.product_names) != len(self._product_names) \
+            else prev.product_names
+        self._snap = _Snapshot(base, tail, self._sellers.freeze(), self._buyers.freeze(),
+                               self._products.freeze(), self._categories.freeze(), order_ids, names)
+
+    def _full_load(self, db: Session) -> None:
+        last_id = db.execute(select(func.max(OrderEvent.id))).scalar() or 0
+        self._product_seller = dict(db.execute(select(Product.id, Product.seller_id)).all())
+        # las órdenes con evento posterior a last_id entran después por el outbox
+        newer = exists().where(OrderEvent.order_id == Order.id, OrderEvent.id > last_id)
+        stmt = (
+            select(
+                OrderItem.order_id, Order.user_id, Order.created_at, OrderItem.product_id,
+                OrderItem.product_name, OrderItem.category, OrderItem.quantity,
+                OrderItem.unit_price, Product.seller_id,
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .outerjoin(Product, Product.id == OrderItem.product_id)
+            .where(~newer)
+            .order_by(Order.created_at, OrderItem.order_id)
+            .execution_options(yield_per=LOAD_CHUNK)
+        )
+        chunks = [self._columns(part) for part in db.execute(stmt).partitions()]
+        base = self._with_flags(_concat(chunks)) if chunks else _empty()
+        self._publish(self._sorted_by_seller(base), _empty())
+        self._last_event_id = last_id
+
+    def _catch_up(self, db: Session) -> None:
+        now = datetime.utcnow()
+        events = db.execute(
+            select(OrderEvent.id, OrderEvent.order_id, OrderEvent.event_type,
+                   OrderEvent.created_at, OrderEvent.payload)
+            .where(OrderEvent.id > self._last_event_id)
+            .order_by(OrderEvent.id)
+        ).all()
+        last = self._last_event_id
+        orders = []
+        for event_id, order_id, event_type, created_at, payload in events:
+            if event_id != last + 1 and created_at > now - OUTBOX_GAP_WAIT:
+                break  # mismo criterio que el worker de rollups (ver outbox.py)
+            last = event_id
+            if event_type == ORDER_CREATED:
+                orders.append((order_id, json.loads(payload)))
+        if last == self._last_event_id:
+            return
+
+        missing = {
+            it.get("product_id") for _, data in orders for it in data["items"]
+            if it.get("product_id") not in self._product_seller
+        }
+        if missing:
+            found = dict(db.execute(
+                select(Product.id, Product.seller_id).where(Product.id.in_(missing))
+            ).all())
+            self._product_seller.update({pid: found.get(pid) for pid in missing})
+
+        rows = []
+        for order_id, data in orders:
+            created_at = datetime.fromisoformat(data["created_at"])
+            for it in data["items"]:
+                rows.append((
+                    order_id, data.get("user_id"), created_at, it.get("product_id"),
+                    it.get("product_name"), it.get("category"), it["quantity"], it["unit_price"],
+                    self._product_seller.get(it.get("product_id")),
+                ))
+        snap = self._snap
+        new = self._with_flags(self._columns(rows)) if rows else _empty()
+        tail = _concat([snap.tail, new])
+        base = snap.base
+        if len(tail["seller"]) > max(COMPACT_MIN_ROWS, COMPACT_RATIO * len(base["seller"])):
+            base, tail = self._sorted_by_seller(_concat([base, tail])), _empty()
+        self._publish(base, tail)
+        self._last_event_id = last
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._checked >= self.refresh_seconds
+
+    def _refresh_locked(self) -> None:
+        db = ReadSessionLocal()   # carga pesada: réplica si hay
+        try:
+            if self._snap is None:
+                self._full_load(db)
+            else:
+                self._catch_up(db)
+        finally:
+            db.close()
+        self._checked = time.monotonic()
+
+    def refresh(self, force: bool = False) -> _Snapshot:
+        """Carga completa la primera vez; después sólo lee el outbox. Devuelve el snapshot actual."""
+        if not force and self._snap is not None and not self._stale():
+            return self._snap
+        with self._lock:
+            if force or self._snap is None or self._stale():
+                self._refresh_locked()
+        return self._snap
+
+    def snapshot(self) -> _Snapshot:
+        """Snapshot para un request: nunca espera un catch-up de otro hilo."""
+        snap = self._snap
+        if snap is None:
+            return self.refresh()  # nadie lo precalentó (o la carga del worker está en curso)
+        if self.background or not self._stale():
+            return snap
+        if self._lock.acquire(blocking=False):
+            try:
+                if self._stale():
+                    self._refresh_locked()
+            finally:
+                self._lock.release()
+        return self._snap
+
+    # ---------- consultas ----------
+    @staticmethod
+    def _select(snap: _Snapshot, col: str, value: int) -> dict:
+        """Filas de un vendedor o comprador, en orden cronológico."""
+        base, tail = snap.base, snap.tail
+        bounds = np.array([value, value + 1], np.int32)  # mismo dtype: si no, numpy castea la columna entera
+        if col == "seller":
+            lo, hi = np.searchsorted(base["seller"], bounds)
+            sel = {k: v[lo:hi] for k, v in base.items()}
+        else:
+            lo, hi = np.searchsorted(snap.buyer_sorted, bounds)
+            idx = snap.buyer_perm[lo:hi]
+            sel = {k: v[idx] for k, v in base.items()}
+        if len(tail[col]):
+            mask = tail[col] == value
+            if mask.any():
+                sel = {k: np.concatenate((v, tail[k][mask])) for k, v in sel.items()}
+        return sel
+
+    @staticmethod
+    def _deltas(sel: dict, flag: str, today: date) -> tuple[str | None, str | None]:
+        t = today.toordinal() - _EPOCH
+        cur = sel["day"] > t - DELTA_DAYS
+        prev = (sel["day"] > t - 2 * DELTA_DAYS) & ~cur
+        return (
+            _delta_label(sel["amount"][cur].sum(), sel["amount"][prev].sum()),
+            _delta_label(np.count_nonzero(sel[flag] & cur), np.count_nonzero(sel[flag] & prev)),
+        )
+
+    @staticmethod
+    def _monthly(sel: dict, today: date, value_key: str) -> list[dict]:
+        last = (today.year - 1970) * 12 + today.month - 1
+        first = last - MONTHS + 1
+        mask = sel["month"] >= first
+        totals = np.bincount(sel["month"][mask] - first, weights=sel["amount"][mask], minlength=MONTHS)
+        return [{"period": _period(first + i), value_key: int(v)} for i, v in enumerate(totals[:MONTHS])]
+
+    @staticmethod
+    def _recent(db: Session, snap: _Snapshot, sel: dict, flag: str) -> list[dict]:
+        firsts = np.flatnonzero(sel[flag])[-RECENT_N:][::-1]
+        recent = []
+        for i in firsts:
+            lines = sel["order"] == sel["order"][i]
+            n_lines = int(np.count_nonzero(lines))
+            name = snap.product_names[sel["product"][i]]
+            recent.append({
+                "id": snap.order_ids[sel["order"][i]],
+                "product_name": name if n_lines == 1 else f"{name} (+{n_lines - 1})",
+                "total": int(sel["amount"][lines].sum()),
+            })
+        if recent:
+            info = {
+                oid: (status, user_name) for oid, status, user_name in db.execute(
+                    select(Order.id, Order.status, Order.user_name)
+                    .where(Order.id.in_([r["id"] for r in recent]))
+                )
+            }
+            for r in recent:
+                status, user_name = info.get(r["id"], (None, None))
+                r.update(code=r["id"][:8], status=_status_code(status),
+                         status_label=status or "Estado no disponible", client_name=user_name or "-")
+        return recent
+
+    def seller_dashboard(self, db: Session, seller_id: str, today: date | None = None) -> dict:
+        """{kpis, series, lists} del vendedor (ver 11a_Dashboard_Local)."""
+        snap = self.snapshot()
+        today = today or date.today()
+        s = snap.sellers.get(seller_id)
+        sel = self._select(snap, "seller", s) if s >= 0 else _empty()
+
+        rating = db.execute(
+            select(func.avg(Product.rating)).where(Product.seller_id == seller_id, Product.rating > 0)
+        ).scalar()
+        sales_delta, orders_delta = self._deltas(sel, "f_seller", today)
+        total = int(sel["amount"].sum())
+        orders = int(np.count_nonzero(sel["f_seller"]))
+
+        n_cat = len(snap.categories)
+        by_cat = np.bincount(sel["category"][sel["f_seller_cat"]], minlength=n_cat)
+        orders_by_category = [
+            {"category": snap.categories.values[c] or "Sin categoría", "orders": int(by_cat[c])}
+            for c in _top_k(by_cat, n_cat)
+        ]
+
+        n_prod = len(snap.products)
+        units = np.bincount(sel["product"], weights=sel["qty"], minlength=n_prod)
+        sales = np.bincount(sel["product"], weights=sel["amount"], minlength=n_prod)
+        top = _top_k(units, TOP_N)
+        top_ids = [snap.products.values[p] for p in top]
+        ratings = dict(db.execute(
+            select(Product.id, Product.rating).where(Product.id.in_(top_ids))
+        ).all()) if top_ids else {}
+        top_products = [
+            {
+                "product_id": pid or None,
+                "name": snap.product_names[p],
+                "price": round(sales[p] / units[p]),
+                "sold": int(units[p]),
+                "sales": int(sales[p]),
+                "rating": float(ratings.get(pid) or 0),
+            }
+            for p, pid in zip(top, top_ids)
+        ]
+
+        return {
+            "kpis": {
+                "total_sales": total,
+                "orders_count": orders,
+                "units": int(sel["qty"].sum()),
+                "avg_ticket": round(total / orders) if orders else 0,
+                "rating": float(rating or 0),
+                "returns": 0,  # todavía no hay devoluciones en el modelo
+                "sales_delta_label": sales_delta,
+                "orders_delta_label": orders_delta,
+                "rating_delta_label": None,
+                "returns_delta_label": None,
+            },
+            "series": {
+                "monthly_sales": self._monthly(sel, today, "total"),
+                "orders_by_category": orders_by_category,
+            },
+            "lists": {
+                "top_products": top_products,
+                "recent_orders": self._recent(db, snap, sel, "f_seller"),
+            },
+        }
+
+    def buyer_dashboard(self, db: Session, user_id: str, today: date | None = None) -> dict:
+        """{kpis, series, lists} del comprador (ver 11a_Dashboard_Local)."""
+        snap = self.snapshot()
+        today = today or date.today()
+        b = snap.buyers.get(user_id)
+        sel = self._select(snap, "buyer", b) if b >= 0 else _empty()
+
+        avg_rating = db.execute(
+            select(func.avg(ProductComment.rating)).where(ProductComment.user_id == user_id)
+        ).scalar()
+        spent_delta, orders_delta = self._deltas(sel, "f_order", today)
+
+        n_sellers = len(snap.sellers)
+        spent = np.bincount(sel["seller"], weights=sel["amount"], minlength=n_sellers)
+        orders = np.bincount(sel["seller"][sel["f_seller"]], minlength=n_sellers)
+        top = [s for s in _top_k(spent, TOP_N) if snap.sellers.values[s]]
+        seller_ids = [snap.sellers.values[s] for s in top]
+        names, ratings = {}, {}
+        if seller_ids:
+            names = {
+                uid: f"{nombre} {apellido}".strip() for uid, nombre, apellido in db.execute(
+                    select(User.id, User.nombre, User.apellido).where(User.id.in_(seller_ids))
+                )
+            }
+            ratings = dict(db.execute(
+                select(Product.seller_id, func.avg(Product.rating))
+                .where(Product.seller_id.in_(seller_ids), Product.rating > 0)
+                .group_by(Product.seller_id)
+            ).all())
+        top_brands = [
+            {
+                "seller_id": uid,
+                "name": names.get(uid, "-"),
+                "orders": int(orders[s]),
+                "spent": int(spent[s]),
+                "rating": float(ratings.get(uid) or 0),
+            }
+            for s, uid in zip(top, seller_ids)
+        ]
+
+        ratings_by_product = [
+            {"product_name": name, "rating": rating}
+            for name, rating in db.execute(
+                select(Product.name, ProductComment.rating)
+                .join(Product, Product.id == ProductComment.product_id)
+                .where(ProductComment.user_id == user_id)
+                .order_by(ProductComment.created_at.desc())
+                .limit(10)
+            )
+        ]
+
+        return {
+            "kpis": {
+                "total_spent": int(sel["amount"].sum()),
+                "orders_count": int(np.count_nonzero(sel["f_order"])),
+                "avg_rating": float(avg_rating or 0),
+                "fav_products_count": int(np.unique(sel["product"]).size),
+                "spent_delta_label": spent_delta,
+                "orders_delta_label": orders_delta,
+                "rating_delta_label": None,
+                "fav_delta_label": None,
+            },
+            "series": {
+                "monthly_purchases": self._monthly(sel, today, "amount"),
+                "ratings_by_product": ratings_by_product,
+            },
+            "lists": {
+                "top_brands": top_brands,
+                "recent_purchases": self._recent(db, snap, sel, "f_order"),
+            },
+        }
+
+
+_engine: ColumnarSales | None = None
+_engine_lock = threading.Lock()
+
+
+def get_sales_engine() -> ColumnarSales:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ColumnarSales()
+    return _engine
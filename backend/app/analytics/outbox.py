@@ -0,0 +1,123 @@
+# backend/app/analytics/outbox.py
+"""
+Outbox de órdenes para mantener los rollups fuera del checkout.
+
+El checkout sólo agrega una fila a order_outbox dentro de su propia
+transacción (append_order_created). Un consumidor (workers/rollups.py)
+lee los eventos en orden de id, los suma a los rollups con fold_orders()
+y avanza su high-water mark en outbox_offsets en el MISMO commit: si el
+proceso se cae a mitad de lote no se pierde ni se duplica nada, y al
+volver sigue desde el último id confirmado. El offset se mueve con un
+UPDATE condicional, así que dos réplicas consumiendo a la vez no suman
+dos veces el mismo lote (la que pierde hace rollback).
+
+Huecos de id: un id autoincremental puede confirmarse después de uno
+mayor (dos checkouts concurrentes en MySQL/PostgreSQL) o no confirmarse
+nunca (rollback). Si aparece un hueco, el consumidor frena antes de él
+mientras el evento siguiente sea más nuevo que OUTBOX_GAP_WAIT_SECONDS;
+pasado ese tiempo el hueco se da por perdido (rollback) y se saltea.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.models import OrderEvent, OutboxOffset
+from .rollups import fold_orders
+
+ORDER_CREATED = "order_created"
+OUTBOX_GAP_WAIT = timedelta(seconds=float(os.getenv("OUTBOX_GAP_WAIT_SECONDS", "30")))
+
+
+def append_order_created(db: Session, order_id: str, created_at: datetime, items: list[dict],
+                         user_id: str | None = None) -> None:
+    """Agrega el evento de la orden. No hace flush ni commit (va en la transacción del checkout)."""
+    payload = {
+        "created_at": created_at.isoformat(),
+        "user_id": user_id,
+        "items": [
+            {k: it.get(k) for k in ("product_id", "product_name", "category", "seller", "quantity", "unit_price")}
+            for it in items
+        ],
+    }
+    db.execute(insert(OrderEvent).values(
+        order_id=order_id,
+        event_type=ORDER_CREATED,
+        created_at=created_at,
+        payload=json.dumps(payload, separators=(",", ":")),
+    ))
+
+
+def get_offset(db: Session, consumer: str) -> int:
+    return db.execute(
+        select(OutboxOffset.last_event_id).where(OutboxOffset.consumer == consumer)
+    ).scalar() or 0
+
+
+def _advance_offset(db: Session, consumer: str, start: int, last: int, now: datetime) -> bool:
+    """
+    Mueve el offset de start a last sólo si nadie lo movió antes (otra
+    réplica consumiendo lo mismo). False si perdimos la carrera.
+    """
+    res = db.execute(
+        update(OutboxOffset)
+        .where(OutboxOffset.consumer == consumer, OutboxOffset.last_event_id == start)
+        .values(last_event_id=last, updated_at=now)
+    )
+    if res.rowcount == 1:
+        return True
+    if start != 0:
+        return False
+    try:
+        with db.begin_nested():
+            db.add(OutboxOffset(consumer=consumer, last_event_id=last, updated_at=now))
+        return True
+    except IntegrityError:
+        return False
+
+
+def consume_batch(db: Session, consumer: str, batch_size: int = 1000,
+                  now: datetime | None = None) -> tuple[int, int]:
+    """
+    Procesa hasta batch_size eventos posteriores al high-water mark del
+    consumidor y hace commit. Devuelve (eventos procesados, nuevo offset).
+    """
+    now = now or datetime.utcnow()
+    start = last = get_offset(db, consumer)
+    rows = db.execute(
+        select(OrderEvent.id, OrderEvent.event_type, OrderEvent.created_at, OrderEvent.payload)
+        .where(OrderEvent.id > start)
+        .order_by(OrderEvent.id)
+        .limit(batch_size)
+    ).all()
+
+    processed = 0
+    orders = []
+    for event_id, event_type, created_at, payload in rows:
+        if event_id != last + 1 and created_at > now - OUTBOX_GAP_WAIT:
+            break  # hueco reciente: puede ser una transacción todavía abierta
+        last = event_id
+        processed += 1
+        if event_type == ORDER_CREATED:
+            data = json.loads(payload)
+            orders.append((datetime.fromisoformat(data["created_at"]), data["items"], data.get("user_id")))
+
+    if last == start:
+        db.rollback()
+        return 0, last
+    if not _advance_offset(db, consumer, start, last, now):
+        db.rollback()
+        return 0, start
+    fold_orders(db, orders)
+    db.commit()
+    return processed, last
+
+
+def pending_events(db: Session, consumer: str) -> int:
+    """Eventos todavía no procesados por el consumidor (lag)."""
+    return db.execute(
+        select(func.count()).select_from(OrderEvent).where(OrderEvent.id > get_offset(db, consumer))
+    ).scalar()
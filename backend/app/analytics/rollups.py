@@ -0,0 +1,179 @@
+# backend/app/analytics/rollups.py
+"""
+Rollups diarios de ventas.
+
+- sales_rollup_daily: día × origen × vendedor × producto × categoría -> unidades, GMV, órdenes
+- sales_rollup_day_totals: día × origen -> órdenes, unidades, GMV
+
+Hay dos orígenes que nunca se pisan:
+- "stream": fold_orders() suma las órdenes que llegan por el outbox
+  (ver outbox.py y workers/rollups.py), de forma incremental.
+- "backfill": rebuild_rollups() recalcula desde orders/order_items las
+  órdenes históricas, las que no tienen evento en el outbox.
+Los dashboards suman ambos y leen sólo estas tablas, así que cuestan
+O(días) y no O(órdenes). Al lado de cada día se guardan también sketches
+(compradores distintos, top-K) con el mismo origen; ver sketches.py.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import Date, delete, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from ..models.models import Order, OrderEvent, OrderItem, SalesDayTotal, SalesRollup, SalesSketch
+from .sketches import DaySketchInput, delete_sketches, fold_sketches
+from .upsert import upsert_add
+
+_rollup = SalesRollup.__table__
+_totals = SalesDayTotal.__table__
+
+STREAM = "stream"
+BACKFILL = "backfill"
+
+
+def fold_orders(db: Session, orders: list[tuple[datetime, list[dict], str | None]],
+                source: str = STREAM) -> None:
+    """
+    Suma un lote de órdenes a los rollups (dos upserts en total) y a los
+    sketches del día. Cada orden es (created_at, items, user_id) y los items
+    son los renglones tal como se insertan en order_items (product_id,
+    product_name, category, seller, quantity, unit_price).
+    """
+    lines: dict[tuple, dict] = {}
+    days: dict[date, dict] = {}
+    sketch_input: dict[date, DaySketchInput] = {}
+    for created_at, items, user_id in orders:
+        day = created_at.date()
+        day_sketch = sketch_input.get(day) or sketch_input.setdefault(day, DaySketchInput())
+        if user_id:
+            day_sketch.buyers.add(user_id)
+        keys = set()
+        units = gmv = 0
+        for it in items:
+            key = (day, it.get("seller") or "", it.get("product_id") or "", it.get("category") or "")
+            row = lines.get(key)
+            if row is None:
+                row = lines[key] = {
+                    "day": day, "source": source, "seller": key[1], "product_id": key[2],
+                    "category": key[3], "product_name": it.get("product_name") or "",
+                    "units": 0, "gmv": 0, "orders": 0,
+                }
+            if key not in keys:
+                keys.add(key)
+                row["orders"] += 1
+            row["units"] += it["quantity"]
+            row["gmv"] += it["quantity"] * it["unit_price"]
+            day_sketch.add_line(key[2], key[1], it["quantity"], it["quantity"] * it["unit_price"])
+            units += it["quantity"]
+            gmv += it["quantity"] * it["unit_price"]
+        total = days.setdefault(day, {"day": day, "source": source, "orders": 0, "units": 0, "gmv": 0})
+        total["orders"] += 1
+        total["units"] += units
+        total["gmv"] += gmv
+
+    upsert_add(db, _rollup, list(lines.values()),
+               add_cols=("units", "gmv", "orders"), set_cols=("product_name",))
+    upsert_add(db, _totals, list(days.values()), add_cols=("orders", "units", "gmv"))
+    fold_sketches(db, sketch_input, source)
+
+
+def rebuild_rollups(db: Session, start: date | None = None, end: date | None = None) -> int:
+    """
+    Recalcula desde cero la parte "backfill" de los rollups para los días
+    [start, end] (o todos): las órdenes sin evento en el outbox. Borra y
+    vuelve a insertar con INSERT ... SELECT agrupado en la base; las filas
+    del stream no se tocan, así que se puede correr con el worker andando.
+    Devuelve cuántos días quedaron con datos. No hace commit.
+    """
+    order_day = func.date(Order.created_at, type_=Date)
+    historical = ~exists().where(OrderEvent.order_id == Order.id)
+
+    def in_range(col):
+        conds = []
+        if start is not None:
+            conds.append(col >= start)
+        if end is not None:
+            conds.append(col <= end)
+        return conds
+
+    db.execute(delete(_rollup).where(_rollup.c.source == BACKFILL, *in_range(_rollup.c.day)))
+    db.execute(delete(_totals).where(_totals.c.source == BACKFILL, *in_range(_totals.c.day)))
+    delete_sketches(db, BACKFILL, in_range(SalesSketch.day))
+
+    seller = func.coalesce(OrderItem.seller, "")
+    product_id = func.coalesce(OrderItem.product_id, "")
+    category = func.coalesce(OrderItem.category, "")
+    lines = (
+        select(
+            order_day,
+            literal(BACKFILL),
+            seller,
+            product_id,
+            category,
+            func.max(func.coalesce(OrderItem.product_name, "")),
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.unit_price),
+            func.count(func.distinct(OrderItem.order_id)),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(historical, *in_range(order_day))
+        .group_by(order_day, seller, product_id, category)
+    )
+    db.execute(insert(_rollup).from_select(
+        ["day", "source", "seller", "product_id", "category", "product_name", "units", "gmv", "orders"], lines,
+    ))
+
+    totals = (
+        select(
+            _rollup.c.day,
+            func.sum(_rollup.c.units).label("units"),
+            func.sum(_rollup.c.gmv).label("gmv"),
+        )
+        .where(_rollup.c.source == BACKFILL, *in_range(_rollup.c.day))
+        .group_by(_rollup.c.day)
+        .subquery()
+    )
+    orders_per_day = (
+        select(order_day.label("day"), func.count(Order.id).label("orders"))
+        .where(historical, *in_range(order_day))
+        .group_by(order_day)
+        .subquery()
+    )
+    db.execute(insert(_totals).from_select(
+        ["day", "source", "orders", "units", "gmv"],
+        select(totals.c.day, literal(BACKFILL), func.coalesce(orders_per_day.c.orders, 0), totals.c.units, totals.c.gmv)
+        .outerjoin(orders_per_day, orders_per_day.c.day == totals.c.day),
+    ))
+    _rebuild_sketches(db, order_day, historical, in_range(order_day), seller, product_id)
+    return db.execute(
+        select(func.count()).select_from(_totals)
+        .where(_totals.c.source == BACKFILL, *in_range(_totals.c.day))
+    ).scalar()
+
+
+def _rebuild_sketches(db: Session, order_day, historical, range_conds: list, seller, product_id) -> None:
+    """Sketches "backfill" de los días del rango, desde consultas agrupadas."""
+    by_day: dict[date, DaySketchInput] = {}
+
+    def day_input(day) -> DaySketchInput:
+        return by_day.get(day) or by_day.setdefault(day, DaySketchInput())
+
+    for day, user_id in db.execute(
+        select(order_day, Order.user_id).distinct()
+        .where(historical, Order.user_id.is_not(None), *range_conds)
+    ):
+        day_input(day).buyers.add(user_id)
+
+    def per_day(*cols):
+        return (
+            select(order_day, *cols)
+            .select_from(OrderItem)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(historical, *range_conds)
+            .group_by(order_day, cols[0])
+        )
+
+    for day, pid, units in db.execute(per_day(product_id, func.sum(OrderItem.quantity))):
+        day_input(day).products[pid] += units
+    for day, name, gmv in db.execute(per_day(seller, func.sum(OrderItem.quantity * OrderItem.unit_price))):
+        day_input(day).sellers[name] += gmv
+    fold_sketches(db, by_day, BACKFILL)
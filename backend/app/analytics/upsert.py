@@ -0,0 +1,57 @@
+# backend/app/analytics/upsert.py
+"""
+"INSERT o SUMAR" portable para las tablas de rollups.
+
+- SQLite / PostgreSQL: INSERT ... ON CONFLICT (pk) DO UPDATE SET c = c + excluded.c
+- MySQL / MariaDB:     INSERT ... ON DUPLICATE KEY UPDATE c = c + VALUES(c)
+- otros:               UPDATE y, si no tocó filas, INSERT (fila por fila)
+
+Todo en un solo executemany cuando el dialecto lo permite.
+"""
+from typing import Sequence
+
+from sqlalchemy import Table, and_, insert, update
+from sqlalchemy.orm import Session
+
+
+def upsert_add(
+    db: Session,
+    table: Table,
+    rows: list[dict],
+    add_cols: Sequence[str],
+    set_cols: Sequence[str] = (),
+) -> None:
+    """
+    Inserta `rows`; si la PK ya existe suma `add_cols` y pisa `set_cols`.
+    Cada fila tiene que traer todas las columnas de la PK.
+    """
+    if not rows:
+        return
+    key_cols = [c.name for c in table.primary_key.columns]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        values = {c: table.c[c] + stmt.excluded[c] for c in add_cols}
+        values.update({c: stmt.excluded[c] for c in set_cols})
+        db.execute(stmt.on_conflict_do_update(index_elements=key_cols, set_=values), rows)
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        values = {c: table.c[c] + stmt.inserted[c] for c in add_cols}
+        values.update({c: stmt.inserted[c] for c in set_cols})
+        db.execute(stmt.on_duplicate_key_update(values), rows)
+        return
+
+    for row in rows:
+        where = and_(*(table.c[k] == row[k] for k in key_cols))
+        values = {c: table.c[c] + row[c] for c in add_cols}
+        values.update({c: row[c] for c in set_cols})
+        if db.execute(update(table).where(where).values(values)).rowcount == 0:
+            db.execute(insert(table).values(row))
@@ -1,15 +1,35 @@
 # backend/app/crud/cart_crud.py
+import os
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, select, tuple_, update
 from sqlalchemy.orm import Session
 
-from ..models.models import Cart, CartItem
+from ..models.models import Cart, CartItem, Product
 from ..schemas.cart_schemas import CartOut, CartItemOut
 
+# tiempo que el stock queda reservado en un carrito sin actividad
+RESERVATION_TTL = timedelta(minutes=int(os.getenv("CART_RESERVATION_TTL_MINUTES", "30")))
 
-def _get_or_create_cart(db: Session, user_id: str) -> Cart:
+_products = Product.__table__
+_release_stmt = (
+    update(_products)
+    .where(_products.c.id == bindparam("pid"))
+    .values(stock=_products.c.stock + bindparam("units"))
+)
+
+
+def reservation_deadline(now: Optional[datetime] = None) -> datetime:
+    return (now or datetime.utcnow()) + RESERVATION_TTL
+
+
+def _get_or_create_cart(db: Session, user_id: str, commit: bool = True) -> Cart:
     """
     Devuelve el carrito del usuario.
-    Si no existe, lo crea vacío.
+    Si no existe, lo crea vacío (con commit=False sólo hace flush y el
+    commit queda a cargo de quien llama).
     """
     cart: Optional[Cart] = (
         db.query(Cart)
@@ -21,25 +41,102 @@ def _get_or_create_cart(db: Session, user_id: str) -> Cart:
     if not cart:
         cart = Cart(user_id=user_id)
         db.add(cart)
-        db.commit()
-        db.refresh(cart)
+        if commit:
+            db.commit()
+            db.refresh(cart)
+        else:
+            db.flush()
 
     return cart
 
 
+def reserve_stock(db: Session, product_id: str, qty: int) -> bool:
+    """
+    Descuenta `qty` del stock sólo si alcanza, en un único UPDATE condicional:
+        UPDATE products SET stock = stock - :q
+        WHERE id = :id AND is_active AND stock >= :q
+    El chequeo y la escritura son atómicos en la base, así que dos compras
+    concurrentes no pueden sobrevender. Devuelve False si no se pudo.
+    """
+    res = db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.is_active == True, Product.stock >= qty)
+        .values(stock=Product.stock - qty)
+        .execution_options(synchronize_session=False)
+    )
+    return res.rowcount == 1
+
+
+def release_stock(db: Session, units_by_product: dict[str, int]) -> None:
+    """Devuelve stock a los productos ({product_id: unidades}) en un executemany."""
+    params = [{"pid": pid, "units": units} for pid, units in units_by_product.items() if units]
+    if params:
+        db.execute(_release_stmt, params)
+
+
+def add_item_reserving_stock(db: Session, user_id: str, product_id: str, qty: int) -> None:
+    """
+    Reserva stock y agrega (o suma) el ítem al carrito del usuario, todo en
+    la misma transacción. No hace commit: lo hace quien llama.
+    """
+    if not reserve_stock(db, product_id, qty):
+        exists = (
+            db.query(Product.id)
+            .filter(Product.id == product_id, Product.is_active == True)
+            .first()
+        )
+        db.rollback()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        raise HTTPException(status_code=400, detail="Stock insuficiente")
+
+    product = (
+        db.query(Product.name, Product.price, Product.image_url, Product.seller_id, Product.stock)
+        .filter(Product.id == product_id)
+        .one()
+    )
+    cart = _get_or_create_cart(db, user_id, commit=False)
+    deadline = reservation_deadline()
+
+    # si el producto ya está en el carrito sumamos en la base (sin leer-modificar-escribir)
+    res = db.execute(
+        update(CartItem)
+        .where(CartItem.cart_id == cart.id, CartItem.product_id == product_id)
+        .values(qty=CartItem.qty + qty, reserved_until=deadline)
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount == 0:
+        db.add(CartItem(
+            cart_id=cart.id,
+            product_id=product_id,
+            name=product.name,
+            price=product.price,
+            qty=qty,
+            image=product.image_url or "",
+            seller=str(product.seller_id) if product.seller_id else None,
+            stock_snapshot=product.stock,
+            reserved_until=deadline,
+        ))
+    db.flush()
+
+
 def get_cart_for_user(db: Session, user_id: str) -> CartOut:
     """
     Devuelve el carrito del usuario como CartOut,
     calculando el total a partir de los items.
     """
     cart = _get_or_create_cart(db, user_id)
+    return cart_to_out(cart, cart.items)
 
+
+def cart_to_out(cart: Cart, items) -> CartOut:
+    """CartOut de un carrito y sus items (también lo usa GET /cart async)."""
     items_out = [
         CartItemOut.model_validate(item)  # usa from_attributes=True
-        for item in cart.items
+        for item in items
     ]
 
-    total = sum(i.price * i.qty for i in cart.items)
+    total = sum(i.price * i.qty for i in items)
 
     return CartOut(
         id=cart.id,
@@ -49,9 +146,13 @@ def get_cart_for_user(db: Session, user_id: str) -> CartOut:
     )
 
 
-def update_cart_item_qty(db: Session, user_id: str, item_id: str, qty: int) -> bool:
+def update_cart_item_qty(
+    db: Session, user_id: str, item_id: str, qty: int, commit: bool = True
+) -> bool:
     """
     Cambia la cantidad de un ítem del carrito del usuario.
+    La diferencia se reserva (si sube) o se devuelve al stock (si baja),
+    y la reserva se renueva.
     """
     ci: Optional[CartItem] = (
         db.query(CartItem)
@@ -63,14 +164,33 @@ def update_cart_item_qty(db: Session, user_id: str, item_id: str, qty: int) -> b
     if not ci:
         return False
 
-    ci.qty = qty
-    db.commit()
+    old_qty, product_id = ci.qty, ci.product_id
+    delta = qty - old_qty
+    if delta > 0 and not reserve_stock(db, product_id, delta):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Stock insuficiente")
+
+    # sólo si nadie la cambió (u otro request / el sweeper la borró) mientras tanto
+    res = db.execute(
+        update(CartItem)
+        .where(CartItem.id == item_id, CartItem.qty == old_qty)
+        .values(qty=qty, reserved_until=reservation_deadline())
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount != 1:
+        db.rollback()
+        return False
+
+    if delta < 0:
+        release_stock(db, {product_id: -delta})
+    if commit:
+        db.commit()
     return True
 
 
-def remove_cart_item(db: Session, user_id: str, item_id: str) -> bool:
+def remove_cart_item(db: Session, user_id: str, item_id: str, commit: bool = True) -> bool:
     """
-    Elimina un ítem del carrito del usuario.
+    Elimina un ítem del carrito del usuario y devuelve su stock reservado.
     """
     ci: Optional[CartItem] = (
         db.query(CartItem)
@@ -82,6 +202,62 @@ def remove_cart_item(db: Session, user_id: str, item_id: str) -> bool:
     if not ci:
         return False
 
-    db.delete(ci)
-    db.commit()
+    product_id, qty = ci.product_id, ci.qty
+    res = db.execute(
+        delete(CartItem)
+        .where(CartItem.id == item_id, CartItem.qty == qty)
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount != 1:
+        db.rollback()
+        return False
+
+    release_stock(db, {product_id: qty})
+    if commit:
+        db.commit()
     return True
+
+
+def release_expired_reservations(
+    db: Session, now: Optional[datetime] = None, batch_size: int = 500
+) -> tuple[int, int]:
+    """
+    Libera un lote de reservas vencidas: borra los ítems y devuelve las
+    unidades al stock (un UPDATE por producto en un solo executemany).
+    Devuelve (ítems liberados, unidades devueltas).
+    """
+    now = now or datetime.utcnow()
+    rows = db.execute(
+        select(CartItem.id, CartItem.product_id, CartItem.qty)
+        .where(CartItem.reserved_until.is_not(None), CartItem.reserved_until < now)
+        .order_by(CartItem.reserved_until)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0, 0
+
+    # entre el SELECT y el DELETE el ítem se pudo renovar o cambiar de cantidad
+    # (en SQLite no hay lock de fila): se vuelve a exigir vencido y misma qty
+    stmt = (
+        delete(CartItem)
+        .where(
+            tuple_(CartItem.id, CartItem.qty).in_([(r.id, r.qty) for r in rows]),
+            CartItem.reserved_until < now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.delete_returning:
+        # sólo se devuelve al stock lo que de verdad se borró
+        rows = db.execute(stmt.returning(CartItem.id, CartItem.product_id, CartItem.qty)).all()
+    elif db.execute(stmt).rowcount != len(rows):
+        # sin RETURNING no sabemos cuáles cambiaron: se reintenta en la próxima pasada
+        db.rollback()
+        return 0, 0
+
+    units: Counter[str] = Counter()
+    for _, product_id, qty in rows:
+        units[product_id] += qty
+    release_stock(db, units)
+    db.commit()
+    return len(rows), sum(units.values())
@@ -1,21 +1,86 @@
 ##backend/app/crud/order_crud.py
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
-from ..models.models import Cart, CartItem, Order, OrderItem, Payment
 
-def checkout(db: Session, user_id: str) -> Order:
-    cart = db.query(Cart).filter(Cart.user_id == user_id).first()
-    if not cart or not cart.items:
-        raise ValueError("Carrito vacío")
-    total = sum(ci.qty * ci.price for ci in cart.items)
+from ..analytics.outbox import append_order_created
+from ..models.models import Cart, CartItem, Category, Order, OrderItem, Product, User, _id
+
+
+def checkout(db: Session, user_id: str, user_name: str | None = None) -> tuple[Order, list[dict]]:
+    """
+    Convierte el carrito del usuario en una orden dentro de una sola transacción:
+    - 1 SELECT del carrito y 1 SELECT de sus ítems (con categoría y vendedor)
+    - 1 INSERT de la orden y 1 INSERT multi-fila de los ítems
+    - 1 DELETE de los ítems del carrito (el stock ya estaba reservado)
+    - 1 INSERT del evento en el outbox (los rollups los actualiza el worker)
+    No hace commit: lo hace quien llama. Devuelve (orden, ítems insertados).
+    """
+    cart_id = db.execute(
+        select(Cart.id)
+        .where(Cart.user_id == user_id)
+        .order_by(Cart.created_at.desc())
+        .limit(1)
+    ).scalar()
+
+    rows = []
+    if cart_id:
+        rows = db.execute(
+            select(
+                CartItem.id, CartItem.product_id, CartItem.name, CartItem.price, CartItem.qty,
+                Category.name, Product.subcategory, User.nombre,
+            )
+            .outerjoin(Product, Product.id == CartItem.product_id)
+            .outerjoin(Category, Category.id == Product.category_id)
+            .outerjoin(User, User.id == Product.seller_id)
+            .where(CartItem.cart_id == cart_id)
+        ).all()
+    if not rows:
+        raise HTTPException(status_code=400, detail="El carrito está vacío")
+
+    total = sum(price * qty for _, _, _, price, qty, _, _, _ in rows)
+    if total <= 0:
+        raise HTTPException(status_code=400, detail="Total inválido")
+
+    order = Order(
+        id=_id(),
+        user_id=user_id,
+        user_name=user_name,
+        status="Pendiente",
+        created_at=datetime.utcnow(),
+        total_amount=total,
+    )
+    db.add(order)
+    db.flush()
 
-    order = Order(user_id=user_id, total=total, status="CREADA")
-    db.add(order); db.flush()
+    items = [
+        {
+            "id": _id(),
+            "order_id": order.id,
+            "product_id": product_id,
+            "product_name": name,
+            "category": category,
+            "subcategory": subcategory,
+            "seller": seller,
+            "quantity": qty,
+            "unit_price": price,
+        }
+        for _, product_id, name, price, qty, category, subcategory, seller in rows
+    ]
+    db.execute(insert(OrderItem), items)
 
-    for ci in cart.items:
-        db.add(OrderItem(order_id=order.id, product_id=ci.product_id,
-                         name=ci.name, price=ci.price, qty=ci.qty))
-    for ci in list(cart.items):
-        db.delete(ci)
+    # si el sweeper liberó algún ítem en el medio, la orden no se crea
+    cart_item_ids = [r[0] for r in rows]
+    res = db.execute(
+        delete(CartItem)
+        .where(CartItem.id.in_(cart_item_ids))
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount != len(cart_item_ids):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="El carrito cambió, volvé a intentar")
 
-    db.commit(); db.refresh(order)
-    return order
+    append_order_created(db, order.id, order.created_at, items, user_id=user_id)
+    return order, items
@@ -1,24 +1,38 @@
 ##backend/app/crud/product_crud.py
 # backend/app/crud/product_crud.py
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Optional, List
 from ..models.models import Product, ProductImage
 from ..schemas.product_schemas import ProductCreate, ProductUpdate
+from ..pagination import after_cursor
+from ..search import index_product, unindex_product, search_product_ids, sort_by_ids
 
 
 def get_product_by_id(db: Session, product_id: str) -> Optional[Product]:
     return db.query(Product).filter(Product.id == product_id, Product.is_active == True).first()
 
 def list_products(db: Session, q: str | None, category_id: str | None,
-                  seller_id: str | None, limit: int, offset: int) -> List[Product]:
-    query = db.query(Product).filter(Product.is_active == True)
+                  seller_id: str | None, limit: int, offset: int,
+                  cursor: str | None = None) -> List[Product]:
+    query = (
+        db.query(Product)
+        .options(joinedload(Product.seller), selectinload(Product.images))
+        .filter(Product.is_active == True)
+    )
     if q:
-        query = query.filter(Product.name.ilike(f"%{q}%"))
+        # por relevancia (índice de búsqueda, que ya filtra y pagina); sin cursor
+        ids = search_product_ids(db, q, limit, offset, category_id, seller_id)
+        return sort_by_ids(query.filter(Product.id.in_(ids)).all(), ids)
     if category_id:
         query = query.filter(Product.category_id == category_id)
     if seller_id:
         query = query.filter(Product.seller_id == seller_id)
-    return query.order_by(Product.created_at.desc()).limit(limit).offset(offset).all()
+    query = query.order_by(Product.created_at.desc(), Product.id.desc())
+    if cursor:
+        query = query.filter(after_cursor(Product.created_at, Product.id, cursor))
+    else:
+        query = query.offset(offset)
+    return query.limit(limit).all()
 
 def create_product(db: Session, seller_id: str, payload: ProductCreate) -> Product:
     p = Product(
@@ -32,6 +46,7 @@ def create_product(db: Session, seller_id: str, payload: ProductCreate) -> Produ
         for i, url in enumerate(payload.images):
             db.add(ProductImage(product_id=p.id, url=url, sort_order=i))
     db.commit(); db.refresh(p)
+    index_product(db, p); db.commit()
     return p
 
 def update_product(db: Session, p: Product, payload: ProductUpdate) -> Product:
@@ -44,8 +59,10 @@ def update_product(db: Session, p: Product, payload: ProductUpdate) -> Product:
         for i, url in enumerate(payload.images):
             db.add(ProductImage(product_id=p.id, url=url, sort_order=i))
     db.commit(); db.refresh(p)
+    index_product(db, p); db.commit()
     return p
 
 def soft_delete_product(db: Session, p: Product) -> None:
     p.is_active = False
     db.commit()
+    unindex_product(db, p.id); db.commit()
@@ -10,7 +10,9 @@ from ..models.models import (
     BankingInfo,
     CryptoWallet,
 )
+from ..principals import principal_cache
 from ..security import hash_password, verify_password
+from ..security.hash_pool import hash_password_pooled
 from ..schemas.user_schemas import UserCreate, AddressIn, CryptoWalletIn
 
 
@@ -75,6 +77,7 @@ def assign_roles(db: Session, user_id: str, role_codes: List[str]) -> None:
     for r in roles:
         db.add(UserRole(user_id=user.id, role_id=r.id))
     db.commit()
+    principal_cache.invalidate_user(user.id)
 
 
 # --------- Seed de roles base ---------
@@ -136,7 +139,7 @@ def create_user_full(db: Session, p: UserCreate) -> User:
         email=p.email,
         tel=p.tel,
         palabra_seg=p.palabra_seg or "",
-        password_hash=hash_password(p.password),
+        password_hash=hash_password_pooled(p.password),
         acepta_terminos=p.acepta_terminos,
     )
     db.add(u)
@@ -174,7 +177,7 @@ def update_user_full(db: Session, user_id: str, p: UserCreate) -> User:
     u.palabra_seg = p.palabra_seg or ""
     u.acepta_terminos = p.acepta_terminos
     if p.password:
-        u.password_hash = hash_password(p.password)
+        u.password_hash = hash_password_pooled(p.password)
 
     upsert_address(db, u.id, p.domicilio_envio)
     upsert_address(db, u.id, p.domicilio_entrega)
@@ -1,8 +1,13 @@
 # backend/app/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 import os
+import threading
+
+from . import metrics
 
 # Carga variables desde .env
 load_dotenv()
@@ -13,22 +18,174 @@ if not DATABASE_URL:
         "DATABASE_URL no está definida. Configurala en el archivo .env"
     )
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# "tuned" (por defecto): pragmas de SQLite + pool dimensionado.
+# "basic": el engine de antes (sólo check_same_thread y pre_ping), para comparar.
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+
+# SQLite: WAL deja leer mientras otro escribe; con synchronous=NORMAL un
+# commit no hace fsync (sólo el checkpoint), y no se pierde consistencia.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))   # negativo = KiB (64 MiB)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Pool (MySQL y SQLite en archivo). recycle < wait_timeout de MySQL (8 h por
+# defecto, suele bajarse en hostings); con eso pre_ping deja de hacer falta
+# en cada checkout, pero se puede volver a prender.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")   # "1"/"0"; sin definir: sólo fuera de SQLite
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _sqlite_pragmas(url) -> list[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if not _is_memory_sqlite(url):
+        pragmas.insert(0, f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def _engine_kwargs(parsed, profile: str, poolclass) -> dict:
+    sqlite = parsed.get_backend_name() == "sqlite"
+    connect_args = {"check_same_thread": False} if sqlite else {}
+    if profile == "basic":
+        return dict(connect_args=connect_args, pool_pre_ping=True)
+
+    kwargs = dict(connect_args=connect_args)
+    if not _is_memory_sqlite(parsed):
+        kwargs.update(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=-1 if sqlite else DB_POOL_RECYCLE,
+        )
+    kwargs["pool_pre_ping"] = DB_POOL_PRE_PING == "1" if DB_POOL_PRE_PING is not None else not sqlite
+    return kwargs
+
+
+def _install_pragmas(eng: Engine, parsed) -> None:
+    pragmas = _sqlite_pragmas(parsed)
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(pragma)
+        cur.close()
+
+
+def make_engine(url: str, profile: str = DB_PROFILE) -> Engine:
+    """Crea el engine de `url` con el perfil indicado (ver DB_PROFILE)."""
+    parsed = make_url(url)
+    eng = create_engine(url, **_engine_kwargs(parsed, profile, QueuePool))
+    if profile != "basic" and parsed.get_backend_name() == "sqlite":
+        _install_pragmas(eng, parsed)
+    return eng
+
+
+# driver async equivalente a cada driver sync
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "mysql": "aiomysql"}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No hay driver async configurado para {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def make_async_engine(url: str, profile: str = DB_PROFILE):
+    """AsyncEngine de la misma base (aiosqlite / aiomysql), con el mismo perfil."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    aurl = async_url(url)
+    parsed = make_url(aurl)
+    eng = create_async_engine(aurl, **_engine_kwargs(parsed, profile, AsyncAdaptedQueuePool))
+    if profile != "basic" and parsed.get_backend_name() == "sqlite":
+        _install_pragmas(eng.sync_engine, parsed)
+    return eng
+
+
+def pool_stats(eng: Engine) -> dict:
+    """Estado del pool (conexiones abiertas, prestadas, overflow) para /metrics."""
+    pool = eng.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+engine = make_engine(DATABASE_URL)
+metrics.register_provider("db_pool", lambda: pool_stats(engine))
+
+# Réplica de lectura (opcional): get_read_db (deps) la usa para los GET
+# pesados. Sin DATABASE_READ_URL todo va al primario. Ver app/replica.py.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+read_engine = make_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+if read_engine is not engine:
+    metrics.register_provider("db_read_pool", lambda: pool_stats(read_engine))
+
+class PrimarySession(Session):
+    """Sesión del primario (sync, o la sync_session de una AsyncSession)."""
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,
-)
 
 SessionLocal = sessionmaker(
     bind=engine,
+    class_=PrimarySession,
     autoflush=False,
     autocommit=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    autocommit=False,
+)
+
+
+# Async (rutas async, ASYNC_ROUTES=1): se crea recién cuando se pide, así el
+# modo sync no necesita aiosqlite / aiomysql instalados.
+_async_sessionmakers = None
+_async_lock = threading.Lock()
+
+
+def get_async_sessionmakers():
+    """(primario, lectura) como async_sessionmaker; la lectura usa DATABASE_READ_URL si hay."""
+    global _async_sessionmakers
+    if _async_sessionmakers is None:
+        with _async_lock:
+            if _async_sessionmakers is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                primary = make_async_engine(DATABASE_URL)
+                read = make_async_engine(DATABASE_READ_URL) if DATABASE_READ_URL else primary
+                metrics.register_provider("db_async_pool", lambda: pool_stats(primary.sync_engine))
+                opts = dict(autoflush=False, expire_on_commit=False)
+                _async_sessionmakers = (
+                    async_sessionmaker(primary, sync_session_class=PrimarySession, **opts),
+                    async_sessionmaker(read, **opts),
+                )
+    return _async_sessionmakers
+
 
 class Base(DeclarativeBase):
     """Base para todos los modelos ORM."""
@@ -59,6 +216,12 @@ def init_db():
         m.Order,
         m.OrderItem,
         m.Payment,
+        m.IdempotencyKey,
+        m.SalesRollup,
+        m.SalesDayTotal,
+        m.SalesSketch,
+        m.OrderEvent,
+        m.OutboxOffset,
     )
 
     Base.metadata.create_all(bind=engine)
@@ -1,26 +1,62 @@
 # backend/app/deps.py
-from typing import Generator
+from typing import TYPE_CHECKING, AsyncGenerator, Generator
 
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
-from jose import jwt
 
-from .db import SessionLocal
+from .db import SessionLocal, get_async_sessionmakers
 from .models.models import User
-from .security.tokens import SECRET_KEY, ALGORITHM  # 👈 mismo secret/algoritmo que los tokens
+from .principals import (
+    Principal, load_principal, load_principal_async, principal_cache, principal_from_claims,
+)
+from .replica import read_async_session, read_session
+from .security import access_claims, access_claims_async
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_db() -> Generator[Session, None, None]:
+
+def get_db(authorization: str | None = Header(default=None)) -> Generator[Session, None, None]:
     """
-    Crea y cierra la sesión de base de datos por request.
+    Crea y cierra la sesión de base de datos (primario) por request.
+    Guarda el token para que un commit con escrituras active la lectura
+    del primario para ese usuario (ver replica.py).
     """
     db = SessionLocal()
+    db.info["authorization"] = authorization
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db(authorization: str | None = Header(default=None)) -> Generator[Session, None, None]:
+    """
+    Sesión para endpoints de sólo lectura: va a la réplica (DATABASE_READ_URL)
+    si hay, salvo que el usuario acabe de escribir (read-your-writes).
+    """
+    db = read_session(authorization)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _token_user_id(authorization: str | None) -> str:
+    """user.id (`sub`) del header Authorization: Bearer <token>; 401 si no hay o no valida."""
+    return access_claims(authorization)["sub"]
+
+
+def _load_user(db: Session, uid: str) -> User:
+    user = db.query(User).filter(User.id == uid).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuario no encontrado",
+        )
+    return user
+
+
 def get_current_user(
     authorization: str | None = Header(default=None),
     db: Session = Depends(get_db),
@@ -28,56 +64,83 @@ def get_current_user(
     """
     Obtiene el usuario actual a partir del header Authorization: Bearer <token>.
     """
-    if not authorization or not authorization.startswith("Bearer "):
+    return _load_user(db, _token_user_id(authorization))
+
+
+def _principal_or_401(principal: Principal | None) -> Principal:
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Falta token",
+            detail="Usuario no encontrado",
         )
+    return principal
+
+
+def get_current_principal(authorization: str | None = Header(default=None)) -> Principal:
+    """
+    Identidad del usuario actual (id, estado, roles) para endpoints que no
+    necesitan el User del ORM. Sale de los claims del token; si es un token
+    viejo sin claims, de principal_cache o de una sola query en una sesión
+    propia (no abre la del request).
+    """
+    claims = access_claims(authorization)
+    principal = principal_from_claims(claims) or principal_cache.get(claims["jti"])
+    if principal is None:
+        with SessionLocal() as db:
+            principal = _principal_or_401(load_principal(db, claims["sub"]))
+        principal_cache.put(claims["jti"], principal)
+    return principal
 
-    token = authorization.split(" ", 1)[1]
 
+# ---------- variantes async (routers/routes_async.py) ----------
+async def get_async_db(
+    authorization: str | None = Header(default=None),
+) -> AsyncGenerator["AsyncSession", None]:
+    """AsyncSession del primario por request (mismo rol que get_db)."""
+    primary, _ = get_async_sessionmakers()
+    db = primary()
+    db.sync_session.info["authorization"] = authorization
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido",
-        )
+        yield db
+    finally:
+        await db.close()
 
-    uid = payload.get("sub")
-    if not uid:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido",
-        )
 
-    user = db.query(User).filter(User.id == uid).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado",
-        )
+async def get_async_read_db(
+    authorization: str | None = Header(default=None),
+) -> AsyncGenerator["AsyncSession", None]:
+    """AsyncSession de lectura (réplica salvo read-your-writes, como get_read_db)."""
+    db = read_async_session(authorization)
+    try:
+        yield db
+    finally:
+        await db.close()
 
-    return user
+
+async def get_current_principal_async(
+    authorization: str | None = Header(default=None),
+    db: "AsyncSession" = Depends(get_async_db),
+) -> Principal:
+    """Como get_current_principal, sin bloquear el event loop (en un miss usa la sesión del request)."""
+    claims = await access_claims_async(authorization)
+    principal = principal_from_claims(claims) or principal_cache.get(claims["jti"])
+    if principal is None:
+        principal = _principal_or_401(await load_principal_async(db, claims["sub"]))
+        principal_cache.put(claims["jti"], principal)
+    return principal
 
 
 def current_admin_or_self(
     user_id: str,
-    user: User = Depends(get_current_user),
-) -> User:
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
     """
     Permite acceder si:
     - el usuario actual es ADMIN, o
     - es el mismo user_id que el del recurso.
     """
-    codes = {
-        ur.role.code
-        for ur in getattr(user, "roles", [])
-        if getattr(ur, "role", None)
-    }
-
-    if user.id == user_id or "ADMIN" in codes:
-        return user
+    if principal.id == user_id or principal.has_role("ADMIN"):
+        return principal
 
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,138 @@
+# backend/app/idempotency.py
+"""
+Soporte de Idempotency-Key para los endpoints que modifican carrito y órdenes.
+
+Uso en un endpoint (con la sesión SIN commitear todavía):
+
+    replay = idem.begin(db, user.id)
+    if replay is not None:
+        return replay
+    ... mutación (flush, sin commit) ...
+    idem.finish(db, 201, out)
+    db.commit()
+
+begin() inserta la clave en la misma transacción que la mutación. Si llega un
+reintento mientras el primero está en curso, su INSERT espera el lock de la
+fila/base y falla por PK duplicada cuando el primero commitea: se hace
+rollback y se devuelve la respuesta guardada. Si el primero falla (rollback),
+la clave desaparece con él y el reintento se ejecuta normalmente. Sólo se
+guardan respuestas exitosas.
+
+Las claves vencen a las IDEMPOTENCY_TTL_HOURS; las borra un worker.
+"""
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+from fastapi import Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .models.models import IdempotencyKey
+from .responses import dumps
+
+IDEMPOTENCY_TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class Idempotency:
+    def __init__(self, key: str | None, fingerprint: str):
+        self.key = key
+        self.fingerprint = fingerprint
+        self._row: IdempotencyKey | None = None
+
+    def begin(self, db: Session, user_id: str) -> Response | None:
+        """Reserva la clave; si ya se usó devuelve la respuesta guardada."""
+        if self.key is None:
+            return None
+        now = datetime.utcnow()
+        row = db.get(IdempotencyKey, (user_id, self.key))
+        if row is not None and row.expires_at > now:
+            return self._replay(row)
+        if row is not None:
+            db.delete(row)
+            db.flush()
+
+        self._row = IdempotencyKey(
+            user_id=user_id, key=self.key, fingerprint=self.fingerprint,
+            expires_at=now + IDEMPOTENCY_TTL,
+        )
+        db.add(self._row)
+        try:
+            db.flush()
+        except IntegrityError:
+            # otro request con la misma clave commiteó primero
+            db.rollback()
+            self._row = None
+            row = db.get(IdempotencyKey, (user_id, self.key))
+            if row is None:  # pragma: no cover - lo purgaron en el medio
+                raise HTTPException(status_code=409, detail="Request en curso, reintentá")
+            return self._replay(row)
+        return None
+
+    def finish(self, db: Session, status_code: int, body=None) -> None:
+        """Guarda la respuesta; se commitea junto con la mutación."""
+        if self._row is None:
+            return
+        self._row.status_code = status_code
+        self._row.response_body = None if body is None else dumps(jsonable_encoder(body)).decode("utf-8")
+        db.flush()
+
+    def _replay(self, row: IdempotencyKey) -> Response:
+        if row.fingerprint != self.fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key ya usada con otro request",
+            )
+        if row.status_code is None:
+            raise HTTPException(status_code=409, detail="Request en curso, reintentá")
+        metrics.inc("idempotency_replays_total")
+        return Response(
+            content=row.response_body or b"",
+            status_code=row.status_code,
+            media_type="application/json" if row.response_body is not None else None,
+            headers={REPLAY_HEADER: "true"},
+        )
+
+
+async def get_idempotency(
+    request: Request,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+) -> Idempotency:
+    """Dependencia: lee el header y arma la huella del request."""
+    if idempotency_key is not None:
+        idempotency_key = idempotency_key.strip()
+        if not idempotency_key or len(idempotency_key) > 64:
+            raise HTTPException(status_code=400, detail="Idempotency-Key inválida")
+    body = await request.body()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(request.method.encode())
+    h.update(request.url.path.encode())
+    h.update(body)
+    return Idempotency(idempotency_key or None, h.hexdigest())
+
+
+def purge_expired(db: Session, now: datetime | None = None, batch_size: int = 1000) -> int:
+    """
+    Borra claves vencidas de a lotes: toma como corte el expires_at de la
+    clave número batch_size (o `now` si hay menos) y hace un solo DELETE.
+    Devuelve cuántas borró.
+    """
+    now = now or datetime.utcnow()
+    cutoff = (
+        db.query(IdempotencyKey.expires_at)
+        .filter(IdempotencyKey.expires_at <= now)
+        .order_by(IdempotencyKey.expires_at)
+        .offset(batch_size - 1)
+        .limit(1)
+        .scalar()
+    ) or now
+    deleted = (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.expires_at <= cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
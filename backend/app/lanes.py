@@ -0,0 +1,185 @@
+# backend/app/lanes.py
+"""
+Carriles (lanes) de prioridad para las rutas sync.
+
+Todas las rutas sync comparten el threadpool de AnyIO: unos pocos
+/admin/orders o analytics lentos ocupan hilos y el checkout hace cola
+detrás. LaneMiddleware asigna cada request a un carril por método y prefijo:
+
+- "reporting": GET de /admin, /analytics, /sales -> pocos lugares, aislado
+- "critical":  /cart, /orders, /auth             -> protegido
+- "default":   el resto (catálogo, usuarios, comentarios y las escrituras
+  de /admin, p. ej. bloquear un usuario: no hacen cola detrás de un export)
+
+Cada carril tiene un CapacityLimiter con LANE_<NOMBRE>_SIZE lugares: un
+request entra al handler sólo con un lugar libre, y si espera más de
+LANE_<NOMBRE>_QUEUE_TIMEOUT segundos responde 503 + Retry-After. Con
+LANE_<NOMBRE>_DUTY < 1 el lugar queda tomado un rato después de responder
+(duración x (1/duty - 1)), pero sólo mientras el carril `yields_to` tenga
+requests en curso o esperando: en una máquina con pocos cores reporting no
+le come CPU al checkout, y con el server tranquilo (o cuando el checkout
+termina a mitad de la espera) el lugar se libera enseguida. Un request
+usa a lo sumo un hilo a la vez (dependencias, handler y cierre corren en
+secuencia), así que al arrancar el threadpool se dimensiona a la suma de
+los carriles (configure_thread_pool): reporting saturado llena sólo sus
+lugares y nunca le quita hilos a critical.
+
+Con los carriles prendidos el tope de concurrencia de analytics de
+ratelimit.py (ANALYTICS_MAX_IN_FLIGHT) no se usa: reporting ya limita esos
+mismos paths (ver main.py).
+
+Es un threadpool compartido con cupos, no un executor por carril: FastAPI
+no deja elegir el executor por router, y con cupos + total = suma de
+cupos el aislamiento es el mismo.
+"""
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+
+import anyio
+import anyio.to_thread
+from anyio.lowlevel import RunVar
+
+from . import metrics
+
+LANES_ENABLED = os.getenv("LANES_ENABLED", "1") != "0"
+
+EXEMPT_PATHS = ("/health", "/metrics")
+
+# Retry-After de los 503: al azar entre 1 y este tope, para que los rechazados
+# de una ráfaga no vuelvan todos en el mismo segundo
+LANE_RETRY_AFTER_MAX = int(os.getenv("LANE_RETRY_AFTER_MAX", "3"))
+
+# cada cuánto se mira, durante la espera de duty, si el carril prioritario sigue ocupado
+DUTY_POLL_SECONDS = 0.02
+
+
+@dataclass(frozen=True)
+class Lane:
+    name: str
+    prefixes: tuple[str, ...]
+    size: int
+    queue_timeout: float
+    duty: float = 1.0   # fracción del tiempo que cada lugar puede estar ocupado...
+    yields_to: str | None = None  # ...mientras este carril tenga trabajo
+    methods: frozenset[str] = frozenset()  # vacío = todos
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        return path.startswith(self.prefixes)
+
+
+def _lane(name: str, prefixes: tuple[str, ...], size: int, queue_timeout: float, duty: float = 1.0,
+          yields_to: str | None = None, methods: frozenset[str] = frozenset()) -> Lane:
+    env = name.upper()
+    return Lane(
+        name,
+        prefixes,
+        int(os.getenv(f"LANE_{env}_SIZE", str(size))),
+        float(os.getenv(f"LANE_{env}_QUEUE_TIMEOUT", str(queue_timeout))),
+        float(os.getenv(f"LANE_{env}_DUTY", str(duty))),
+        yields_to,
+        methods,
+    )
+
+
+# el orden importa: gana el primer carril que matchea; "default" matchea todo
+LANES = [
+    _lane("reporting", ("/admin", "/analytics", "/sales"), 4, 3.0, duty=0.5, yields_to="critical",
+          methods=frozenset({"GET", "HEAD"})),
+    _lane("critical", ("/cart", "/orders", "/auth"), 16, 5.0),
+    _lane("default", ("/",), 20, 5.0),
+]
+
+def configure_thread_pool(lanes: list[Lane] = LANES) -> int:
+    """
+    Threadpool de AnyIO = suma de los carriles. Llamar dentro del event loop
+    (startup de la app).
+    """
+    total = sum(lane.size for lane in lanes)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = total
+    return total
+
+
+class LaneMiddleware:
+    def __init__(self, app, lanes: list[Lane] | None = None):
+        self.app = app
+        self.lanes = LANES if lanes is None else lanes
+        self._waiting = {lane.name: 0 for lane in self.lanes}
+        self._in_flight = {lane.name: 0 for lane in self.lanes}
+        # un CapacityLimiter sólo sirve en el event loop donde se creó: uno por loop
+        self._limiters: RunVar[dict[str, anyio.CapacityLimiter]] = RunVar(f"lanes_{id(self)}")
+        metrics.register_provider("lanes", self.stats)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+        method = scope.get("method", "GET")
+        lane = next((lane for lane in self.lanes if lane.matches(method, path)), None)
+        if lane is None:
+            return await self.app(scope, receive, send)
+
+        limiter = self._get_limiters()[lane.name]
+        admitted = False
+        self._waiting[lane.name] += 1
+        try:
+            with anyio.move_on_after(lane.queue_timeout):
+                await limiter.acquire()
+                admitted = True
+        finally:
+            self._waiting[lane.name] -= 1
+
+        if not admitted:
+            metrics.inc(f"lane_{lane.name}_rejected_total")
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"retry-after", str(random.randint(1, LANE_RETRY_AFTER_MAX)).encode())],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({"detail": "Servicio ocupado, reintentá en unos segundos"}).encode(),
+            })
+            return
+
+        self._in_flight[lane.name] += 1
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+            if lane.duty < 1 and lane.yields_to:
+                # la respuesta ya salió: el lugar queda tomado un rato más, mientras haya checkout
+                await self._yield(lane.yields_to, (time.monotonic() - start) * (1 / lane.duty - 1))
+        finally:
+            self._in_flight[lane.name] -= 1
+            limiter.release()
+
+    def _busy(self, name: str) -> bool:
+        return self._in_flight.get(name, 0) + self._waiting.get(name, 0) > 0
+
+    async def _yield(self, name: str, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while self._busy(name):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await anyio.sleep(min(remaining, DUTY_POLL_SECONDS))
+
+    def _get_limiters(self) -> dict[str, anyio.CapacityLimiter]:
+        try:
+            return self._limiters.get()
+        except LookupError:
+            limiters = {lane.name: anyio.CapacityLimiter(lane.size) for lane in self.lanes}
+            self._limiters.set(limiters)
+            return limiters
+
+    def stats(self) -> dict:
+        out = {}
+        for lane in self.lanes:
+            out[f"{lane.name}_size"] = lane.size
+            out[f"{lane.name}_in_flight"] = self._in_flight[lane.name]
+            out[f"{lane.name}_waiting"] = self._waiting[lane.name]
+        return out
@@ -1,8 +1,17 @@
 # backend/app/main.py
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from . import metrics
 from .db import init_db
+from .lanes import LANES_ENABLED, LaneMiddleware, configure_thread_pool
+from .ratelimit import RATE_LIMIT_ENABLED, RateLimitMiddleware
+from .search import get_product_index
+from .security.hash_pool import hash_pool
+from .security.revocation import revocations
+from .workers import start_workers, stop_workers
 
 from .routers import (
     routes_products,
@@ -14,16 +23,28 @@ from .routers import (
     routes_auth,
     routes_cart,  
     routes_admin,
+    routes_analytics,
+    routes_sales,
 )
 
+# 1 = productos, GET /cart y login por las rutas async (ver routers/routes_async.py)
+ASYNC_ROUTES = os.getenv("ASYNC_ROUTES", "0") == "1"
+
 app = FastAPI(title="Ecom MKT Lab API")
 
+if LANES_ENABLED:
+    app.add_middleware(LaneMiddleware)  # el más interno: sólo lo que pasó el rate limit espera lugar
+if RATE_LIMIT_ENABLED:
+    # por dentro de CORS: los 429 también llevan sus headers. Con carriles, reporting ya
+    # limita la concurrencia de analytics: el tope propio (ANALYTICS_MAX_IN_FLIGHT) sobra
+    app.add_middleware(RateLimitMiddleware, concurrency=[] if LANES_ENABLED else None)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8501", "http://127.0.0.1:8501"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -35,9 +56,32 @@ def health():
 @app.on_event("startup")
 def on_startup():
     init_db()
+    get_product_index()  # crea/llena el índice de búsqueda si hace falta
+    revocations.ensure_loaded()  # filtro de tokens revocados, antes del primer request
+    start_workers()
+
+
+@app.on_event("startup")
+async def size_thread_pool():
+    if LANES_ENABLED:
+        configure_thread_pool()  # threadpool = suma de los carriles (ver lanes.py)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_workers()
+    hash_pool.shutdown()
+
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
 
 
 # Routers
+if ASYNC_ROUTES:
+    from .routers import routes_async
+    app.include_router(routes_async.router)  # antes que los sync: gana en los mismos paths
 app.include_router(routes_roles.router)
 app.include_router(routes_users.router)
 app.include_router(routes_products.router)
@@ -47,3 +91,5 @@ app.include_router(routes_comments.router)
 app.include_router(routes_auth.router)     
 app.include_router(routes_cart.router)  
 app.include_router(routes_admin.router)  # 👈 NUEVO
+app.include_router(routes_analytics.router)
+app.include_router(routes_sales.router)
@@ -0,0 +1,45 @@
+# backend/app/metrics.py
+"""
+Métricas del proceso (contadores y gauges en memoria).
+
+Los módulos llaman a inc()/set_gauge(); GET /metrics devuelve snapshot().
+También se pueden registrar funciones que calculan valores al momento
+(register_provider), por ejemplo estadísticas del pool de conexiones.
+"""
+import threading
+from typing import Callable
+
+_lock = threading.Lock()
+_values: dict[str, float] = {}
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def inc(name: str, value: float = 1) -> None:
+    with _lock:
+        _values[name] = _values.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    with _lock:
+        _values[name] = value
+
+
+def get(name: str, default: float = 0) -> float:
+    with _lock:
+        return _values.get(name, default)
+
+
+def register_provider(prefix: str, fn: Callable[[], dict]) -> None:
+    """fn() devuelve {nombre: valor}; se publica como '<prefix>_<nombre>'."""
+    with _lock:
+        _providers[prefix] = fn
+
+
+def snapshot() -> dict[str, float]:
+    with _lock:
+        out = dict(_values)
+        providers = list(_providers.items())
+    for prefix, fn in providers:
+        for key, value in fn().items():
+            out[f"{prefix}_{key}"] = value
+    return dict(sorted(out.items()))
@@ -1,9 +1,9 @@
 ##backend/app/models/models.py
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, UniqueConstraint, Integer, Text, Numeric
+from sqlalchemy import String, Boolean, Date, DateTime, ForeignKey, UniqueConstraint, Integer, Text, Numeric, Index, LargeBinary, text
 from uuid import uuid4
-from datetime import datetime
+from datetime import date, datetime
 from ..db import Base
 
 
@@ -35,6 +35,12 @@ class User(Base):
     kyc_docs = relationship("KYCDocument", back_populates="user", cascade="all,delete-orphan")
     roles = relationship("UserRole", back_populates="user", cascade="all,delete-orphan")
 
+    # admin de usuarios: [WHERE estado = ?] [AND creado_en >= ?] ORDER BY creado_en DESC
+    __table_args__ = (
+        Index("ix_users_estado_creado_en", "estado", "creado_en"),
+        Index("ix_users_creado_en", "creado_en"),
+    )
+
 class Address(Base):
     __tablename__ = "addresses"
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_id)
@@ -126,13 +132,21 @@ class Product(Base):
 
     seller = relationship("User", backref="products")
     category = relationship("Category", back_populates="products")
-    images = relationship("ProductImage", back_populates="product", cascade="all,delete-orphan")
+    images = relationship(
+        "ProductImage", back_populates="product", cascade="all,delete-orphan",
+        order_by="ProductImage.sort_order",
+    )
     comments = relationship("ProductComment", back_populates="product", cascade="all,delete-orphan")
     ####
     pay_method: Mapped[str | None] = mapped_column(String(40))
     network: Mapped[str | None] = mapped_column(String(40))
     alias: Mapped[str | None] = mapped_column(String(120))
     wallet: Mapped[str | None] = mapped_column(String(200))
+
+    # listado paginado por cursor: WHERE is_active ORDER BY created_at DESC, id DESC
+    __table_args__ = (
+        Index("ix_products_active_created_id", "is_active", "created_at", "id"),
+    )
 #####
 
 class ProductImage(Base):
@@ -147,9 +161,12 @@ class ProductImage(Base):
 class Cart(Base):
     __tablename__ = "carts"
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_id)
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    # carrito vigente: WHERE user_id = ? ORDER BY created_at DESC LIMIT 1
+    __table_args__ = (Index("ix_carts_user_created", "user_id", "created_at"),)
+
     items = relationship("CartItem", back_populates="cart", cascade="all,delete-orphan")
 
 class CartItem(Base):
@@ -163,9 +180,20 @@ class CartItem(Base):
     image: Mapped[str | None] = mapped_column(String(255), default=None)
     seller: Mapped[str] = mapped_column(String(120))           # nombre vendedor snapshot
     stock_snapshot: Mapped[int] = mapped_column(Integer, default=0)
+    # hasta cuándo se mantiene el stock reservado; después lo libera el sweeper
+    reserved_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     cart = relationship("Cart", back_populates="items")
 
+    # sweeper: WHERE reserved_until < ? ORDER BY reserved_until (sólo renglones con reserva)
+    __table_args__ = (
+        Index(
+            "ix_cart_items_reserved", "reserved_until",
+            sqlite_where=text("reserved_until IS NOT NULL"),
+            postgresql_where=text("reserved_until IS NOT NULL"),
+        ),
+    )
+
 # --- AGREGAR ABAJO DE Comment ---
 class Order(Base):
     __tablename__ = "orders"
@@ -185,13 +213,16 @@ class Order(Base):
         "Payment", back_populates="order", cascade="all, delete-orphan"
     )
 
+    # admin / exports: rango de created_at ORDER BY created_at DESC, id DESC (cursor)
+    __table_args__ = (Index("ix_orders_created_id", "created_at", "id"),)
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     id: Mapped[str] = mapped_column(String(32), primary_key=True, default=_id)
-    order_id: Mapped[str] = mapped_column(String(32), ForeignKey("orders.id"), nullable=False)
+    order_id: Mapped[str] = mapped_column(String(32), ForeignKey("orders.id"), nullable=False, index=True)
 
-    product_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    product_id: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
     product_name: Mapped[str] = mapped_column(String(160), nullable=False)
     category: Mapped[str | None] = mapped_column(String(64))
     subcategory: Mapped[str | None] = mapped_column(String(64))
@@ -206,7 +237,7 @@ class OrderItem(Base):
 class Payment(Base):
     __tablename__ = "payments"
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_id)
-    order_id: Mapped[str] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), index=True)
+    order_id: Mapped[str] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"))
     provider: Mapped[str] = mapped_column(String(30), default="MP")    # MP/TARJETA/TRANSFER
     status: Mapped[str] = mapped_column(String(20), default="PENDIENTE")  # PENDIENTE/APROBADO/RECHAZADO
     amount: Mapped[int] = mapped_column(Integer, default=0)
@@ -216,10 +247,16 @@ class Payment(Base):
     tx_ref: Mapped[str | None] = mapped_column(String(80), default=None)
     order = relationship("Order", back_populates="payments")
 
+    # último pago de cada orden (admin) y pagos del rango (analytics)
+    __table_args__ = (
+        Index("ix_payments_order_created_id", "order_id", "created_at", "id"),
+        Index("ix_payments_created_at", "created_at"),
+    )
+
 class ProductComment(Base):
     __tablename__ = "product_comments"
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_id)
-    product_id: Mapped[str] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), index=True)
+    product_id: Mapped[str] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"))
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     rating: Mapped[int] = mapped_column(Integer)  # 1..10
     text: Mapped[str | None] = mapped_column(Text, default=None)
@@ -228,4 +265,93 @@ class ProductComment(Base):
     product = relationship("Product", back_populates="comments")
     user = relationship("User", backref="product_comments")
 
+    # comentarios del producto, más nuevos primero
+    __table_args__ = (Index("ix_product_comments_product_created", "product_id", "created_at"),)
+
 Comment = ProductComment
+
+
+class IdempotencyKey(Base):
+    """Respuesta guardada de un POST/PATCH/DELETE enviado con Idempotency-Key."""
+    __tablename__ = "idempotency_keys"
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(32))   # hash de método + ruta + body
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+
+class RevokedToken(Base):
+    """
+    Revocación de tokens (ver security/revocation.py). `key` es el jti de un
+    token (logout) o "user:<id>" para todos los emitidos hasta revoked_at
+    (usuario bloqueado). Se borra al vencer lo que revoca.
+    """
+    __tablename__ = "revoked_tokens"
+    key: Mapped[str] = mapped_column(String(80), primary_key=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+
+
+# --- rollups de analytics (ver app/analytics) ---
+class SalesRollup(Base):
+    """Ventas agregadas por día × vendedor × producto × categoría."""
+    __tablename__ = "sales_rollup_daily"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # "stream" = eventos del outbox; "backfill" = recalculado desde el historial
+    source: Mapped[str] = mapped_column(String(10), primary_key=True, default="stream")
+    seller: Mapped[str] = mapped_column(String(120), primary_key=True, default="")
+    product_id: Mapped[str] = mapped_column(String(36), primary_key=True, default="")
+    category: Mapped[str] = mapped_column(String(64), primary_key=True, default="")
+    product_name: Mapped[str] = mapped_column(String(160), default="")
+    units: Mapped[int] = mapped_column(Integer, default=0)
+    gmv: Mapped[int] = mapped_column(Integer, default=0)
+    orders: Mapped[int] = mapped_column(Integer, default=0)   # órdenes con este renglón
+
+    # para leer exacto los candidatos a top-K de los sketches (product_id / seller IN ...)
+    __table_args__ = (
+        Index("ix_sales_rollup_product_day", "product_id", "day"),
+        Index("ix_sales_rollup_seller_day", "seller", "day"),
+    )
+
+
+class SalesDayTotal(Base):
+    """Totales por día (las órdenes no se pueden sumar desde SalesRollup)."""
+    __tablename__ = "sales_rollup_day_totals"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    source: Mapped[str] = mapped_column(String(10), primary_key=True, default="stream")
+    orders: Mapped[int] = mapped_column(Integer, default=0)
+    units: Mapped[int] = mapped_column(Integer, default=0)
+    gmv: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SalesSketch(Base):
+    """Sketches por día y origen (ver analytics/sketches.py)."""
+    __tablename__ = "sales_sketches_daily"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    source: Mapped[str] = mapped_column(String(10), primary_key=True, default="stream")
+    kind: Mapped[str] = mapped_column(String(10), primary_key=True)   # buyers | products | sellers
+    data: Mapped[bytes] = mapped_column(LargeBinary)                   # registros / tabla, comprimidos
+    keys: Mapped[str | None] = mapped_column(Text, default=None)       # JSON: candidatos a top-K
+
+
+class OrderEvent(Base):
+    """Outbox append-only: una fila por orden creada, escrita en la transacción del checkout."""
+    __tablename__ = "order_outbox"
+    # ids estrictamente crecientes aunque se borren filas (el offset depende de eso)
+    __table_args__ = {"sqlite_autoincrement": True}
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    order_id: Mapped[str] = mapped_column(String(36), index=True)
+    event_type: Mapped[str] = mapped_column(String(30), default="order_created")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    payload: Mapped[str] = mapped_column(Text)   # JSON: created_at, user_id, items
+
+
+class OutboxOffset(Base):
+    """High-water mark de cada consumidor del outbox (último id procesado)."""
+    __tablename__ = "outbox_offsets"
+    consumer: Mapped[str] = mapped_column(String(40), primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
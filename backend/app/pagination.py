@@ -0,0 +1,55 @@
+# backend/app/pagination.py
+"""
+Paginación por cursor (keyset) para listados ordenados por fecha de alta.
+
+El cursor es opaco para el cliente: codifica (created_at, id) de la última
+fila devuelta. La página siguiente arranca con un WHERE sobre esa tupla, así
+que cuesta lo mismo que la primera sin importar la profundidad (no hay OFFSET
+que recorra y descarte filas).
+"""
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Devuelve (created_at, id). Si el cursor no es válido responde 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), row_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido",
+        )
+
+
+def after_cursor(created_col, id_col, cursor: str):
+    """
+    Condición "filas posteriores al cursor" para un orden
+    (created_at DESC, id DESC).
+    """
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id),
+    )
+
+
+def next_cursor(rows, limit: int, created_attr: str = "created_at") -> str | None:
+    """Cursor de la página siguiente, o None si esta página es la última."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, created_attr), last.id)
@@ -0,0 +1,39 @@
+# backend/app/passwords.py
+"""
+Contexto de hashing de contraseñas (pbkdf2_sha256).
+
+PASSWORD_HASH_ROUNDS es el costo configurado: los hashes con menos rondas,
+o de un esquema viejo (bcrypt), se regeneran en el próximo login
+(verify_and_update). Va fuera del paquete security a propósito: los
+procesos del pool de hashing (security/hash_pool.py) arrancan con spawn y,
+al deserializar la función, importan este módulo y sus paquetes padre.
+backend/app/__init__.py está vacío, y acá no se importa nada de la app, así
+que un worker no carga db, modelos ni la config de la API.
+"""
+import os
+
+from passlib.context import CryptContext
+
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+
+pwd_ctx = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+
+def hash_password(p: str) -> str:
+    """Hashea una contraseña en texto plano."""
+    return pwd_ctx.hash(p)
+
+
+def verify_password(p: str, h: str) -> bool:
+    """Verifica una contraseña vs el hash almacenado."""
+    return pwd_ctx.verify(p, h)
+
+
+def verify_and_update(p: str, h: str) -> tuple[bool, str | None]:
+    """(ok, hash nuevo si hay que migrarlo al costo configurado; si no, None)."""
+    return pwd_ctx.verify_and_update(p, h)
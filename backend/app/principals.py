@@ -0,0 +1,150 @@
+# backend/app/principals.py
+"""
+Cache de principals: quién es el usuario del token, sin ir a la base.
+
+get_current_user hace db.query(User) en cada request, y después
+require_vendor / current_admin_or_self cargan user.roles y cada ur.role
+(~3 queries antes de la lógica). Para lo que sólo necesita identidad
+(id, estado, códigos de rol) alcanza un Principal. Los access tokens nuevos
+traen roles y estado firmados (ver security/tokens.py) y el Principal sale
+de los claims, sin base. Para tokens viejos, sin esos claims, se arma con UNA
+query la primera vez y queda en un LRU con TTL por token (jti del JWT, o la
+firma si no trae jti).
+
+Invalidación: PATCH /admin/users/{id}/estado y assign_roles llaman a
+principal_cache.invalidate_user(user_id) después del commit. La cache vive en
+la memoria del proceso: con varias instancias, las otras se enteran recién al
+vencer el TTL (PRINCIPAL_CACHE_TTL_SECONDS), que por eso es corto.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .models.models import Role, User, UserRole
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identidad del request: alcanza para autorizar sin cargar el User del ORM."""
+
+    id: str
+    estado: str
+    role_codes: frozenset[str]
+
+    def has_role(self, code: str) -> bool:
+        return code in self.role_codes
+
+
+def principal_from_claims(claims: dict) -> Principal | None:
+    """Principal armado sólo con los claims firmados del access token; None si no los trae."""
+    if "roles" not in claims or "estado" not in claims:
+        return None
+    return Principal(id=claims["sub"], estado=claims["estado"], role_codes=frozenset(claims["roles"]))
+
+
+def _principal_stmt(user_id: str):
+    # User + códigos de rol en una sola query (outer join)
+    return (
+        select(User.id, User.estado, Role.code)
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .where(User.id == user_id)
+    )
+
+
+def _principal_from_rows(rows) -> Principal | None:
+    if not rows:
+        return None
+    return Principal(
+        id=rows[0].id,
+        estado=rows[0].estado,
+        role_codes=frozenset(r.code for r in rows if r.code),
+    )
+
+
+def load_principal(db: Session, user_id: str) -> Principal | None:
+    """User + códigos de rol en una sola query (outer join); None si no existe."""
+    return _principal_from_rows(db.execute(_principal_stmt(user_id)).all())
+
+
+async def load_principal_async(db: "AsyncSession", user_id: str) -> Principal | None:
+    """Como load_principal, con AsyncSession."""
+    return _principal_from_rows((await db.execute(_principal_stmt(user_id))).all())
+
+
+class PrincipalCache:
+    """LRU con TTL: token id -> Principal. Guarda también user_id -> token ids para invalidar."""
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS,
+                 max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._by_user: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_id: str) -> Principal | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token_id)
+            if entry is None:
+                metrics.inc("principal_cache_misses_total")
+                return None
+            expires, principal = entry
+            if expires <= now:
+                self._drop(token_id)
+                metrics.inc("principal_cache_misses_total")
+                return None
+            self._entries.move_to_end(token_id)
+        metrics.inc("principal_cache_hits_total")
+        return principal
+
+    def put(self, token_id: str, principal: Principal) -> None:
+        with self._lock:
+            if token_id in self._entries:
+                self._drop(token_id)
+            self._entries[token_id] = (time.monotonic() + self.ttl, principal)
+            self._by_user.setdefault(principal.id, set()).add(token_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Saca todos los tokens cacheados del usuario (cambió estado o roles)."""
+        with self._lock:
+            for token_id in self._by_user.pop(user_id, ()):
+                self._entries.pop(token_id, None)
+        metrics.inc("principal_cache_invalidations_total")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, token_id: str) -> None:
+        # con el lock tomado
+        _, principal = self._entries.pop(token_id)
+        ids = self._by_user.get(principal.id)
+        if ids is not None:
+            ids.discard(token_id)
+            if not ids:
+                del self._by_user[principal.id]
+
+
+principal_cache = PrincipalCache()
+metrics.register_provider("principal_cache", lambda: {"entries": len(principal_cache)})
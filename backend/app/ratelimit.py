@@ -0,0 +1,242 @@
+# backend/app/ratelimit.py
+"""
+Rate limit por usuario / IP y límite de requests en curso por grupo de rutas.
+
+RateLimitMiddleware (ASGI puro, antes de FastAPI):
+
+1. Token bucket: la primera regla de RATE_RULES que matchea método + prefijo
+   descuenta un token del balde de la clave (user.id del token si la firma
+   valida, si no la IP). Sin tokens: 429 + Retry-After. La clave no mira la
+   revocación (eso pide la base y esto corre en el event loop): un token
+   revocado igual gasta del balde de su usuario y lo rechaza la ruta.
+2. Concurrencia: si la ruta es de un grupo de CONCURRENCY_LIMITS y ya hay
+   `limit` requests del grupo en curso (hasta terminar de mandar el body),
+   503 + Retry-After en lugar de ocupar otro hilo del threadpool. Sólo con
+   LANES_ENABLED=0: con carriles, main.py no le pasa grupos y el carril
+   "reporting" de lanes.py limita esos paths.
+
+Los baldes de cada regla viven en arrays de numpy (tokens, último uso) con un
+dict clave -> posición. Cuando se llena, se liberan de una vez todos los
+baldes que ya se habrían recargado por completo (equivalen a uno nuevo); si
+no alcanza, el cuarto más viejo.
+
+Límites por variables de entorno (RATE_LIMIT_*_PER_MINUTE,
+ANALYTICS_MAX_IN_FLIGHT); RATE_LIMIT_ENABLED=0 apaga el middleware. Todo es
+por proceso: con N workers de uvicorn el límite efectivo es N veces mayor.
+"""
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import metrics
+from .security.revocation import token_cache
+from .security.tokens import decode_token
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# detrás de un proxy propio: la IP real viene en X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+
+EXEMPT_PATHS = ("/health", "/metrics")
+
+
+@dataclass(frozen=True)
+class RateRule:
+    name: str
+    methods: frozenset[str]   # vacío = todos
+    prefix: str
+    per_minute: float
+    burst: int
+    by_ip: bool = False       # login / alta: no hay usuario todavía
+    exact: bool = False       # path == prefix (no sus subrutas)
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        return path == self.prefix if self.exact else path.startswith(self.prefix)
+
+
+@dataclass(frozen=True)
+class ConcurrencyLimit:
+    name: str
+    prefixes: tuple[str, ...]
+    limit: int
+
+    def matches(self, path: str) -> bool:
+        return path.startswith(self.prefixes)
+
+
+def _per_minute(name: str, default: str) -> float:
+    return float(os.getenv(f"RATE_LIMIT_{name}_PER_MINUTE", default))
+
+
+RATE_RULES = [
+    RateRule("login", frozenset({"POST"}), "/auth/login", _per_minute("LOGIN", "10"), 5, by_ip=True),
+    # sólo el alta (POST /users), no /users/{id}/kyc ni /users/seed-roles
+    RateRule("register", frozenset({"POST"}), "/users", _per_minute("REGISTER", "5"), 3, by_ip=True, exact=True),
+    RateRule("cart", frozenset({"POST", "PATCH", "DELETE"}), "/cart", _per_minute("CART", "120"), 20),
+    RateRule("default", frozenset(), "/", _per_minute("DEFAULT", "600"), 100),
+]
+
+CONCURRENCY_LIMITS = [
+    ConcurrencyLimit("analytics", ("/analytics", "/sales/history"),
+                     int(os.getenv("ANALYTICS_MAX_IN_FLIGHT", "8"))),
+]
+
+
+class TokenBucketStore:
+    """Baldes de una regla: arrays de tokens y último uso, con eviction perezosa."""
+
+    def __init__(self, per_minute: float, burst: int, capacity: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = per_minute / 60.0
+        self.burst = float(burst)
+        self.tokens = np.zeros(capacity, np.float64)
+        self.stamp = np.zeros(capacity, np.float64)
+        self._slots: dict[str, int] = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def take(self, key: str, now: float | None = None) -> float:
+        """Descuenta un token. 0 si pasa; si no, segundos hasta el próximo token."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            i = self._slots.get(key)
+            if i is None:
+                i = self._alloc(now)
+                self._slots[key] = i
+                self.tokens[i] = self.burst
+                self.stamp[i] = now
+            available = min(self.burst, self.tokens[i] + (now - self.stamp[i]) * self.rate)
+            self.stamp[i] = now
+            if available >= 1:
+                self.tokens[i] = available - 1
+                return 0.0
+            self.tokens[i] = available
+            return (1 - available) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _alloc(self, now: float) -> int:
+        if not self._free:
+            self._evict(now)
+        return self._free.pop()
+
+    def _evict(self, now: float) -> None:
+        keys = list(self._slots)
+        used = np.fromiter(self._slots.values(), np.int64, len(keys))
+        refilled = self.tokens[used] + (now - self.stamp[used]) * self.rate >= self.burst
+        if not refilled.any():
+            oldest = np.argsort(self.stamp[used])[: max(1, len(keys) // 4)]
+            refilled[oldest] = True
+        for pos in np.flatnonzero(refilled):
+            del self._slots[keys[pos]]
+            self._free.append(int(used[pos]))
+        metrics.inc("ratelimit_evictions_total", int(refilled.sum()))
+
+
+class InFlight:
+    """Contador de requests en curso de un grupo (sin esperas: lleno = rechazo)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.current = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.current >= self.limit:
+                return False
+            self.current += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.current -= 1
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, rules: list[RateRule] | None = None,
+                 concurrency: list[ConcurrencyLimit] | None = None,
+                 max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.app = app
+        self.rules = RATE_RULES if rules is None else rules
+        self.concurrency = CONCURRENCY_LIMITS if concurrency is None else concurrency
+        self.buckets = {r.name: TokenBucketStore(r.per_minute, r.burst, max_keys) for r in self.rules}
+        self.in_flight = {c.name: InFlight(c.limit) for c in self.concurrency}
+        metrics.register_provider("ratelimit", self.stats)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        rule = next((r for r in self.rules if r.matches(method, path)), None)
+        if rule is not None:
+            wait = self.buckets[rule.name].take(self._client_key(scope, rule))
+            if wait:
+                metrics.inc(f"ratelimit_{rule.name}_rejected_total")
+                return await _reject(send, 429, "Demasiados requests, reintentá más tarde", wait)
+
+        group = next((c for c in self.concurrency if c.matches(path)), None)
+        if group is None:
+            return await self.app(scope, receive, send)
+        slot = self.in_flight[group.name]
+        if not slot.acquire():
+            metrics.inc(f"concurrency_{group.name}_rejected_total")
+            return await _reject(send, 503, "Servicio ocupado, reintentá en unos segundos", 1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slot.release()
+
+    def stats(self) -> dict:
+        out = {f"{name}_keys": len(store) for name, store in self.buckets.items()}
+        for name, slot in self.in_flight.items():
+            out[f"{name}_in_flight"] = slot.current
+            out[f"{name}_max_in_flight"] = slot.limit
+        return out
+
+    @staticmethod
+    def _client_key(scope, rule: RateRule) -> str:
+        headers = dict(scope.get("headers") or ())
+        if not rule.by_ip:
+            auth = headers.get(b"authorization", b"").decode("latin-1")
+            if auth.startswith("Bearer "):
+                sub = _token_sub(auth.split(" ", 1)[1])
+                if sub:
+                    return "user:" + sub
+        forwarded = headers.get(b"x-forwarded-for") if RATE_LIMIT_TRUST_FORWARDED else None
+        if forwarded:
+            return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "?")
+
+
+def _token_sub(token: str) -> str | None:
+    """`sub` de un token con firma válida, sin tocar la base (token_cache o sólo HMAC)."""
+    cached = token_cache.get(token_cache.digest(token))
+    if cached is not None:
+        return cached[0]["sub"]
+    try:
+        return decode_token(token).get("sub")
+    except Exception:
+        return None
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
@@ -0,0 +1,112 @@
+# backend/app/replica.py
+"""
+Ruteo de lecturas a la réplica (DATABASE_READ_URL) con read-your-writes.
+
+get_read_db (deps) abre la sesión en la réplica, salvo que el usuario del
+token haya escrito en el primario hace menos de READ_YOUR_WRITES_SECONDS:
+en ese caso lee del primario, para ver su propio cambio aunque la réplica
+venga atrasada.
+
+Las escrituras se detectan en las sesiones del primario, sync o async (flush o
+INSERT/UPDATE/DELETE ejecutado, seguido de commit). get_db guarda el header
+Authorization en session.info y recién al commit se decodifica el token.
+
+La ventana vive en la memoria del proceso: con varias instancias de la API,
+cada una conoce sólo las escrituras que pasaron por ella. En ese caso hay
+que balancear con afinidad por usuario o subir la ventana por encima del
+lag de la réplica.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import db as database
+from . import metrics
+from .security.tokens import token_subject
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+
+class RecentWriters:
+    """user_id -> hasta cuándo sus lecturas van al primario."""
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS, max_entries: int = 100_000):
+        self.window = window
+        self.max_entries = max_entries
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+            self._until[user_id] = now + self.window
+
+    def is_recent(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+recent_writers = RecentWriters()
+
+
+def replica_enabled() -> bool:
+    return database.ReadSessionLocal.kw["bind"] is not database.engine
+
+
+def _sticky(authorization: str | None) -> bool:
+    """True si el usuario del token escribió hace poco (sus lecturas van al primario)."""
+    user_id = token_subject(authorization)
+    if user_id and recent_writers.is_recent(user_id):
+        metrics.inc("db_reads_primary_total")
+        return True
+    metrics.inc("db_reads_replica_total")
+    return False
+
+
+def read_session(authorization: str | None) -> Session:
+    """Sesión para una lectura: réplica, o primario si el usuario escribió hace poco."""
+    if not replica_enabled() or _sticky(authorization):
+        return database.SessionLocal()
+    return database.ReadSessionLocal()
+
+
+def read_async_session(authorization: str | None):
+    """Igual que read_session, para las rutas async (AsyncSession)."""
+    primary, read = database.get_async_sessionmakers()
+    if read.kw["bind"] is primary.kw["bind"] or _sticky(authorization):
+        return primary()
+    return read()
+
+
+# ---------- detección de escrituras en el primario ----------
+@event.listens_for(database.PrimarySession, "after_flush")
+def _after_flush(session, _flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(database.PrimarySession, "do_orm_execute")
+def _on_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(database.PrimarySession, "after_commit")
+def _after_commit(session):
+    if session.info.pop("wrote", False):
+        user_id = token_subject(session.info.get("authorization"))
+        if user_id:
+            recent_writers.mark(user_id)
+
+
+@event.listens_for(database.PrimarySession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("wrote", None)
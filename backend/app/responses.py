@@ -0,0 +1,40 @@
+# backend/app/responses.py
+"""
+Respuestas JSON pre-codificadas.
+
+Los endpoints calientes arman dicts planos desde las filas y devuelven
+FastJSONResponse directamente: FastAPI no vuelve a validar contra
+response_model (que queda sólo para la documentación) y el encode lo hace
+orjson si está instalado.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # sin orjson usamos json de la stdlib
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
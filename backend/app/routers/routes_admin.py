@@ -1,22 +1,26 @@
 # backend/app/routers/routes_admin.py
 
 from datetime import datetime, date, time, timedelta
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel   # 👈 ESTE ES EL IMPORT QUE FALTABA
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
 
-from ..deps import get_db
+from ..deps import get_db, get_read_db
 from ..models.models import User, Order, Payment
+from ..pagination import NEXT_CURSOR_HEADER, after_cursor, next_cursor
+from ..principals import principal_cache
+from ..responses import FastJSONResponse
 from ..schemas.admin_schemas import AdminUserOut, AdminOrderOut
+from ..security import require_admin
+from ..security.revocation import revocations
+from ..streaming import csv_response, ndjson_response
 
-try:
-    from ..security import require_admin
-    AdminDep = Depends(require_admin)
-except ImportError:
-    AdminDep = Depends(get_db)
+# sólo con los claims del token (sin consultar users/roles)
+AdminDep = Depends(require_admin)
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -25,25 +29,59 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 # ==============
 #   USUARIOS
 # ==============
+_USER_COLUMNS = (
+    "id", "nombre", "apellido", "email", "tipo_doc", "nro_doc",
+    "estado", "dni_bloqueado", "creado_en",
+)
+
+
+def _users_stmt(estado: str | None, solo_nuevos: bool, dias: int):
+    stmt = select(*(getattr(User, c) for c in _USER_COLUMNS))
+
+    if estado:
+        stmt = stmt.where(User.estado == estado)
+
+    if solo_nuevos:
+        corte = datetime.utcnow() - timedelta(days=dias)
+        stmt = stmt.where(User.creado_en >= corte)
+
+    return stmt.order_by(User.creado_en.desc())
+
+
+def _user_row_to_dict(row) -> dict:
+    out = dict(zip(_USER_COLUMNS, row))
+    out["dni_bloqueado"] = bool(out["dni_bloqueado"])
+    return out
+
+
 @router.get("/users", response_model=List[AdminUserOut])
 def list_users(
     estado: str | None = Query(None, description="ACTIVO / REVISION / BLOQUEADO"),
     solo_nuevos: bool = Query(False),
     dias: int = Query(7, ge=1, le=365),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin=AdminDep,  # para que sólo admin pueda pegarle
 ):
-    q = db.query(User)
+    rows = db.execute(_users_stmt(estado, solo_nuevos, dias)).all()
+    return FastJSONResponse([_user_row_to_dict(r) for r in rows])
 
-    if estado:
-        q = q.filter(User.estado == estado)
-
-    if solo_nuevos:
-        corte = datetime.utcnow() - timedelta(days=dias)
-        q = q.filter(User.creado_en >= corte)
 
-    q = q.order_by(User.creado_en.desc())
-    return q.all()
+@router.get("/users/export")
+def export_users(
+    estado: str | None = Query(None, description="ACTIVO / REVISION / BLOQUEADO"),
+    solo_nuevos: bool = Query(False),
+    dias: int = Query(7, ge=1, le=365),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    admin=AdminDep,
+):
+    """
+    Exporta usuarios en streaming (NDJSON o CSV), con memoria constante:
+    se leen de a lotes con yield_per.
+    """
+    stmt = _users_stmt(estado, solo_nuevos, dias)
+    if format == "csv":
+        return csv_response(stmt, _USER_COLUMNS, "usuarios.csv")
+    return ndjson_response(stmt, _user_row_to_dict)
 
 
 class EstadoUpdate(BaseModel):
@@ -65,7 +103,10 @@ def update_user_estado(
         raise HTTPException(status_code=400, detail="Estado inválido")
 
     user.estado = payload.estado
+    if payload.estado == "BLOQUEADO":
+        revocations.revoke_user(db, user.id)  # sus tokens dejan de valer ya
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return {"ok": True, "id": user.id, "estado": user.estado}
 
@@ -94,50 +135,102 @@ def update_user_dni_block(
 # ==============
 #   ÓRDENES
 # ==============
+def _orders_stmt(start_dt: datetime, end_dt: datetime):
+    """
+    Órdenes del rango con el email del usuario y el último pago, en una sola
+    consulta. El último pago sale de una subconsulta correlacionada por orden
+    (índice payments(order_id, created_at, id)); medido en SQLite rinde más que un
+    row_number() sobre todos los pagos del rango.
+    """
+    last = aliased(Payment)
+    last_payment_id = (
+        select(last.id)
+        .where(last.order_id == Order.id)
+        .order_by(last.created_at.desc(), last.id.desc())
+        .limit(1)
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Order.id,
+            Order.created_at,
+            Order.user_id,
+            User.email,
+            Order.total_amount,
+            Payment.status,
+            Payment.tx_ref,
+        )
+        .outerjoin(User, User.id == Order.user_id)
+        .outerjoin(Payment, Payment.id == last_payment_id)
+        .where(Order.created_at >= start_dt, Order.created_at < end_dt)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+    )
+
+
+_ORDER_KEYS = ("id", "created_at", "user_id", "user_email", "total_amount", "payment_status", "tx_ref")
+
+
+def _order_row_to_dict(row) -> dict:
+    return dict(zip(_ORDER_KEYS, row))
+
+
 @router.get("/orders", response_model=List[AdminOrderOut])
 def list_orders(
     from_date: date,
     to_date: date,
-    db: Session = Depends(get_db),
+    limit: int | None = Query(None, ge=1, le=100_000),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Cursor opaco de X-Next-Cursor"),
+    stream: bool = Query(False, description="NDJSON en streaming (una orden por línea)"),
+    db: Session = Depends(get_read_db),
     admin=AdminDep,
 ):
+    """
+    Órdenes del rango (más nuevas primero) con email del usuario y estado
+    del último pago.
+
+    - sin limit: todas las del rango (compatibilidad)
+    - limit + offset o limit + cursor (header X-Next-Cursor de la página anterior)
+    - stream=true: NDJSON leído de a lotes, memoria constante
+    """
     # incluir el día "hasta" completo
     start_dt = datetime.combine(from_date, time.min)
     end_dt = datetime.combine(to_date + timedelta(days=1), time.min)
 
-    orders = (
-        db.query(Order)
-        .filter(Order.created_at >= start_dt, Order.created_at < end_dt)
-        .options(joinedload(Order.payments))
-        .all()
-    )
+    stmt = _orders_stmt(start_dt, end_dt)
+    if cursor:
+        stmt = stmt.where(after_cursor(Order.created_at, Order.id, cursor))
+    elif offset:
+        stmt = stmt.offset(offset)
+    if limit:
+        stmt = stmt.limit(limit)
 
-    results: list[AdminOrderOut] = []
-
-    for o in orders:
-        # Tomamos el último pago como estado "principal"
-        payment: Payment | None = None
-        if o.payments:
-            payment = sorted(o.payments, key=lambda p: p.created_at)[-1]
-
-        payment_status = payment.status if payment else None
-        tx_ref = payment.tx_ref if payment else None
-
-        # Buscar email de usuario si está ligado
-        user_email = None
-        if o.user_id:
-            user_email = db.query(User.email).filter(User.id == o.user_id).scalar()
-
-        results.append(
-            AdminOrderOut(
-                id=o.id,
-                created_at=o.created_at,
-                user_id=o.user_id,
-                user_email=user_email,
-                total_amount=o.total_amount,
-                payment_status=payment_status,
-                tx_ref=tx_ref,
-            )
-        )
+    if stream:
+        return ndjson_response(stmt, _order_row_to_dict)
+
+    rows = db.execute(stmt).all()
+    headers = {}
+    nxt = next_cursor(rows, limit) if limit else None
+    if nxt:
+        headers[NEXT_CURSOR_HEADER] = nxt
+    return FastJSONResponse([_order_row_to_dict(r) for r in rows], headers=headers)
 
-    return results
+
+@router.get("/orders/export")
+def export_orders(
+    from_date: date,
+    to_date: date,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    admin=AdminDep,
+):
+    """
+    Exporta las órdenes del rango en streaming (NDJSON o CSV), con las mismas
+    columnas que GET /admin/orders y memoria constante.
+    """
+    start_dt = datetime.combine(from_date, time.min)
+    end_dt = datetime.combine(to_date + timedelta(days=1), time.min)
+    stmt = _orders_stmt(start_dt, end_dt)
+    if format == "csv":
+        return csv_response(stmt, _ORDER_KEYS, f"ordenes_{from_date}_{to_date}.csv")
+    return ndjson_response(stmt, _order_row_to_dict)
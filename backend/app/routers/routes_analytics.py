@@ -0,0 +1,289 @@
+# backend/app/routers/routes_analytics.py
+"""
+Endpoints de los dashboards (11_Dashboard_Global, 8_Finanzas_Rentab).
+
+Todo lo que es ventas sale de los rollups diarios (app/analytics), así que
+el costo depende de la cantidad de días del rango y no de las órdenes.
+Los dashboards locales (11a_Dashboard_Local) salen del motor columnar en
+memoria (app/analytics/columnar.py).
+"""
+import os
+from datetime import date, datetime, time, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..analytics.columnar import get_sales_engine
+from ..analytics.sketches import HLL_STD_ERROR, range_sketches
+from ..deps import get_current_principal, get_read_db
+from ..models.models import Category, Payment, Product, SalesDayTotal, SalesRollup, User
+from ..principals import Principal
+from ..responses import FastJSONResponse
+from ..security import require_admin
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# métricas de todo el marketplace (GMV, vendedores, márgenes): sólo admin.
+# Los dashboards de vendedor / comprador piden el usuario logueado.
+ADMIN_ONLY = [Depends(require_admin)]
+
+# comisión del marketplace sobre el GMV (no hay costo de producto en la base)
+MARGIN_RATE = float(os.getenv("ANALYTICS_MARGIN_RATE", "0.15"))
+DEFAULT_RANGE_DAYS = 30
+SIN_CATEGORIA = "Sin categoría"
+
+
+def date_range(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    from_: date | None = Query(None, alias="from"),
+    to: date | None = Query(None),
+) -> tuple[date, date]:
+    """
+    Rango de días inclusive. Acepta start/end (Finanzas) o from/to (Dashboard
+    Global); por defecto, los últimos 30 días.
+    """
+    end = end or to or date.today()
+    start = start or from_ or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="Rango de fechas inválido")
+    return start, end
+
+
+def _daily(db: Session, start: date, end: date) -> list[dict]:
+    """Serie diaria con todos los días del rango (los vacíos en 0)."""
+    rows = db.execute(
+        select(
+            SalesDayTotal.day,
+            func.sum(SalesDayTotal.gmv),
+            func.sum(SalesDayTotal.orders),
+            func.sum(SalesDayTotal.units),
+        )
+        .where(SalesDayTotal.day >= start, SalesDayTotal.day <= end)
+        .group_by(SalesDayTotal.day)  # una fila por origen (stream / backfill)
+    ).all()
+    by_day = {day: (gmv, orders, units) for day, gmv, orders, units in rows}
+    out = []
+    for i in range((end - start).days + 1):
+        day = start + timedelta(days=i)
+        gmv, orders, units = by_day.get(day, (0, 0, 0))
+        out.append({"date": day, "total": gmv, "orders": orders, "units": units})
+    return out
+
+
+def _top(db: Session, start: date, end: date, key_cols, order_col: str, limit: int,
+         extra_cols=(), keys: list[str] | None = None):
+    """
+    Top por unidades o GMV desde los rollups. Con `keys` (candidatos de los
+    sketches) sólo se agregan esas claves en vez de todas las del rango.
+    """
+    units = func.sum(SalesRollup.units).label("units")
+    gmv = func.sum(SalesRollup.gmv).label("gmv")
+    conds = [SalesRollup.day >= start, SalesRollup.day <= end]
+    if keys:
+        conds.append(key_cols[0].in_(keys))
+    return db.execute(
+        select(*key_cols, *extra_cols, units, gmv)
+        .where(*conds)
+        .group_by(*key_cols)
+        .order_by((units if order_col == "units" else gmv).desc())
+        .limit(limit)
+    ).all()
+
+
+def _top_products(db, start, end, limit: int, by: str = "gmv", keys=None) -> list[dict]:
+    rows = _top(db, start, end, (SalesRollup.product_id,), by, limit,
+                extra_cols=(func.max(SalesRollup.product_name),), keys=keys)
+    return [
+        {"product_id": pid or None, "product": name, "units": units, "sales": gmv}
+        for pid, name, units, gmv in rows
+    ]
+
+
+def _top_sellers(db, start, end, limit: int, keys=None) -> list[dict]:
+    rows = _top(db, start, end, (SalesRollup.seller,), "gmv", limit, keys=keys)
+    return [{"seller": seller or "-", "units": units, "sales": gmv} for seller, units, gmv in rows]
+
+
+def _categories(db, start, end) -> list[dict]:
+    gmv = func.sum(SalesRollup.gmv).label("gmv")
+    rows = db.execute(
+        select(SalesRollup.category, gmv)
+        .where(SalesRollup.day >= start, SalesRollup.day <= end)
+        .group_by(SalesRollup.category)
+        .order_by(gmv.desc())
+    ).all()
+    return [
+        {"category": category or SIN_CATEGORIA, "sales": sales, "margin": round(sales * MARGIN_RATE)}
+        for category, sales in rows
+    ]
+
+
+def _totals(db, start, end) -> tuple[int, int, int]:
+    gmv, orders, units = db.execute(
+        select(
+            func.coalesce(func.sum(SalesDayTotal.gmv), 0),
+            func.coalesce(func.sum(SalesDayTotal.orders), 0),
+            func.coalesce(func.sum(SalesDayTotal.units), 0),
+        ).where(SalesDayTotal.day >= start, SalesDayTotal.day <= end)
+    ).one()
+    return gmv, orders, units
+
+
+@router.get("/global", dependencies=ADMIN_ONLY)
+def global_metrics(db: Session = Depends(get_read_db)):
+    """Números generales del marketplace (usuarios, catálogo, top categorías)."""
+    active = Product.is_active == True
+    total_products, out_of_stock, with_image = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((Product.stock <= 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((func.coalesce(Product.image_url, "") != "", 1), else_=0)), 0),
+        ).where(active)
+    ).one()
+    total_users = db.execute(select(func.count()).select_from(User)).scalar()
+
+    # categorías: por ventas en los rollups; si todavía no hay ventas, por catálogo
+    top_categories = [
+        c for (c,) in db.execute(
+            select(SalesRollup.category)
+            .where(SalesRollup.category != "")
+            .group_by(SalesRollup.category)
+            .order_by(func.sum(SalesRollup.gmv).desc())
+            .limit(3)
+        )
+    ]
+    if not top_categories:
+        top_categories = [
+            c for (c,) in db.execute(
+                select(Category.name)
+                .join(Product, Product.category_id == Category.id)
+                .where(active)
+                .group_by(Category.name)
+                .order_by(func.count().desc())
+                .limit(3)
+            )
+        ]
+
+    return FastJSONResponse({
+        "total_users": total_users,
+        "total_products": total_products,
+        "products_out_of_stock": out_of_stock,
+        "products_with_image": with_image,
+        "top_categories": top_categories,
+    })
+
+
+@router.get("/orders", dependencies=ADMIN_ONLY)
+def orders_summary(
+    rng: tuple[date, date] = Depends(date_range),
+    top: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Resumen de ventas del rango para el Dashboard Global: KPIs, serie
+    diaria, top vendedores/productos y pagos por método/estado.
+
+    Compradores únicos y top-K salen de combinar los sketches diarios
+    (analytics/sketches.py): unique_buyers es aproximado (±1.6 % de error
+    estándar); de los tops, los sketches eligen los candidatos y las cifras
+    se leen exactas de los rollups.
+    """
+    start, end = rng
+    gmv, orders, units = _totals(db, start, end)
+    buyers, product_sketch, seller_sketch = range_sketches(db, start, end)
+    # 2×top candidatos por las dudas; si no hay sketches (datos viejos) se agrega todo
+    product_keys = [k for k, _ in product_sketch.top(2 * top)] or None
+    seller_keys = [k for k, _ in seller_sketch.top(2 * top)] or None
+
+    # pagos: no están en los rollups, se agrupan en la base por proveedor y estado
+    start_dt = datetime.combine(start, time.min)
+    end_dt = datetime.combine(end + timedelta(days=1), time.min)
+    payments = db.execute(
+        select(Payment.provider, Payment.status, func.count())
+        .where(Payment.created_at >= start_dt, Payment.created_at < end_dt)
+        .group_by(Payment.provider, Payment.status)
+    ).all()
+    by_method: dict[str, int] = {}
+    rejected = total_payments = 0
+    for provider, status, n in payments:
+        by_method[provider or "-"] = by_method.get(provider or "-", 0) + n
+        total_payments += n
+        if status == "RECHAZADO":
+            rejected += n
+
+    return FastJSONResponse({
+        "from": start,
+        "to": end,
+        "gmv": gmv,
+        "orders": orders,
+        "units": units,
+        "aov": round(gmv / orders) if orders else 0,
+        "unique_buyers": round(buyers.count()),
+        "unique_buyers_error": HLL_STD_ERROR,
+        "daily": _daily(db, start, end),
+        "top_sellers": _top_sellers(db, start, end, top, keys=seller_keys),
+        "top_products": _top_products(db, start, end, top, by="units", keys=product_keys),
+        "payments_by_method": by_method,
+        "payment_fail_rate": rejected / total_payments if total_payments else 0.0,
+    })
+
+
+@router.get("/sales-daily", dependencies=ADMIN_ONLY)
+def sales_daily(rng: tuple[date, date] = Depends(date_range), db: Session = Depends(get_read_db)):
+    """[{date, total, orders, units}] por día del rango."""
+    return FastJSONResponse(_daily(db, *rng))
+
+
+@router.get("/sales-summary", dependencies=ADMIN_ONLY)
+def sales_summary(rng: tuple[date, date] = Depends(date_range), db: Session = Depends(get_read_db)):
+    gmv, orders, units = _totals(db, *rng)
+    return FastJSONResponse({
+        "total_sales": gmv,
+        "total_margin": round(gmv * MARGIN_RATE),
+        "ticket_avg": round(gmv / orders) if orders else 0,
+        "orders": orders,
+        "units": units,
+        "returns": 0,  # todavía no hay devoluciones en el modelo
+    })
+
+
+@router.get("/top-products", dependencies=ADMIN_ONLY)
+def top_products(
+    rng: tuple[date, date] = Depends(date_range),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """[{product_id, product, units, sales}] ordenado por ventas ($)."""
+    return FastJSONResponse(_top_products(db, *rng, limit))
+
+
+@router.get("/top-sellers", dependencies=ADMIN_ONLY)
+def top_sellers(
+    rng: tuple[date, date] = Depends(date_range),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    return FastJSONResponse(_top_sellers(db, *rng, limit))
+
+
+@router.get("/category-margins", dependencies=ADMIN_ONLY)
+def category_margins(rng: tuple[date, date] = Depends(date_range), db: Session = Depends(get_read_db)):
+    """
+    [{category, sales, margin}]. El margen es la comisión del marketplace
+    (ANALYTICS_MARGIN_RATE sobre el GMV).
+    """
+    return FastJSONResponse(_categories(db, *rng))
+
+
+@router.get("/seller/dashboard")
+def seller_dashboard(user: Principal = Depends(get_current_principal), db: Session = Depends(get_read_db)):
+    """{kpis, series, lists} de las ventas del vendedor logueado."""
+    return FastJSONResponse(get_sales_engine().seller_dashboard(db, user.id))
+
+
+@router.get("/buyer/dashboard")
+def buyer_dashboard(user: Principal = Depends(get_current_principal), db: Session = Depends(get_read_db)):
+    """{kpis, series, lists} de las compras del usuario logueado."""
+    return FastJSONResponse(get_sales_engine().buyer_dashboard(db, user.id))
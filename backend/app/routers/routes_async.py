@@ -0,0 +1,144 @@
+# backend/app/routers/routes_async.py
+"""
+Variantes async de las lecturas calientes (productos, carrito) y del login.
+
+Con ASYNC_ROUTES=1 main.py registra este router ANTES que los sync: para
+estos paths gana la versión async y el resto sigue igual. Corren en el event
+loop con AsyncSession (aiosqlite / aiomysql), así que no compiten por los
+hilos del threadpool con los listados pesados (analytics, admin).
+
+Cada handler hace su I/O con await (mismos SELECT que las rutas sync, ver
+_list_rows_stmt / _images_stmt en routes_products) y en el event loop sólo
+queda trabajo corto. Lo que es CPU va afuera:
+- búsqueda con `q` (índice en memoria o FTS5): threadpool, sesión sync
+- páginas de más de ASYNC_SERIALIZE_ROWS filas: se arman y codifican en el threadpool
+- verificar la contraseña: pool de procesos de security/hash_pool.py
+
+Las escrituras (agregar al carrito, checkout) quedan sync: son transacciones
+cortas en el carril "critical" (ver lanes.py).
+"""
+import os
+from typing import List, Optional
+
+import anyio.to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..crud import cart_crud
+from ..deps import get_async_db, get_async_read_db, get_current_principal_async
+from ..models.models import Cart, CartItem, Role, User, UserRole
+from ..principals import Principal
+from ..replica import read_session
+from ..responses import FastJSONResponse
+from ..schemas.cart_schemas import CartOut
+from ..schemas.product_schemas import ProductOut
+from ..search import search_product_ids, sort_by_ids
+from ..security.hash_pool import verify_and_update_async
+from . import routes_auth, routes_products
+
+# con más filas, armar y codificar la respuesta ya es CPU que se nota en el loop
+ASYNC_SERIALIZE_ROWS = int(os.getenv("ASYNC_SERIALIZE_ROWS", "100"))
+
+router = APIRouter()
+
+
+# ---------- productos ----------
+def _search_ids(authorization: str | None, q: str, limit: int, offset: int,
+                category_id: Optional[str], seller_id: Optional[str]) -> list[str]:
+    """search_product_ids en una sesión sync propia (corre en el threadpool)."""
+    db = read_session(authorization)
+    try:
+        return search_product_ids(db, q, limit, offset, category_id, seller_id)
+    finally:
+        db.close()
+
+
+async def _images_by_product(db: AsyncSession, rows) -> dict[str, list[dict]]:
+    ids = [r.id for r in rows]
+    if not ids:
+        return {}
+    return routes_products._group_images(await db.execute(routes_products._images_stmt(ids)))
+
+
+async def _render(fn, rows, *args):
+    if len(rows) > ASYNC_SERIALIZE_ROWS:
+        return await anyio.to_thread.run_sync(fn, rows, *args)
+    return fn(rows, *args)
+
+
+def _search_response(rows, images) -> FastJSONResponse:
+    return FastJSONResponse(routes_products._serialize_rows(rows, images))
+
+
+def _page_response(rows, images, limit: int) -> FastJSONResponse:
+    return routes_products._page_response(routes_products._serialize_rows(rows, images), rows, limit)
+
+
+@router.get("/products", response_model=List[ProductOut], tags=["products"])
+async def list_products(db: AsyncSession = Depends(get_async_read_db),
+                        authorization: str | None = Header(default=None),
+                        q: Optional[str] = Query(None),
+                        category_id: Optional[str] = None,
+                        seller_id: Optional[str] = None,
+                        limit: int = 20,
+                        offset: int = 0,
+                        cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor")):
+    if q:
+        ids = await anyio.to_thread.run_sync(
+            _search_ids, authorization, q, limit, offset, category_id, seller_id
+        )
+        rows = sort_by_ids((await db.execute(routes_products._search_rows_stmt(ids))).all(), ids)
+        return await _render(_search_response, rows, await _images_by_product(db, rows))
+
+    stmt = routes_products._list_rows_stmt(category_id, seller_id, limit, offset, cursor)
+    rows = (await db.execute(stmt)).all()
+    return await _render(_page_response, rows, await _images_by_product(db, rows), limit)
+
+
+@router.get("/products/{product_id}", response_model=ProductOut, tags=["products"])
+async def get_product(product_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    row = (await db.execute(routes_products._detail_stmt(product_id))).first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    return FastJSONResponse(routes_products._serialize_rows([row], await _images_by_product(db, [row]))[0])
+
+
+# ---------- carrito ----------
+@router.get("/cart", response_model=CartOut, tags=["cart"])
+async def get_cart(
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_principal_async),
+):
+    cart = await db.scalar(
+        select(Cart).where(Cart.user_id == user.id).order_by(Cart.created_at.desc()).limit(1)
+    )
+    if cart is None:
+        # como _get_or_create_cart: el carrito vacío se crea en la primera visita
+        cart = Cart(user_id=user.id)
+        db.add(cart)
+        await db.commit()
+        items = []
+    else:
+        items = (await db.scalars(select(CartItem).where(CartItem.cart_id == cart.id))).all()
+    return cart_crud.cart_to_out(cart, items)
+
+
+# ---------- auth ----------
+@router.post("/auth/login", tags=["auth"])
+async def login(payload: routes_auth.LoginPayload, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == payload.email).limit(1))
+    ok, new_hash = await verify_and_update_async(payload.password, user.password_hash) if user else (False, None)
+    if not ok:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales inválidas",
+        )
+    routes_auth._reject_blocked(user)
+    roles = list(await db.scalars(
+        select(Role.code).join(UserRole, UserRole.role_id == Role.id).where(UserRole.user_id == user.id)
+    ))
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+    return routes_auth._login_response(user, roles)
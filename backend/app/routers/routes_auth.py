@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel, EmailStr
 
 from ..deps import get_db
-from ..crud.user_crud import get_user_by_email
-from ..security import verify_password, create_access_token  # 👈 importante
+from ..crud.user_crud import get_user_by_email, get_user_by_id
+from ..security import REFRESH, access_claims, verified_claims
+from ..security.hash_pool import verify_and_update_pooled
+from ..security.revocation import revocations
+from ..security.tokens import create_token_pair
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -13,24 +16,94 @@ class LoginPayload(BaseModel):
     password: str
 
 
+class RefreshPayload(BaseModel):
+    refresh_token: str
+
+
+class LogoutPayload(BaseModel):
+    refresh_token: str | None = None
+
+
 @router.post("/login")
 def login(payload: LoginPayload, db=Depends(get_db)):
+    """
+    El hash se verifica en el pool de procesos (503 si está saturado). Si el
+    hash guardado es de un costo viejo, se reemplaza por uno al costo actual.
+    """
     user = get_user_by_email(db, payload.email)
 
-    if not user or not verify_password(payload.password, user.password_hash):
+    ok, new_hash = verify_and_update_pooled(payload.password, user.password_hash) if user else (False, None)
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas",
         )
+    _reject_blocked(user)
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+
+    return _login_response(user, [ur.role.code for ur in user.roles])
+
+
+def _reject_blocked(user) -> None:
+    """Un usuario bloqueado no obtiene tokens nuevos (ni por login ni por refresh)."""
+    if user.estado == "BLOQUEADO":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuario bloqueado",
+        )
 
-    # 👇 generamos el JWT
-    access_token = create_access_token({"sub": user.id})
 
+def _login_response(user, roles: list[str]) -> dict:
+    # 👇 access token con roles/estado firmados + refresh token
     return {
         "ok": True,
         "user_id": user.id,
         "email": user.email,
-        "roles": [ur.role.code for ur in user.roles],
-        "access_token": access_token,   # 👈 CLAVE
+        "roles": roles,
+        **create_token_pair(user.id, roles, user.estado),
         "token_type": "bearer",
     }
+
+
+@router.post("/refresh")
+def refresh(payload: RefreshPayload, db=Depends(get_db)):
+    """
+    Cambia un refresh token válido por un par nuevo. Roles y estado se releen
+    de la base: acá es donde un cambio de permisos llega al token. El refresh
+    usado queda revocado (rotación): sirve una sola vez.
+    """
+    claims = _refresh_claims(payload.refresh_token)
+    user = get_user_by_id(db, claims["sub"]) if claims else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido",
+        )
+    _reject_blocked(user)
+    revocations.revoke_claims(db, claims)
+    db.commit()
+    return _login_response(user, [ur.role.code for ur in user.roles])
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(payload: LogoutPayload | None = None,
+           authorization: str | None = Header(default=None),
+           db=Depends(get_db)):
+    """Revoca el access token del header y, si lo mandan, el refresh token del mismo usuario."""
+    claims = access_claims(authorization)
+    revocations.revoke_claims(db, claims)
+    refresh_claims = _refresh_claims(payload.refresh_token) if payload and payload.refresh_token else None
+    if refresh_claims and refresh_claims["sub"] == claims["sub"]:
+        revocations.revoke_claims(db, refresh_claims)
+    db.commit()
+
+
+def _refresh_claims(token: str) -> dict | None:
+    """Claims de un refresh token válido y no revocado; si no, None."""
+    try:
+        claims = verified_claims(token)
+    except HTTPException:
+        return None
+    return claims if claims.get("typ") == REFRESH else None
@@ -1,11 +1,13 @@
 # backend/app/routers/routes_orders.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List
 
 from ..deps import get_db, get_current_user
-from ..models.models import Cart, CartItem, Order, OrderItem, User  # ajustá si cambia el nombre del modelo
+from ..idempotency import Idempotency, get_idempotency
+from ..models.models import User
+from ..crud import order_crud
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -34,66 +36,33 @@ class OrderOut(BaseModel):
 def checkout(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    idem: Idempotency = Depends(get_idempotency),
 ):
-    # 1) Buscar carrito del usuario
-    cart = (
-        db.query(Cart)
-        .filter(Cart.user_id == user.id)
-        .order_by(Cart.created_at.desc())
-        .first()
-    )
-
-    if not cart or not cart.items:
-        raise HTTPException(status_code=400, detail="El carrito está vacío")
-
-    # 2) Calcular total
-    total = sum(item.price * item.qty for item in cart.items)
-
-    if total <= 0:
-        raise HTTPException(status_code=400, detail="Total inválido")
-
-    # 3) Crear la orden
-    order = Order(
-        user_id=user.id,
-        total=total,
-        status="paid",  # o "pending" si querés simular pasarela
-    )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    # 4) Crear los items de la orden
-    for ci in cart.items:
-        oi = OrderItem(
-            order_id=order.id,
-            product_id=ci.product_id,
-            name=ci.name,
-            price=ci.price,
-            qty=ci.qty,
-        )
-        db.add(oi)
-
-    # 5) Vaciar carrito
-    for ci in list(cart.items):
-        db.delete(ci)
-
-    db.commit()
-    db.refresh(order)
-
-    # 6) Mapear a salida
-    items_out = [
-        OrderItemOut(
-            product_id=oi.product_id,
-            name=oi.name,
-            price=oi.price,
-            qty=oi.qty,
-        )
-        for oi in order.items
-    ]
-
-    return OrderOut(
+    """
+    Crea la orden a partir del carrito y lo vacía, todo en un solo commit
+    (ver order_crud.checkout). Con Idempotency-Key, un reintento (doble clic,
+    timeout del cliente) devuelve la misma orden en vez de crear otra.
+    """
+    replay = idem.begin(db, user.id)
+    if replay is not None:
+        return replay
+
+    user_name = f"{user.nombre} {user.apellido}".strip()
+    order, items = order_crud.checkout(db, user.id, user_name)
+    out = OrderOut(
         id=order.id,
         user_id=order.user_id,
-        total=order.total,
-        items=items_out,
+        total=order.total_amount,
+        items=[
+            OrderItemOut(
+                product_id=it["product_id"],
+                name=it["product_name"],
+                price=it["unit_price"],
+                qty=it["quantity"],
+            )
+            for it in items
+        ],
     )
+    idem.finish(db, status.HTTP_201_CREATED, out)
+    db.commit()
+    return out
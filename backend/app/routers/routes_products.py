@@ -1,28 +1,115 @@
 # routes_products.py
 # backend/app/routers/routes_products.py
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..deps import get_db, get_current_user
-from ..models.models import Product, ProductImage
+from ..deps import get_current_principal, get_current_user, get_db, get_read_db
+from ..models.models import Product, ProductImage, User
 from ..schemas.product_schemas import ProductCreate, ProductUpdate, ProductOut
 from ..security import require_vendor
+from ..pagination import NEXT_CURSOR_HEADER, after_cursor, next_cursor
+from ..search import index_product, unindex_product, search_product_ids, sort_by_ids
+from ..responses import FastJSONResponse
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-def _product_to_out(p: Product) -> ProductOut:
+def _seller_name(nombre: str | None, apellido: str | None) -> str | None:
+    name = f"{nombre or ''} {apellido or ''}".strip()
+    return name or None
+
+
+# columnas que forman ProductOut (listado y detalle no cargan entidades ORM)
+_OUT_COLUMNS = (
+    Product.name, Product.description, Product.price, Product.stock,
+    Product.condition, Product.category_id, Product.subcategory,
+    Product.image_url, Product.is_active, Product.pay_method, Product.network,
+    Product.alias, Product.wallet, Product.id, Product.seller_id,
+    Product.rating, Product.sold_count,
+)
+
+
+def _product_rows_stmt():
+    """
+    SELECT de columnas de producto + nombre/apellido del vendedor (join).
+    Las imágenes van aparte, en un único SELECT ... IN (ver _images_by_product).
+    """
+    return (
+        select(*_OUT_COLUMNS, Product.created_at, User.nombre, User.apellido)
+        .outerjoin(User, User.id == Product.seller_id)
+    )
+
+
+def _images_stmt(product_ids: list[str]):
+    return (
+        select(ProductImage.product_id, ProductImage.id, ProductImage.url, ProductImage.sort_order)
+        .where(ProductImage.product_id.in_(product_ids))
+        .order_by(ProductImage.product_id, ProductImage.sort_order)
+    )
+
+
+def _group_images(rows) -> dict[str, list[dict]]:
+    out: dict[str, list[dict]] = {}
+    for pid, image_id, url, sort_order in rows:
+        out.setdefault(pid, []).append({"id": image_id, "url": url, "sort_order": sort_order})
+    return out
+
+
+def _images_by_product(db: Session, product_ids: list[str]) -> dict[str, list[dict]]:
+    if not product_ids:
+        return {}
+    return _group_images(db.execute(_images_stmt(product_ids)))
+
+
+def _rows_to_out(db: Session, rows) -> list[dict]:
+    return _serialize_rows(rows, _images_by_product(db, [r.id for r in rows]))
+
+
+def _serialize_rows(rows, images: dict[str, list[dict]]) -> list[dict]:
+    """
+    Arma la salida de ProductOut directo desde las tuplas, en una sola pasada
+    (sin model_validate + revalidación por response_model).
+    """
+    out = []
+    for (name, description, price, stock, condition, category_id, subcategory,
+         image_url, is_active, pay_method, network, alias, wallet, product_id,
+         seller_id, rating, sold_count, _created_at, nombre, apellido) in rows:
+        out.append({
+            "name": name,
+            "description": description,
+            "price": price,
+            "stock": stock,
+            "condition": condition,
+            "category_id": category_id,
+            "subcategory": subcategory,
+            "image_url": image_url,
+            "is_active": is_active,
+            "pay_method": pay_method,
+            "network": network,
+            "alias": alias,
+            "wallet": wallet,
+            "id": product_id,
+            "seller_id": seller_id,
+            "rating": float(rating or 0),
+            "sold_count": sold_count or 0,
+            "images": images.get(product_id, []),
+            "seller_name": _seller_name(nombre, apellido),
+        })
+    return out
+
+
+def _product_to_out(p: Product, seller_name: str | None = None) -> ProductOut:
     out = ProductOut.model_validate(p)
-    # seller_name (si tenés nombre/apellido en User)
-    try:
-        out.seller_name = f"{p.seller.nombre} {p.seller.apellido}".strip() if p.seller else None
-    except Exception:
-        out.seller_name = None
-    # ordenar imágenes
-    if p.images:
-        out.images = sorted(p.images, key=lambda im: im.sort_order or 0)
+    out.seller_name = seller_name
     return out
 
+
+def _reindex(db: Session, p: Product) -> None:
+    """Sincroniza el índice de búsqueda con el producto ya commiteado."""
+    index_product(db, p)
+    db.commit()
+
 @router.post("", response_model=ProductOut, status_code=201)
 def create_product(payload: ProductCreate,
                    db: Session = Depends(get_db),
@@ -47,33 +134,76 @@ def create_product(payload: ProductCreate,
             db.add(ProductImage(product_id=p.id, url=url, sort_order=i))
     db.commit()
     db.refresh(p)
-    return _product_to_out(p)
+    _reindex(db, p)
+    return _product_to_out(p, _seller_name(user.nombre, user.apellido))
 
 @router.get("", response_model=List[ProductOut])
-def list_products(db: Session = Depends(get_db),
+def list_products(db: Session = Depends(get_read_db),
                   q: Optional[str] = Query(None),
                   category_id: Optional[str] = None,
                   seller_id: Optional[str] = None,
                   limit: int = 20,
-                  offset: int = 0):
-    query = db.query(Product).filter(Product.is_active == True)
+                  offset: int = 0,
+                  cursor: Optional[str] = Query(None, description="Cursor opaco de X-Next-Cursor")):
+    """
+    Lista productos activos, más nuevos primero.
+
+    Dos modos de paginación:
+    - offset/limit (compatibilidad)
+    - cursor: se pasa el valor del header X-Next-Cursor de la página anterior;
+      cada página cuesta lo mismo que la primera (usa ix_products_active_created_id).
+
+    Con `q` el orden es por relevancia (índice de búsqueda, ver app/search)
+    y se pagina sólo con offset/limit.
+    """
     if q:
-        like = f"%{q}%"
-        query = query.filter(Product.name.ilike(like))
+        # el índice filtra, ordena y pagina; acá sólo se traen esas filas
+        ids = search_product_ids(db, q, limit, offset, category_id, seller_id)
+        rows = sort_by_ids(db.execute(_search_rows_stmt(ids)).all(), ids)
+        return FastJSONResponse(_rows_to_out(db, rows))
+
+    rows = db.execute(_list_rows_stmt(category_id, seller_id, limit, offset, cursor)).all()
+    return _page_response(_rows_to_out(db, rows), rows, limit)
+
+
+def _search_rows_stmt(ids: list[str]):
+    return _product_rows_stmt().where(Product.is_active == True, Product.id.in_(ids))
+
+
+def _list_rows_stmt(category_id, seller_id, limit: int, offset: int, cursor):
+    """SELECT de una página de GET /products sin `q` (lo comparten la ruta sync y la async)."""
+    stmt = _product_rows_stmt().where(Product.is_active == True)
     if category_id:
-        query = query.filter(Product.category_id == category_id)
+        stmt = stmt.where(Product.category_id == category_id)
     if seller_id:
-        query = query.filter(Product.seller_id == seller_id)
+        stmt = stmt.where(Product.seller_id == seller_id)
+
+    stmt = stmt.order_by(Product.created_at.desc(), Product.id.desc())
+    if cursor:
+        stmt = stmt.where(after_cursor(Product.created_at, Product.id, cursor))
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.limit(limit)
+
+
+def _page_response(out: list[dict], rows, limit: int) -> FastJSONResponse:
+    headers = {}
+    nxt = next_cursor(rows, limit)
+    if nxt:
+        headers[NEXT_CURSOR_HEADER] = nxt
+    return FastJSONResponse(out, headers=headers)
+
+
+def _detail_stmt(product_id: str):
+    return _product_rows_stmt().where(Product.id == product_id, Product.is_active == True)
 
-    rows = query.order_by(Product.created_at.desc()).limit(limit).offset(offset).all()
-    return [_product_to_out(p) for p in rows]
 
 @router.get("/{product_id}", response_model=ProductOut)
-def get_product(product_id: str, db: Session = Depends(get_db)):
-    p = db.query(Product).filter(Product.id == product_id, Product.is_active == True).first()
-    if not p:
+def get_product(product_id: str, db: Session = Depends(get_read_db)):
+    row = db.execute(_detail_stmt(product_id)).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
-    return _product_to_out(p)
+    return FastJSONResponse(_rows_to_out(db, [row])[0])
 
 @router.put("/{product_id}", response_model=ProductOut)
 def update_product(product_id: str,
@@ -99,12 +229,13 @@ def update_product(product_id: str,
 
     db.commit()
     db.refresh(p)
-    return _product_to_out(p)
+    _reindex(db, p)
+    return _product_to_out(p, _seller_name(user.nombre, user.apellido))
 
 @router.delete("/{product_id}", status_code=204)
 def delete_product(product_id: str,
                    db: Session = Depends(get_db),
-                   user = Depends(get_current_user)):
+                   user = Depends(get_current_principal)):
     p = db.query(Product).filter(Product.id == product_id).first()
     if not p:
         return
@@ -114,3 +245,5 @@ def delete_product(product_id: str,
 
     p.is_active = False
     db.commit()
+    unindex_product(db, p.id)
+    db.commit()
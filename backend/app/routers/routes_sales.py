@@ -0,0 +1,194 @@
+# backend/app/routers/routes_sales.py
+"""
+Historial de ventas del vendedor logueado (9_Historial_Ventas).
+
+Cada venta es un renglón de order_items de un producto del vendedor. Los
+filtros (fechas, estado, búsqueda) y los resúmenes por categoría / por día
+se resuelven en la base: la UI sólo recibe la página que muestra y los
+totales ya agregados.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Date, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..deps import get_current_principal, get_read_db
+from ..models.models import Order, OrderItem, Product
+from ..pagination import NEXT_CURSOR_HEADER, after_cursor, next_cursor
+from ..principals import Principal
+from ..responses import FastJSONResponse
+
+router = APIRouter(prefix="/sales", tags=["sales"])
+
+# códigos de la UI <-> Order.status
+STATUS_CODES = {"DELIVERED": "Entregado", "SHIPPED": "En camino", "PENDING": "Pendiente"}
+_STATUS_BY_LABEL = {label.lower(): code for code, label in STATUS_CODES.items()}
+DEFAULT_RANGE_DAYS = 30
+SIN_CATEGORIA = "Sin categoría"
+
+_total = OrderItem.quantity * OrderItem.unit_price
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filters(
+    seller_id: str,
+    start: date,
+    end: date,
+    status: str | None,
+    search: str | None,
+) -> list:
+    conds = [
+        Product.seller_id == seller_id,
+        Order.created_at >= datetime.combine(start, time.min),
+        Order.created_at < datetime.combine(end + timedelta(days=1), time.min),
+    ]
+    if status:
+        conds.append(Order.status == STATUS_CODES[status])
+    if search and search.strip():
+        pattern = f"%{_escape_like(search.strip())}%"
+        conds.append(or_(
+            OrderItem.product_name.ilike(pattern, escape="\\"),
+            Order.user_name.ilike(pattern, escape="\\"),
+            Order.id.ilike(pattern, escape="\\"),
+        ))
+    return conds
+
+
+def _base(*cols):
+    return (
+        select(*cols)
+        .select_from(OrderItem)
+        .join(Product, Product.id == OrderItem.product_id)
+        .join(Order, Order.id == OrderItem.order_id)
+    )
+
+
+def _sale_to_dict(row) -> dict:
+    (item_id, order_id, created_at, product_name, category, subcategory,
+     client_name, qty, unit_price, status, product_rating) = row
+    return {
+        "id": item_id,
+        "order_id": order_id,
+        "invoice": order_id,
+        "date": created_at,
+        "product_name": product_name,
+        "category": category or SIN_CATEGORIA,
+        "subcategory": subcategory,
+        "client_name": client_name,
+        "quantity": qty,
+        "unit_price": unit_price,
+        "total": qty * unit_price,
+        "status": _STATUS_BY_LABEL.get((status or "").lower(), status),
+        "product_rating": float(product_rating) if product_rating is not None else None,
+    }
+
+
+def _summary(db: Session, conds: list) -> dict:
+    sales, orders, units, revenue, rating = db.execute(
+        _base(
+            func.count(),
+            func.count(func.distinct(OrderItem.order_id)),
+            func.coalesce(func.sum(OrderItem.quantity), 0),
+            func.coalesce(func.sum(_total), 0),
+            func.avg(Product.rating),
+        ).where(*conds)
+    ).one()
+    return {
+        "sales": sales,
+        "orders": orders,
+        "units": units,
+        "revenue": revenue,
+        "avg_product_rating": round(float(rating), 2) if rating is not None else None,
+    }
+
+
+def _by_category(db: Session, conds: list) -> list[dict]:
+    category = func.coalesce(OrderItem.category, "")
+    revenue = func.sum(_total).label("revenue")
+    rows = db.execute(
+        _base(category, func.count(), func.sum(OrderItem.quantity), revenue)
+        .where(*conds)
+        .group_by(category)
+        .order_by(revenue.desc())
+    ).all()
+    return [
+        {"category": cat or SIN_CATEGORIA, "sales": n, "units": units, "revenue": rev}
+        for cat, n, units, rev in rows
+    ]
+
+
+def _by_day(db: Session, conds: list) -> list[dict]:
+    day = func.date(Order.created_at, type_=Date)
+    rows = db.execute(
+        _base(day, func.count(), func.sum(OrderItem.quantity), func.sum(_total))
+        .where(*conds)
+        .group_by(day)
+        .order_by(day)
+    ).all()
+    return [{"date": d, "sales": n, "units": units, "revenue": rev} for d, n, units, rev in rows]
+
+
+@router.get("/history")
+def sales_history(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    status: Literal["DELIVERED", "SHIPPED", "PENDING"] | None = Query(None),
+    search: str | None = Query(None, max_length=100, description="producto, cliente o nro. de orden"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Cursor opaco de X-Next-Cursor"),
+    aggregate: Literal["summary", "category", "day", "all"] | None = Query(
+        None, description="en vez de las ventas, devuelve resúmenes calculados en la base",
+    ),
+    user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ventas del vendedor logueado (más nuevas primero), filtradas por rango de
+    fechas (por defecto los últimos 30 días), estado y búsqueda.
+
+    - por defecto: una página de ventas (limit + offset o limit + cursor)
+    - aggregate=summary|category|day|all: totales, por categoría y/o por día
+      con los mismos filtros, sin traer las ventas
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="Rango de fechas inválido")
+    conds = _filters(user.id, start, end, status, search)
+
+    if aggregate:
+        out = {}
+        if aggregate in ("summary", "all"):
+            out["summary"] = _summary(db, conds)
+        if aggregate in ("category", "all"):
+            out["by_category"] = _by_category(db, conds)
+        if aggregate in ("day", "all"):
+            out["by_day"] = _by_day(db, conds)
+        return FastJSONResponse(out)
+
+    stmt = (
+        _base(
+            OrderItem.id, OrderItem.order_id, Order.created_at, OrderItem.product_name,
+            OrderItem.category, OrderItem.subcategory, Order.user_name, OrderItem.quantity,
+            OrderItem.unit_price, Order.status, Product.rating,
+        )
+        .where(*conds)
+        .order_by(Order.created_at.desc(), OrderItem.id.desc())
+    )
+    if cursor:
+        stmt = stmt.where(after_cursor(Order.created_at, OrderItem.id, cursor))
+    elif offset:
+        stmt = stmt.offset(offset)
+    rows = db.execute(stmt.limit(limit)).all()
+
+    headers = {}
+    nxt = next_cursor(rows, limit)
+    if nxt:
+        headers[NEXT_CURSOR_HEADER] = nxt
+    return FastJSONResponse([_sale_to_dict(r) for r in rows], headers=headers)
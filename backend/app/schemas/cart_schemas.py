@@ -1,5 +1,6 @@
 # backend/app/schemas/cart_schemas.py
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List
 
 class CartItemOut(BaseModel):
@@ -11,6 +12,7 @@ class CartItemOut(BaseModel):
     image: str | None = None
     seller: str | None = None
     stock_snapshot: int
+    reserved_until: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,79 @@
+# backend/app/search/__init__.py
+"""
+Búsqueda de productos por texto (name, description, features, subcategory).
+
+Backend según la base:
+- SQLite con FTS5 -> Fts5ProductIndex (el índice vive en la misma base)
+- cualquier otra -> MemoryProductIndex (índice invertido en el proceso)
+
+Se puede forzar con SEARCH_BACKEND=fts5|memory. Los endpoints de productos
+llaman a index_product/unindex_product en alta, edición y baja lógica.
+"""
+import os
+import threading
+
+from ..db import engine
+from .fts5 import Fts5ProductIndex, fts5_available
+from .memory_index import MemoryProductIndex
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_product_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if SEARCH_BACKEND != "memory" and fts5_available(engine):
+                    idx = Fts5ProductIndex()
+                    with engine.begin() as conn:
+                        if idx.is_empty(conn):
+                            idx.rebuild(conn)
+                    _index = idx
+                else:
+                    _index = MemoryProductIndex()
+    return _index
+
+
+def index_product(db, product) -> None:
+    """Actualiza el producto en el índice (si está inactivo, lo saca)."""
+    get_product_index().upsert(db, product)
+
+
+def unindex_product(db, product_id: str) -> None:
+    get_product_index().remove(db, product_id)
+
+
+def search_product_ids(db, q: str, limit: int, offset: int = 0,
+                       category_id: str | None = None, seller_id: str | None = None) -> list[str]:
+    """
+    Página de ids de productos activos que matchean `q` (y la categoría /
+    vendedor, si vienen), ordenada por relevancia. Filtros y offset se aplican
+    dentro del índice, así que ninguna página pierde resultados.
+    """
+    hits = get_product_index().search(db, q, limit, offset, category_id=category_id, seller_id=seller_id)
+    return [pid for pid, _ in hits]
+
+
+def sort_by_ids(rows, ids: list[str]) -> list:
+    """Ordena filas/objetos con `.id` según la página de search_product_ids."""
+    rank = {pid: i for i, pid in enumerate(ids)}
+    return sorted(rows, key=lambda r: rank[r.id])
+
+
+def rebuild_product_index(db) -> int:
+    """Reindexa todos los productos activos. Devuelve cuántos indexó."""
+    return get_product_index().rebuild(db)
+
+
+__all__ = [
+    "get_product_index",
+    "index_product",
+    "unindex_product",
+    "search_product_ids",
+    "sort_by_ids",
+    "rebuild_product_index",
+]
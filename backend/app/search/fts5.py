@@ -0,0 +1,157 @@
+# backend/app/search/fts5.py
+"""
+Índice de productos sobre SQLite FTS5.
+
+- products_fts: tabla virtual con name/description/features/subcategory,
+  tokenizer unicode61 sin tildes e índices de prefijo de 2 y 3 letras.
+- products_fts_docs: product_id -> rowid de FTS. No usamos el rowid de
+  `products` porque VACUUM lo puede renumerar (la PK es texto).
+
+El ranking es bm25() con pesos por columna; cada término de la consulta se
+busca como prefijo ("auri"*).
+"""
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from ..models.models import Product
+from .text import tokenize
+
+# pesos bm25: name, description, features, subcategory
+_BM25 = "bm25(products_fts, 3.0, 1.0, 1.0, 2.0)"
+
+_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, features, subcategory,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products_fts_docs (
+        product_id VARCHAR PRIMARY KEY,
+        doc_id INTEGER NOT NULL UNIQUE
+    )
+    """,
+)
+
+
+def fts5_available(engine) -> bool:
+    """Crea las tablas si hace falta. Devuelve False si SQLite no trae FTS5."""
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            for ddl in _DDL:
+                conn.exec_driver_sql(ddl)
+        return True
+    except OperationalError:
+        return False
+
+
+def build_match(q: str) -> str | None:
+    """Convierte texto libre en una consulta MATCH segura: "tok"* AND "tok2"*"""
+    tokens = list(dict.fromkeys(tokenize(q)))
+    if not tokens:
+        return None
+    return " AND ".join(f'"{tok}"*' for tok in tokens)
+
+
+class Fts5ProductIndex:
+    backend = "fts5"
+
+    def _insert(self, db, doc_id: int | None, p) -> int:
+        params = {
+            "name": p.name or "",
+            "description": p.description or "",
+            "features": p.features or "",
+            "subcategory": p.subcategory or "",
+        }
+        if doc_id is None:
+            res = db.execute(
+                text("INSERT INTO products_fts(name, description, features, subcategory) "
+                     "VALUES (:name, :description, :features, :subcategory)"),
+                params,
+            )
+            return res.lastrowid
+        db.execute(
+            text("INSERT INTO products_fts(rowid, name, description, features, subcategory) "
+                 "VALUES (:doc_id, :name, :description, :features, :subcategory)"),
+            {"doc_id": doc_id, **params},
+        )
+        return doc_id
+
+    def _doc_id(self, db, product_id: str) -> int | None:
+        return db.execute(
+            text("SELECT doc_id FROM products_fts_docs WHERE product_id = :pid"),
+            {"pid": product_id},
+        ).scalar()
+
+    def upsert(self, db, product: Product) -> None:
+        doc_id = self._doc_id(db, product.id)
+        if doc_id is not None:
+            db.execute(text("DELETE FROM products_fts WHERE rowid = :doc_id"), {"doc_id": doc_id})
+        if not product.is_active:
+            if doc_id is not None:
+                db.execute(text("DELETE FROM products_fts_docs WHERE doc_id = :doc_id"), {"doc_id": doc_id})
+            return
+        new_id = self._insert(db, doc_id, product)
+        if doc_id is None:
+            db.execute(
+                text("INSERT INTO products_fts_docs(product_id, doc_id) VALUES (:pid, :doc_id)"),
+                {"pid": product.id, "doc_id": new_id},
+            )
+
+    def remove(self, db, product_id: str) -> None:
+        doc_id = self._doc_id(db, product_id)
+        if doc_id is None:
+            return
+        db.execute(text("DELETE FROM products_fts WHERE rowid = :doc_id"), {"doc_id": doc_id})
+        db.execute(text("DELETE FROM products_fts_docs WHERE doc_id = :doc_id"), {"doc_id": doc_id})
+
+    def rebuild(self, db) -> int:
+        # DROP + CREATE es mucho más rápido que borrar fila por fila de FTS5
+        db.execute(text("DROP TABLE IF EXISTS products_fts"))
+        db.execute(text("DROP TABLE IF EXISTS products_fts_docs"))
+        for ddl in _DDL:
+            db.execute(text(ddl))
+        db.execute(text(
+            "INSERT INTO products_fts_docs(product_id, doc_id) "
+            "SELECT id, ROW_NUMBER() OVER (ORDER BY id) FROM products WHERE is_active = 1"
+        ))
+        db.execute(text(
+            "INSERT INTO products_fts(rowid, name, description, features, subcategory) "
+            "SELECT d.doc_id, coalesce(p.name, ''), coalesce(p.description, ''), "
+            "coalesce(p.features, ''), coalesce(p.subcategory, '') "
+            "FROM products_fts_docs d JOIN products p ON p.id = d.product_id"
+        ))
+        return db.execute(text("SELECT count(*) FROM products_fts_docs")).scalar()
+
+    def is_empty(self, db) -> bool:
+        return db.execute(text("SELECT 1 FROM products_fts_docs LIMIT 1")).first() is None
+
+    def search(self, db, q: str, limit: int, offset: int = 0,
+               category_id: str | None = None, seller_id: str | None = None) -> list[tuple[str, float]]:
+        match = build_match(q)
+        if not match:
+            return []
+        # filtros y paginado dentro de la misma consulta: no se pierde ningún match
+        where = ["products_fts MATCH :match", "p.is_active = 1"]
+        params = {"match": match, "limit": limit, "offset": offset}
+        if category_id:
+            where.append("p.category_id = :category_id")
+            params["category_id"] = category_id
+        if seller_id:
+            where.append("p.seller_id = :seller_id")
+            params["seller_id"] = seller_id
+        rows = db.execute(
+            text(
+                f"SELECT d.product_id, {_BM25} AS score "
+                "FROM products_fts JOIN products_fts_docs d ON d.doc_id = products_fts.rowid "
+                "JOIN products p ON p.id = d.product_id "
+                f"WHERE {' AND '.join(where)} ORDER BY score LIMIT :limit OFFSET :offset"
+            ),
+            params,
+        ).all()
+        # bm25() de SQLite es "menor = mejor"; lo damos vuelta para que mayor = mejor
+        return [(pid, -score) for pid, score in rows]
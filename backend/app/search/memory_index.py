@@ -0,0 +1,225 @@
+# backend/app/search/memory_index.py
+"""
+Índice invertido en memoria (fallback cuando no hay FTS5).
+
+- Ranking BM25 con peso por campo (name pesa más que description).
+- Prefijos: cada término de la consulta matchea cualquier término indexado
+  que empiece igual ("auri" -> "auriculares"), vía bisect sobre la lista
+  ordenada de términos. Como en FTS5 no se pierde ninguno: si un prefijo
+  corto expande a más de MAX_PREFIX_EXPANSIONS términos y otro término ya
+  acotó los candidatos, en vez de recorrer todos esos postings se escanean
+  los términos de cada candidato (mismo puntaje, menos trabajo).
+- Semántica AND: el producto tiene que matchear todos los términos.
+
+El índice vive en el proceso: se carga completo en la primera búsqueda y
+después se mantiene con upsert/remove desde los endpoints de productos. Como
+con varios workers cada proceso tiene el suyo, cada SEARCH_MEMORY_SYNC_SECONDS
+una búsqueda trae además los productos con updated_at posterior a la última
+sincronización (altas, ediciones y bajas lógicas hechas en otros procesos);
+si la cantidad de activos no coincide (bajas físicas) se rearma completo.
+"""
+import heapq
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from ..models.models import Product
+from .text import tokenize
+
+FIELD_WEIGHTS = {"name": 3.0, "subcategory": 2.0, "features": 1.0, "description": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# con más expansiones que esto (y candidatos ya acotados) conviene escanear los candidatos
+MAX_PREFIX_EXPANSIONS = 64
+SEARCH_MEMORY_SYNC_SECONDS = float(os.getenv("SEARCH_MEMORY_SYNC_SECONDS", "5"))
+# las escrituras commitean después de fijar updated_at: se relee un margen
+SYNC_OVERLAP = timedelta(seconds=5)
+
+_COLUMNS = (Product.id, Product.name, Product.description, Product.features,
+            Product.subcategory, Product.category_id, Product.seller_id)
+
+
+class MemoryProductIndex:
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: dict[str, dict[str, float]] = {}  # término -> {product_id: tf ponderada}
+        self._doc_terms: dict[str, tuple[str, ...]] = {}  # product_id -> términos (para borrar)
+        self._doc_len: dict[str, float] = {}
+        self._doc_filters: dict[str, tuple[str | None, str | None]] = {}  # product_id -> (categoría, vendedor)
+        self._total_len = 0.0
+        self._terms_sorted: list[str] = []
+        self._terms_dirty = False
+        self._loaded = False
+        self._watermark = None     # mayor updated_at visto (sólo si se cargó de la base)
+        self._synced_at = 0.0
+
+    # ---------- mantenimiento ----------
+    def _add(self, product_id: str, fields: dict[str, str | None]) -> None:
+        self._doc_filters[product_id] = (fields.get("category_id"), fields.get("seller_id"))
+        tf: dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for tok in tokenize(fields.get(field)):
+                tf[tok] = tf.get(tok, 0.0) + weight
+        if not tf:
+            return
+        for term, w in tf.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._terms_dirty = True
+            posting[product_id] = w
+        length = sum(tf.values())
+        self._doc_terms[product_id] = tuple(tf)
+        self._doc_len[product_id] = length
+        self._total_len += length
+
+    def _remove(self, product_id: str) -> None:
+        self._doc_filters.pop(product_id, None)
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(product_id, None)
+                if not posting:
+                    del self._postings[term]
+                    self._terms_dirty = True
+        self._total_len -= self._doc_len.pop(product_id, 0.0)
+
+    def upsert(self, db, product: Product) -> None:
+        with self._lock:
+            self._remove(product.id)
+            if product.is_active:
+                self._add(product.id, _fields(product))
+
+    def remove(self, db, product_id: str) -> None:
+        with self._lock:
+            self._remove(product_id)
+
+    def rebuild(self, db) -> int:
+        stmt = (
+            select(*_COLUMNS)
+            .where(Product.is_active == True)
+            .execution_options(yield_per=5000)
+        )
+        with self._lock:
+            self._reset()
+            watermark = db.execute(select(func.max(Product.updated_at))).scalar()
+            n = 0
+            for row in db.execute(stmt):
+                self._add(row.id, row._asdict())
+                n += 1
+            self._loaded = True
+            self._watermark = watermark or datetime.min + SYNC_OVERLAP
+            self._synced_at = time.monotonic()
+            return n
+
+    def _sync(self, db) -> None:
+        """Trae los cambios hechos por otros procesos desde la última sincronización."""
+        self._synced_at = time.monotonic()
+        rows = db.execute(
+            select(*_COLUMNS, Product.is_active, Product.updated_at)
+            .where(Product.updated_at >= self._watermark - SYNC_OVERLAP)
+        ).all()
+        for row in rows:
+            self._remove(row.id)
+            if row.is_active:
+                self._add(row.id, row._asdict())
+            self._watermark = max(self._watermark, row.updated_at)
+        active = db.execute(select(func.count()).where(Product.is_active == True)).scalar()
+        if active != len(self._doc_filters):
+            self.rebuild(db)
+
+    # ---------- búsqueda ----------
+    def _expand(self, token: str) -> list[str]:
+        if self._terms_dirty:
+            self._terms_sorted = sorted(self._postings)
+            self._terms_dirty = False
+        lo = bisect_left(self._terms_sorted, token)
+        # "\U0010ffff" es mayor que cualquier caracter: corta justo después del último con el prefijo
+        return self._terms_sorted[lo:bisect_right(self._terms_sorted, token + "\U0010ffff", lo)]
+
+    def _bm25(self, term: str, pid: str, n_docs: int, avg_len: float) -> float:
+        posting = self._postings[term]
+        idf = _idf(n_docs, len(posting))
+        tf = posting[pid]
+        norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[pid] / avg_len)
+        return idf * tf * (BM25_K1 + 1) / norm
+
+    def search(self, db, q: str, limit: int, offset: int = 0,
+               category_id: str | None = None, seller_id: str | None = None) -> list[tuple[str, float]]:
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._loaded:
+                self.rebuild(db)
+            elif self._watermark is not None and time.monotonic() - self._synced_at >= SEARCH_MEMORY_SYNC_SECONDS:
+                self._sync(db)
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+
+            # empezamos por el término más raro: la intersección se achica antes
+            expanded = [(tok, self._expand(tok)) for tok in dict.fromkeys(tokens)]
+            expanded.sort(key=lambda e: sum(len(self._postings[t]) for t in e[1]))
+
+            scores: dict[str, float] | None = None
+            for token, terms in expanded:
+                token_scores: dict[str, float] = {}
+                if scores is not None and len(terms) > MAX_PREFIX_EXPANSIONS:
+                    # prefijo corto: se miran los términos de cada candidato
+                    for pid in scores:
+                        for term in self._doc_terms[pid]:
+                            if term.startswith(token):
+                                token_scores[pid] = token_scores.get(pid, 0.0) + self._bm25(term, pid, n_docs, avg_len)
+                else:
+                    for term in terms:
+                        posting = self._postings[term]
+                        idf = _idf(n_docs, len(posting))
+                        for pid, tf in posting.items():
+                            if scores is not None and pid not in scores:
+                                continue
+                            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[pid] / avg_len)
+                            token_scores[pid] = token_scores.get(pid, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pid: s + token_scores[pid] for pid, s in scores.items() if pid in token_scores}
+                if not scores:
+                    return []
+
+            if category_id or seller_id:
+                scores = {
+                    pid: s for pid, s in scores.items()
+                    if (not category_id or self._doc_filters[pid][0] == category_id)
+                    and (not seller_id or self._doc_filters[pid][1] == seller_id)
+                }
+            return heapq.nlargest(offset + limit, scores.items(), key=lambda kv: kv[1])[offset:]
+
+
+def _idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def _fields(p: Product) -> dict[str, str | None]:
+    return {
+        "name": p.name,
+        "description": p.description,
+        "features": p.features,
+        "subcategory": p.subcategory,
+        "category_id": getattr(p, "category_id", None),
+        "seller_id": getattr(p, "seller_id", None),
+    }
@@ -0,0 +1,17 @@
+# backend/app/search/text.py
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def normalize(text: str | None) -> str:
+    """Minúsculas y sin tildes (mismo criterio que unicode61 remove_diacritics)."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalize(text))
@@ -1,37 +1,139 @@
 # backend/app/security/__init__.py
-from passlib.context import CryptContext
-from fastapi import HTTPException, status
+import anyio.to_thread
+from fastapi import Header, HTTPException, status
 
-from .tokens import create_access_token, SECRET_KEY, ALGORITHM  # 👈 reexportamos
+from .. import metrics
+from ..principals import Principal, principal_from_claims
+from .revocation import revocations, token_cache
+from .tokens import REFRESH, create_access_token, decode_token, SECRET_KEY, ALGORITHM  # 👈 reexportamos
 # OJO: NO volvemos a importar tokens acá para evitar bucles raros
 
-# Usamos pbkdf2_sha256 como scheme para las contraseñas
-pwd_ctx = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# pbkdf2_sha256 (ver app/passwords.py); en los requests conviene hash_pool
+from ..passwords import hash_password, pwd_ctx, verify_and_update, verify_password  # 👈 reexportamos
 
 
-def hash_password(p: str) -> str:
-    """Hashea una contraseña en texto plano."""
-    return pwd_ctx.hash(p)
-
-
-def verify_password(p: str, h: str) -> bool:
-    """Verifica una contraseña vs el hash almacenado."""
-    return pwd_ctx.verify(p, h)
-
-
-def require_vendor(user):
+def role_codes(user) -> set[str] | frozenset[str]:
     """
-    Verifica que el usuario tenga el rol VENDEDOR.
-    Usa user.roles y cada elemento debe tener .role.code
+    Códigos de rol de un Principal (ya los trae, sin queries) o de un User
+    del ORM (user.roles, cada elemento con .role.code).
     """
-    codes = {
+    codes = getattr(user, "role_codes", None)
+    if codes is not None:
+        return codes
+    return {
         ur.role.code
         for ur in getattr(user, "roles", [])
         if getattr(ur, "role", None)
     }
 
-    if "VENDEDOR" not in codes:
+
+def require_vendor(user):
+    """
+    Verifica que el usuario (User o Principal) tenga el rol VENDEDOR.
+    """
+    if "VENDEDOR" not in role_codes(user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Se requiere rol VENDEDOR.",
         )
+
+
+def verified_claims(token: str) -> dict:
+    """
+    Claims de un token con firma, exp y revocación chequeadas; 401 si no.
+    Un token ya visto sale de token_cache sin HMAC ni JSON, y sin mirar la
+    revocación si no hubo revocaciones nuevas desde que se chequeó
+    (ver revocation.py). Los claims son compartidos: no modificarlos.
+    """
+    key = token_cache.digest(token)
+    version = revocations.version
+    cached = token_cache.get(key)
+    if cached is not None:
+        metrics.inc("token_cache_hits_total")
+        claims, checked = cached
+        if checked == version:
+            return claims
+    else:
+        metrics.inc("token_cache_misses_total")
+        try:
+            claims = decode_token(token)
+        except Exception:
+            claims = {}
+        if not claims.get("sub"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token inválido",
+            )
+        claims.setdefault("jti", token.rsplit(".", 1)[-1])
+
+    if revocations.is_revoked(claims):
+        token_cache.discard(key)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+        )
+    token_cache.put(key, claims, version)
+    return claims
+
+
+def access_claims(authorization: str | None) -> dict:
+    """
+    Claims del access token del header Authorization: Bearer <token>.
+    401 si falta, no valida, está revocado o es un refresh token (esos sólo
+    van a /auth/refresh).
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Falta token",
+        )
+    claims = verified_claims(authorization.split(" ", 1)[1])
+    if claims.get("typ") == REFRESH:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+        )
+    return claims
+
+
+async def access_claims_async(authorization: str | None) -> dict:
+    """
+    access_claims para dependencias async. Un token ya verificado con la
+    versión actual del filtro sale de token_cache sin dejar el event loop;
+    si no, la verificación (HMAC y, en un positivo del filtro, la tabla de
+    revocaciones) corre en el threadpool.
+    """
+    if authorization and authorization.startswith("Bearer "):
+        cached = token_cache.get(token_cache.digest(authorization.split(" ", 1)[1]))
+        if cached is not None:
+            claims, checked = cached
+            if checked == revocations.version and claims.get("typ") != REFRESH:
+                metrics.inc("token_cache_hits_total")
+                return claims
+    return await anyio.to_thread.run_sync(access_claims, authorization)
+
+
+def require_roles(*codes: str):
+    """
+    Dependencia sin estado: autoriza sólo con los claims firmados del token
+    (no abre sesión ni consulta users/roles). Alcanza con tener uno de `codes`.
+    Tokens viejos, sin claim de roles, tienen que renovarse (401).
+    """
+    def dependency(authorization: str | None = Header(default=None)) -> Principal:
+        principal = principal_from_claims(access_claims(authorization))
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token sin roles: volvé a iniciar sesión",
+            )
+        if not principal.role_codes.intersection(codes):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Se requiere rol {' o '.join(codes)}.",
+            )
+        return principal
+
+    return dependency
+
+
+require_admin = require_roles("ADMIN")
@@ -0,0 +1,138 @@
+# backend/app/security/hash_pool.py
+"""
+Pool de procesos para hashear / verificar contraseñas.
+
+pbkdf2 es CPU puro y no suelta el GIL: corrido en los hilos del request, una
+ráfaga de logins llena el threadpool y frena a todos los endpoints. Acá se
+manda a HASH_WORKERS procesos (por defecto, uno por core) y el hilo del
+request sólo espera el resultado.
+
+Con más de HASH_MAX_PENDING hashes encolados o en curso, los nuevos se
+rechazan con 503 + Retry-After en lugar de hacer cola (login y alta de
+usuario). Con HASH_WORKERS=0 se hashea en el mismo hilo (sin pool, pero con
+el mismo límite).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from .. import metrics
+from .. import passwords
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(8 * max(HASH_WORKERS, 1))))
+HASH_TIMEOUT_SECONDS = float(os.getenv("HASH_TIMEOUT_SECONDS", "10"))
+# spawn: los procesos no heredan hilos ni conexiones abiertas de la API
+HASH_POOL_START_METHOD = os.getenv("HASH_POOL_START_METHOD", "spawn")
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Demasiados logins en curso, reintentá en unos segundos",
+        headers={"Retry-After": "1"},
+    )
+
+
+class HashPool:
+    """ProcessPoolExecutor perezoso con un tope de trabajos pendientes."""
+
+    def __init__(self, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING,
+                 timeout: float = HASH_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args) -> Future:
+        """Encola fn(*args); 503 si ya hay max_pending. fn tiene que ser picklable."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.inc("hash_pool_rejected_total")
+                raise _overloaded()
+            self._pending += 1
+        try:
+            fut = self._submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        fut.add_done_callback(lambda _: self._release())
+        return fut
+
+    def run(self, fn, *args):
+        """submit + esperar el resultado (para rutas sync, desde el hilo del request)."""
+        try:
+            return self.submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeout:
+            metrics.inc("hash_pool_timeouts_total")
+            raise _overloaded()
+
+    async def run_async(self, fn, *args):
+        """Como run, sin ocupar un hilo (rutas async)."""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.submit(fn, *args)), self.timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("hash_pool_timeouts_total")
+            raise _overloaded()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self._pending, "max_pending": self.max_pending}
+
+    def _submit(self, fn, *args) -> Future:
+        if self.workers <= 0:
+            fut: Future = Future()
+            try:
+                fut.set_result(fn(*args))
+            except Exception as exc:
+                fut.set_exception(exc)
+            return fut
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # un proceso murió (OOM, kill): se arma un pool nuevo y se reintenta una vez
+            with self._lock:
+                self._executor = None
+            return self._get_executor().submit(fn, *args)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(HASH_POOL_START_METHOD),
+                )
+            return self._executor
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+hash_pool = HashPool()
+metrics.register_provider("hash_pool", hash_pool.stats)
+
+
+def hash_password_pooled(p: str) -> str:
+    return hash_pool.run(passwords.hash_password, p)
+
+
+def verify_and_update_pooled(p: str, h: str) -> tuple[bool, str | None]:
+    return hash_pool.run(passwords.verify_and_update, p, h)
+
+
+async def verify_and_update_async(p: str, h: str) -> tuple[bool, str | None]:
+    return await hash_pool.run_async(passwords.verify_and_update, p, h)
@@ -0,0 +1,245 @@
+# backend/app/security/revocation.py
+"""
+Revocación de tokens: tabla revoked_tokens + Bloom filter en memoria.
+
+- logout revoca el jti del access token (y del refresh token si lo mandan)
+- bloquear un usuario revoca "user:<id>": todos sus tokens con iat anterior
+
+En cada request el chequeo es el Bloom filter (O(1), sin query): si ni el
+jti ni "user:<id>" están, el token no está revocado. Sólo si el filtro dice
+"quizás" (revocado de verdad o falso positivo, ~REVOCATION_BLOOM_ERROR) se
+confirma contra la tabla. Además VerifiedTokenCache guarda la versión del
+filtro con la que se chequeó cada token y no lo vuelve a mirar hasta que
+haya una revocación nueva.
+
+El filtro se arma de la tabla la primera vez que se usa y lo rearma el
+worker RevocationRefresher (workers/revocation.py), que también purga las
+filas vencidas: así cada instancia se entera de las revocaciones hechas en
+las otras a más tardar en REVOCATION_REFRESH_SECONDS.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+
+from .. import db as database
+from .. import metrics
+from ..models.models import RevokedToken
+from .tokens import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH, REFRESH_TOKEN_EXPIRE_DAYS
+
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR = float(os.getenv("REVOCATION_BLOOM_ERROR", "0.001"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "50000"))
+
+
+class BloomFilter:
+    """Bloom filter sobre un bytearray; k posiciones por doble hashing de blake2b."""
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR):
+        self.m = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+# db.info[PENDING_REVOCATIONS]: claves revocadas en la transacción en curso
+PENDING_REVOCATIONS = "pending_revocations"
+
+
+def _issued_at(claims: dict) -> float:
+    """iat del token; los emitidos antes de que existiera lo deducen de exp y su vida."""
+    if "iat" in claims:
+        return float(claims["iat"])
+    if claims.get("typ") == REFRESH:
+        return claims["exp"] - REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    return claims["exp"] - ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class RevocationList:
+    """Bloom filter de claves revocadas; `version` sube con cada revocación o rearmado."""
+
+    def __init__(self):
+        self.bloom = BloomFilter()
+        self.version = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # claves publicadas mientras corre un load(): su SELECT puede no verlas
+        self._loading = 0
+        self._seq = 0
+        self._published_during_load: list[tuple[int, str]] = []
+
+    def load(self, db: Session) -> int:
+        """
+        Rearma el filtro con las revocaciones vigentes de la tabla. Las que
+        se publican mientras tanto se agregan al filtro nuevo antes del
+        cambio, así no se pierden aunque el SELECT no las haya visto.
+        """
+        with self._lock:
+            self._loading += 1
+            since = self._seq
+        try:
+            keys = db.execute(
+                select(RevokedToken.key).where(RevokedToken.expires_at > datetime.utcnow())
+            ).scalars().all()
+            bloom = BloomFilter()
+            for key in keys:
+                bloom.add(key)
+            with self._lock:
+                for seq, key in self._published_during_load:
+                    if seq > since:
+                        bloom.add(key)
+                self.bloom = bloom
+                self.version += 1
+                self._loaded = True
+        finally:
+            with self._lock:
+                self._loading -= 1
+                if not self._loading:
+                    self._published_during_load.clear()
+        metrics.set_gauge("revoked_tokens", len(keys))
+        return len(keys)
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            with database.SessionLocal() as db:
+                self.load(db)
+
+    def revoke(self, db: Session, key: str, expires_at: datetime) -> None:
+        """
+        Agrega la revocación (el commit lo hace el router). Entra al filtro
+        recién después del commit (ver _publish_revocations); antes, otro
+        request que ve la versión nueva la buscaría en la tabla y no la
+        encontraría.
+        """
+        db.merge(RevokedToken(key=key, revoked_at=datetime.utcnow(), expires_at=expires_at))
+        db.info.setdefault(PENDING_REVOCATIONS, []).append(key)
+        self.ensure_loaded()
+
+    def publish(self, keys) -> None:
+        """Suma al filtro revocaciones ya commiteadas."""
+        with self._lock:
+            for key in keys:
+                self.bloom.add(key)
+                if self._loading:
+                    self._seq += 1
+                    self._published_during_load.append((self._seq, key))
+            self.version += 1
+        metrics.inc("tokens_revoked_total", len(keys))
+
+    def revoke_claims(self, db: Session, claims: dict) -> None:
+        """Revoca un token ya verificado (logout)."""
+        self.revoke(db, claims["jti"], datetime.utcfromtimestamp(claims["exp"]))
+
+    def revoke_user(self, db: Session, user_id: str) -> None:
+        """Revoca todos los tokens emitidos hasta ahora (el refresh es el que más dura)."""
+        self.revoke(db, user_key(user_id), datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+
+    def is_revoked(self, claims: dict) -> bool:
+        self.ensure_loaded()
+        candidates = [k for k in (claims["jti"], user_key(claims["sub"])) if k in self.bloom]
+        if not candidates:
+            return False
+        metrics.inc("revocation_bloom_positives_total")
+        with database.SessionLocal() as db:
+            rows = db.execute(
+                select(RevokedToken.key, RevokedToken.revoked_at).where(RevokedToken.key.in_(candidates))
+            ).all()
+        for key, revoked_at in rows:
+            if key == claims["jti"]:
+                return True
+            # los dos con microsegundos (ver create_access_token): un token emitido
+            # en el mismo segundo pero después de la revocación sigue valiendo
+            if _issued_at(claims) < revoked_at.replace(tzinfo=timezone.utc).timestamp():
+                return True
+        return False
+
+    def purge_expired(self, db: Session) -> int:
+        n = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())).rowcount
+        db.commit()
+        return n
+
+
+class VerifiedTokenCache:
+    """
+    LRU de tokens ya verificados: digest del token -> (exp, claims, versión
+    del filtro con la que se chequeó). Cada entrada se descarta al llegar a exp.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> tuple[dict, int] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            exp, claims, version = entry
+            if exp <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims, version
+
+    def put(self, key: bytes, claims: dict, version: int) -> None:
+        with self._lock:
+            self._entries[key] = (claims.get("exp", 0), claims, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: bytes) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+revocations = RevocationList()
+token_cache = VerifiedTokenCache()
+metrics.register_provider("token_cache", lambda: {"entries": len(token_cache)})
+
+
+# ---------- las revocaciones entran al filtro al commitear ----------
+@event.listens_for(database.PrimarySession, "after_commit")
+def _publish_revocations(session):
+    keys = session.info.pop(PENDING_REVOCATIONS, None)
+    if keys:
+        revocations.publish(keys)
+
+
+@event.listens_for(database.PrimarySession, "after_rollback")
+def _drop_revocations(session):
+    session.info.pop(PENDING_REVOCATIONS, None)
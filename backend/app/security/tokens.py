@@ -1,20 +1,73 @@
 # backend/app/security/tokens.py
-from datetime import datetime, timedelta
+"""
+JWT de la API.
+
+- access token: `sub` (user.id), `roles` y `estado` firmados, vida corta
+  (ACCESS_TOKEN_EXPIRE_MINUTES). Con eso se autoriza sin ir a la base.
+- refresh token: sólo `sub`, vida larga (REFRESH_TOKEN_EXPIRE_DAYS); en
+  POST /auth/refresh se cambia por un par nuevo con roles/estado releídos.
+  Un cambio de roles o de estado llega al token, a más tardar, al vencer el
+  access token.
+- logout y el bloqueo de un usuario revocan tokens antes de que venzan
+  (security/revocation.py).
+"""
+from datetime import datetime, timedelta, timezone
 from jose import jwt
 import os
+import uuid
 
 # Usamos SIEMPRE la misma clave y algoritmo en todo el sistema
 SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-key")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 día
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+ACCESS = "access"
+REFRESH = "refresh"
+
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Genera un JWT con los datos de `data` y expiración.
-    En `sub` guardamos el user.id.
+    En `sub` guardamos el user.id; `jti` identifica al token (cache de
+    principals, logout) e `iat` permite revocar todo lo emitido antes de un
+    bloqueo (ver revocation.py). `iat` va con microsegundos (NumericDate
+    admite decimales): en segundos enteros no se distingue un token emitido
+    justo antes del bloqueo de uno emitido justo después.
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "iat": now.replace(tzinfo=timezone.utc).timestamp()})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return token
+
+
+def create_token_pair(user_id: str, roles: list[str], estado: str) -> dict:
+    """access token con claims de autorización + refresh token para renovarlo."""
+    return {
+        "access_token": create_access_token(
+            {"sub": user_id, "typ": ACCESS, "roles": sorted(roles), "estado": estado}
+        ),
+        "refresh_token": create_access_token(
+            {"sub": user_id, "typ": REFRESH}, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        ),
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def decode_token(token: str) -> dict:
+    """Claims del token si la firma y `exp` validan; si no, lanza jose.JWTError."""
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def token_subject(authorization: str | None) -> str | None:
+    """`sub` del header "Bearer <token>" si el token es válido; si no, None (no lanza)."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        payload = decode_token(authorization.split(" ", 1)[1])
+    except Exception:
+        return None
+    return payload.get("sub")
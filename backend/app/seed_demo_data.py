@@ -8,6 +8,8 @@ from .models.models import (
     Product, Order, OrderItem, Payment
 )
 from .security import hash_password
+from .search import rebuild_product_index
+from .analytics import rebuild_rollups
 
 
 def get_or_create_role(db, code: str, nombre: str):
@@ -358,6 +360,9 @@ def main():
         data_users = crear_usuarios_y_roles(db)
         productos = crear_productos_demo(db, data_users["vendor1"], data_users["vendor2"])
         crear_ordenes_demo(db, data_users, productos)
+        rebuild_product_index(db)
+        rebuild_rollups(db)
+        db.commit()
         print("✅ Datos de demo cargados correctamente.")
         print("  Admin: admin@mktlab.com / Admin123!")
         print("  Vendedor1: vendedora.julia@mktlab.com / Julia123!")
@@ -0,0 +1,70 @@
+# backend/app/streaming.py
+"""
+Respuestas en streaming para listados grandes.
+
+El generador abre su propia sesión (no usa la del request) y lee con
+yield_per, así que la memoria queda acotada a un lote de filas sin importar
+cuántas devuelva la consulta. Son lecturas largas: van a la réplica si hay
+(DATABASE_READ_URL).
+"""
+import csv
+import io
+import os
+from datetime import date, datetime
+from typing import Callable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+
+from .db import ReadSessionLocal
+from .responses import dumps
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "2000"))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def iter_row_batches(stmt, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list]:
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for rows in result.partitions(batch_size):
+            yield rows
+    finally:
+        db.close()
+
+
+def ndjson_response(stmt, serialize: Callable, batch_size: int = STREAM_BATCH_SIZE,
+                    headers: dict | None = None) -> StreamingResponse:
+    """Una línea JSON por fila; serialize(fila) -> dict."""
+    def body():
+        for rows in iter_row_batches(stmt, batch_size):
+            yield b"".join(dumps(serialize(r)) + b"\n" for r in rows)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_response(stmt, columns: Sequence[str], filename: str,
+                 batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """CSV con encabezado `columns`; cada fila de la consulta va en ese orden."""
+    def body():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        for rows in iter_row_batches(stmt, batch_size):
+            writer.writerows([_csv_value(v) for v in row] for row in rows)
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue().encode("utf-8")
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,56 @@
+# backend/app/workers/__init__.py
+"""
+Tareas periódicas que corren en hilos del proceso de la API.
+
+Se arrancan en el startup de la app y se paran en el shutdown. Con
+BACKGROUND_WORKERS=0 no se arranca ninguna (por ejemplo si hay varias
+réplicas y sólo una debe barrer).
+
+Si DATABASE_READ_URL es otro archivo SQLite, también se arranca el worker
+que lo refresca desde el primario (la primera copia se hace al arrancar).
+
+RevocationRefresher trae a esta instancia las revocaciones de tokens hechas
+en las otras: con BACKGROUND_WORKERS=0 sólo se ven las propias y las que
+había en la tabla al primer uso.
+
+SalesEngineRefresher carga el motor columnar de los dashboards locales al
+arrancar y lo pone al día en segundo plano; sin él, lo carga el primer
+request que lo necesita.
+"""
+import os
+
+from .analytics import SalesEngineRefresher
+from .base import PeriodicWorker
+from .idempotency import IdempotencyPurger
+from .replica import SqliteReplicaRefresher
+from .reservations import ReservationSweeper
+from .revocation import RevocationRefresher
+from .rollups import RollupOutboxWorker
+
+BACKGROUND_WORKERS = os.getenv("BACKGROUND_WORKERS", "1") != "0"
+
+_running: list[PeriodicWorker] = []
+
+
+def start_workers() -> None:
+    if not BACKGROUND_WORKERS or _running:
+        return
+    _running.extend([ReservationSweeper(), IdempotencyPurger(), RollupOutboxWorker(), RevocationRefresher(),
+                     SalesEngineRefresher()])
+    refresher = SqliteReplicaRefresher.from_env()
+    if refresher:
+        refresher.run_once()
+        _running.append(refresher)
+    for worker in _running:
+        worker.start()
+
+
+def stop_workers() -> None:
+    for worker in _running:
+        worker.stop()
+    _running.clear()
+
+
+__all__ = ["PeriodicWorker", "ReservationSweeper", "IdempotencyPurger", "RollupOutboxWorker",
+           "SqliteReplicaRefresher", "RevocationRefresher", "SalesEngineRefresher",
+           "start_workers", "stop_workers"]
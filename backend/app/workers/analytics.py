@@ -0,0 +1,21 @@
+# backend/app/workers/analytics.py
+"""
+Mantiene al día el motor columnar de los dashboards locales
+(analytics/columnar.py): la carga completa apenas arranca la app y después
+el catch-up del outbox cada ANALYTICS_REFRESH_SECONDS, fuera de los requests.
+"""
+from ..analytics.columnar import ANALYTICS_REFRESH_SECONDS, get_sales_engine
+from .base import PeriodicWorker
+
+
+class SalesEngineRefresher(PeriodicWorker):
+    name = "sales-engine-refresher"
+    run_at_start = True
+
+    def __init__(self, interval: float = ANALYTICS_REFRESH_SECONDS):
+        super().__init__(interval)
+
+    def run_once(self) -> int:
+        engine = get_sales_engine()
+        engine.background = True  # desde ahora los requests sólo leen el snapshot
+        return len(engine.refresh(force=True).base["seller"])
@@ -0,0 +1,44 @@
+# backend/app/workers/base.py
+"""
+Hilo de fondo que ejecuta una tarea cada `interval` segundos.
+
+Cada worker implementa run_once(); los errores se loguean y el hilo sigue
+vivo hasta que se llama a stop(). Con run_at_start la primera pasada es
+apenas arranca el hilo (precalentar algo) en vez de después de `interval`.
+"""
+import abc
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class PeriodicWorker(threading.Thread, abc.ABC):
+    name = "periodic-worker"
+    run_at_start = False
+
+    def __init__(self, interval: float):
+        super().__init__(name=self.name, daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    @abc.abstractmethod
+    def run_once(self) -> object:
+        """Una pasada de la tarea; lo que devuelve es para tests y benchmarks."""
+
+    def run(self) -> None:
+        if self.run_at_start:
+            self._tick()
+        while not self._stop_event.wait(self.interval):
+            self._tick()
+
+    def _tick(self) -> None:
+        try:
+            self.run_once()
+        except Exception:
+            log.exception("Error en worker %s", self.name)
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,36 @@
+# backend/app/workers/idempotency.py
+"""
+Purga periódica de Idempotency-Keys vencidas (ver app/idempotency.py).
+"""
+import os
+
+from .. import metrics
+from ..db import SessionLocal
+from ..idempotency import purge_expired
+from .base import PeriodicWorker
+
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+
+
+class IdempotencyPurger(PeriodicWorker):
+    name = "idempotency-purger"
+
+    def __init__(self, interval: float = IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+                 batch_size: int = IDEMPOTENCY_PURGE_BATCH_SIZE):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    def run_once(self) -> int:
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                n = purge_expired(db, batch_size=self.batch_size)
+                total += n
+                if n < self.batch_size:
+                    break
+        finally:
+            db.close()
+        metrics.inc("idempotency_keys_purged_total", total)
+        return total
@@ -0,0 +1,64 @@
+# backend/app/workers/replica.py
+"""
+Réplica local para desarrollo / tests: copia el SQLite primario a otro
+archivo (DATABASE_READ_URL) cada REPLICA_REFRESH_SECONDS con la API de
+backup de SQLite. Con una réplica real (MySQL) este worker no arranca.
+"""
+import os
+import sqlite3
+import time
+
+from sqlalchemy.engine import make_url
+
+from .. import metrics
+from ..db import DATABASE_READ_URL, DATABASE_URL
+from .base import PeriodicWorker
+
+REPLICA_REFRESH_SECONDS = float(os.getenv("REPLICA_REFRESH_SECONDS", "5"))
+
+
+def sqlite_path(url: str | None) -> str | None:
+    """Ruta del archivo si `url` es un SQLite en disco; si no, None."""
+    if not url:
+        return None
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return parsed.database
+
+
+def copy_sqlite(src_path: str, dst_path: str) -> None:
+    """Copia consistente de src sobre dst (los lectores de dst ven el cambio de una)."""
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path, timeout=30)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+class SqliteReplicaRefresher(PeriodicWorker):
+    name = "sqlite-replica-refresher"
+
+    def __init__(self, primary_path: str, replica_path: str,
+                 interval: float = REPLICA_REFRESH_SECONDS):
+        super().__init__(interval)
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+
+    @classmethod
+    def from_env(cls) -> "SqliteReplicaRefresher | None":
+        primary, replica = sqlite_path(DATABASE_URL), sqlite_path(DATABASE_READ_URL)
+        if not primary or not replica or primary == replica:
+            return None
+        return cls(primary, replica)
+
+    def run_once(self) -> float:
+        t0 = time.perf_counter()
+        copy_sqlite(self.primary_path, self.replica_path)
+        elapsed = round(time.perf_counter() - t0, 4)
+        metrics.inc("replica_refresh_total")
+        metrics.set_gauge("replica_last_refresh_seconds", elapsed)
+        metrics.set_gauge("replica_refreshed_at", time.time())
+        return elapsed
@@ -0,0 +1,47 @@
+# backend/app/workers/reservations.py
+"""
+Sweeper de reservas de carrito: cada CART_SWEEP_INTERVAL_SECONDS libera los
+ítems cuya reserva venció y devuelve las unidades a Product.stock, en lotes
+de CART_SWEEP_BATCH_SIZE.
+"""
+import os
+import time
+
+from .. import metrics
+from ..crud.cart_crud import release_expired_reservations
+from ..db import SessionLocal
+from .base import PeriodicWorker
+
+CART_SWEEP_INTERVAL_SECONDS = float(os.getenv("CART_SWEEP_INTERVAL_SECONDS", "60"))
+CART_SWEEP_BATCH_SIZE = int(os.getenv("CART_SWEEP_BATCH_SIZE", "500"))
+
+
+class ReservationSweeper(PeriodicWorker):
+    name = "cart-reservation-sweeper"
+
+    def __init__(self, interval: float = CART_SWEEP_INTERVAL_SECONDS,
+                 batch_size: int = CART_SWEEP_BATCH_SIZE):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    def run_once(self) -> tuple[int, int]:
+        t0 = time.perf_counter()
+        items = units = 0
+        db = SessionLocal()
+        try:
+            while True:
+                n_items, n_units = release_expired_reservations(db, batch_size=self.batch_size)
+                items += n_items
+                units += n_units
+                if n_items < self.batch_size:
+                    break
+        finally:
+            db.close()
+
+        metrics.inc("cart_reservation_sweeps_total")
+        metrics.inc("cart_reservation_items_released_total", items)
+        metrics.inc("cart_reservation_units_released_total", units)
+        metrics.set_gauge("cart_reservation_last_sweep_items", items)
+        metrics.set_gauge("cart_reservation_last_sweep_units", units)
+        metrics.set_gauge("cart_reservation_last_sweep_seconds", round(time.perf_counter() - t0, 4))
+        return items, units
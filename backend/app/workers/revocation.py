@@ -0,0 +1,30 @@
+# backend/app/workers/revocation.py
+"""
+Rearma el Bloom filter de tokens revocados desde la tabla y purga las
+revocaciones vencidas (ver security/revocation.py).
+"""
+import os
+
+from .. import metrics
+from ..db import SessionLocal
+from ..security.revocation import revocations
+from .base import PeriodicWorker
+
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "30"))
+
+
+class RevocationRefresher(PeriodicWorker):
+    name = "revocation-refresher"
+
+    def __init__(self, interval: float = REVOCATION_REFRESH_SECONDS):
+        super().__init__(interval)
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            purged = revocations.purge_expired(db)
+            loaded = revocations.load(db)
+        finally:
+            db.close()
+        metrics.inc("revoked_tokens_purged_total", purged)
+        return loaded
@@ -0,0 +1,46 @@
+# backend/app/workers/rollups.py
+"""
+Consumidor del outbox de órdenes: cada OUTBOX_POLL_INTERVAL_SECONDS suma
+los eventos nuevos a los rollups de analytics en lotes de
+OUTBOX_BATCH_SIZE hasta ponerse al día (ver app/analytics/outbox.py).
+"""
+import os
+import time
+
+from .. import metrics
+from ..analytics.outbox import consume_batch, pending_events
+from ..db import SessionLocal
+from .base import PeriodicWorker
+
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "1000"))
+
+
+class RollupOutboxWorker(PeriodicWorker):
+    name = "rollup-outbox-worker"
+    consumer = "sales_rollups"
+
+    def __init__(self, interval: float = OUTBOX_POLL_INTERVAL_SECONDS,
+                 batch_size: int = OUTBOX_BATCH_SIZE):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    def run_once(self) -> int:
+        t0 = time.perf_counter()
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                n, offset = consume_batch(db, self.consumer, batch_size=self.batch_size)
+                total += n
+                if n < self.batch_size:
+                    break
+            lag = pending_events(db, self.consumer)
+        finally:
+            db.close()
+
+        metrics.inc("outbox_events_processed_total", total)
+        metrics.set_gauge("outbox_high_water_mark", offset)
+        metrics.set_gauge("outbox_lag_events", lag)
+        metrics.set_gauge("outbox_last_run_seconds", round(time.perf_counter() - t0, 4))
+        return total
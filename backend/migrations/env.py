@@ -0,0 +1,54 @@
+# backend/migrations/env.py
+"""
+Entorno de Alembic: misma DATABASE_URL y mismos modelos que la app.
+
+Con sqlalchemy.url en la config (p. ej. desde los tests) se usa esa URL.
+En SQLite las migraciones corren en modo batch (ALTER TABLE limitado).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from backend.app.db import DATABASE_URL, Base
+from backend.app.models import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+url = config.get_main_option("sqlalchemy.url") or DATABASE_URL
+render_as_batch = url.startswith("sqlite")
+
+
+def run_migrations_offline() -> None:
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)."""
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=render_as_batch,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=render_as_batch,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
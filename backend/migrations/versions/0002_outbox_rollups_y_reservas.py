@@ -0,0 +1,131 @@
+"""outbox, rollups y reservas
+
+- cart_items.reserved_until (reservas de stock con vencimiento)
+- idempotency_keys (Idempotency-Key en carrito / checkout)
+- order_outbox + outbox_offsets (eventos de órdenes y su consumidor)
+- sales_rollup_daily / sales_rollup_day_totals / sales_sketches_daily
+- índices: order_items(product_id), products(is_active, created_at, id)
+
+Los rollups y sketches se llenan con el backfill:
+    python -m backend.app.analytics.backfill
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 11:48:42.283867
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('idempotency_keys',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('fingerprint', sa.String(length=32), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'key')
+    )
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_idempotency_keys_expires_at'), ['expires_at'], unique=False)
+
+    op.create_table('order_outbox',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.String(length=36), nullable=False),
+    sa.Column('event_type', sa.String(length=30), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('order_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_outbox_order_id'), ['order_id'], unique=False)
+
+    op.create_table('outbox_offsets',
+    sa.Column('consumer', sa.String(length=40), nullable=False),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('consumer')
+    )
+    op.create_table('sales_rollup_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('seller', sa.String(length=120), nullable=False),
+    sa.Column('product_id', sa.String(length=36), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('product_name', sa.String(length=160), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('gmv', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'source', 'seller', 'product_id', 'category')
+    )
+    with op.batch_alter_table('sales_rollup_daily', schema=None) as batch_op:
+        batch_op.create_index('ix_sales_rollup_product_day', ['product_id', 'day'], unique=False)
+        batch_op.create_index('ix_sales_rollup_seller_day', ['seller', 'day'], unique=False)
+
+    op.create_table('sales_rollup_day_totals',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('gmv', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'source')
+    )
+    op.create_table('sales_sketches_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('keys', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'source', 'kind')
+    )
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_until', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_cart_items_reserved_until'), ['reserved_until'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_active_created_id', ['is_active', 'created_at', 'id'], unique=False)
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_active_created_id')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_product_id'))
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cart_items_reserved_until'))
+        batch_op.drop_column('reserved_until')
+
+    op.drop_table('sales_sketches_daily')
+    op.drop_table('sales_rollup_day_totals')
+    with op.batch_alter_table('sales_rollup_daily', schema=None) as batch_op:
+        batch_op.drop_index('ix_sales_rollup_seller_day')
+        batch_op.drop_index('ix_sales_rollup_product_day')
+
+    op.drop_table('sales_rollup_daily')
+    op.drop_table('outbox_offsets')
+    with op.batch_alter_table('order_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_outbox_order_id'))
+
+    op.drop_table('order_outbox')
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_idempotency_keys_expires_at'))
+
+    op.drop_table('idempotency_keys')
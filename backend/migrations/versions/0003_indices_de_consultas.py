@@ -0,0 +1,75 @@
+"""índices para las consultas calientes
+
+- order_items(order_id): no tenía índice (items de una orden, joins)
+- orders(created_at, id): rangos del admin / exports con cursor
+- carts(user_id, created_at): carrito vigente del usuario
+- payments(order_id, created_at, id): último pago de cada orden
+- payments(created_at): pagos del rango en analytics
+- product_comments(product_id, created_at): comentarios más nuevos primero
+- users(estado, creado_en) y users(creado_en): listado del admin
+- cart_items(reserved_until) parcial: sólo renglones con reserva (sweeper)
+
+Los índices de una sola columna que quedan cubiertos por un compuesto se
+borran después de crear el compuesto (en MySQL la FK nunca queda sin índice).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:50:12.104215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_RESERVED = sa.text('reserved_until IS NOT NULL')
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+    op.create_index('ix_orders_created_id', 'orders', ['created_at', 'id'])
+
+    op.create_index('ix_carts_user_created', 'carts', ['user_id', 'created_at'])
+    op.drop_index('ix_carts_user_id', table_name='carts')
+
+    op.create_index('ix_payments_order_created_id', 'payments', ['order_id', 'created_at', 'id'])
+    op.create_index('ix_payments_created_at', 'payments', ['created_at'])
+    op.drop_index('ix_payments_order_id', table_name='payments')
+
+    op.create_index('ix_product_comments_product_created', 'product_comments', ['product_id', 'created_at'])
+    op.drop_index('ix_product_comments_product_id', table_name='product_comments')
+
+    op.create_index('ix_users_estado_creado_en', 'users', ['estado', 'creado_en'])
+    op.create_index('ix_users_creado_en', 'users', ['creado_en'])
+
+    op.create_index('ix_cart_items_reserved', 'cart_items', ['reserved_until'],
+                    sqlite_where=_RESERVED, postgresql_where=_RESERVED)
+    op.drop_index('ix_cart_items_reserved_until', table_name='cart_items')
+
+
+def downgrade() -> None:
+    op.create_index('ix_cart_items_reserved_until', 'cart_items', ['reserved_until'])
+    op.drop_index('ix_cart_items_reserved', table_name='cart_items')
+
+    op.drop_index('ix_users_creado_en', table_name='users')
+    op.drop_index('ix_users_estado_creado_en', table_name='users')
+
+    op.create_index('ix_product_comments_product_id', 'product_comments', ['product_id'])
+    op.drop_index('ix_product_comments_product_created', table_name='product_comments')
+
+    op.create_index('ix_payments_order_id', 'payments', ['order_id'])
+    op.drop_index('ix_payments_created_at', table_name='payments')
+    op.drop_index('ix_payments_order_created_id', table_name='payments')
+
+    op.create_index('ix_carts_user_id', 'carts', ['user_id'])
+    op.drop_index('ix_carts_user_created', table_name='carts')
+
+    op.drop_index('ix_orders_created_id', table_name='orders')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
@@ -0,0 +1,103 @@
+# benchmarks/bench_admin_orders.py
+"""
+GET /admin/orders: consulta única (join users + último pago correlacionado)
+vs. el camino viejo (joinedload de pagos + un SELECT de email por orden).
+
+Mide consulta + armado de dicts + encode JSON para N órdenes de un mes.
+El camino viejo se mide sobre una muestra (es O(N) consultas).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_admin_orders [N_ORDENES]
+"""
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from backend.app.db import SessionLocal, engine, init_db
+from backend.app.models.models import Order, Payment, User
+from backend.app.responses import dumps
+from backend.app.routers.routes_admin import _order_row_to_dict, _orders_stmt
+
+START = datetime(2024, 3, 1)
+END = datetime(2024, 4, 1)
+N_USERS = 5000
+
+
+def seed(n: int) -> None:
+    init_db()
+    span = (END - START).total_seconds()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": f"u{i}", "nombre": "U", "apellido": str(i), "tipo_doc": "DNI",
+            "nro_doc": str(i), "email": f"u{i}@x.com", "password_hash": "x",
+        } for i in range(N_USERS)])
+        conn.execute(insert(Order), [{
+            "id": f"o{i:07d}", "user_id": f"u{i % N_USERS}", "status": "Entregado",
+            "created_at": START + timedelta(seconds=span * i / n), "total_amount": 1000 + i % 997,
+        } for i in range(n)])
+        # 1 pago por orden y un segundo (más nuevo) en 1 de cada 5
+        conn.execute(insert(Payment), [{
+            "id": f"pa{i}", "order_id": f"o{i:07d}", "status": "PENDIENTE", "amount": 1,
+            "created_at": START + timedelta(seconds=span * i / n), "tx_ref": f"tx{i}",
+        } for i in range(n)] + [{
+            "id": f"pb{i}", "order_id": f"o{i:07d}", "status": "APROBADO", "amount": 1,
+            "created_at": START + timedelta(seconds=span * i / n + 60), "tx_ref": f"tx{i}b",
+        } for i in range(0, n, 5)])
+
+
+def viejo(db, limit: int) -> bytes:
+    orders = (
+        db.query(Order)
+        .filter(Order.created_at >= START, Order.created_at < END)
+        .options(joinedload(Order.payments))
+        .limit(limit)
+        .all()
+    )
+    out = []
+    for o in orders:
+        payment = sorted(o.payments, key=lambda p: p.created_at)[-1] if o.payments else None
+        email = db.query(User.email).filter(User.id == o.user_id).scalar() if o.user_id else None
+        out.append({"id": o.id, "created_at": o.created_at, "user_id": o.user_id,
+                    "user_email": email, "total_amount": o.total_amount,
+                    "payment_status": payment.status if payment else None,
+                    "tx_ref": payment.tx_ref if payment else None})
+    return dumps(out)
+
+
+def nuevo(db) -> bytes:
+    return dumps([_order_row_to_dict(r) for r in db.execute(_orders_stmt(START, END))])
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seed(n)
+    db = SessionLocal()
+    muestra = min(n, 5000)
+
+    t0 = time.perf_counter()
+    viejo(db, muestra)
+    t_viejo = (time.perf_counter() - t0) / muestra
+
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        nuevo(db)
+        best = min(best, time.perf_counter() - t0)
+
+    print(f"{n} órdenes, {N_USERS} usuarios")
+    print(f"viejo  {t_viejo * 1e6:8.1f} µs/orden (muestra de {muestra}) -> ~{t_viejo * n:.1f} s estimado")
+    print(f"nuevo  {best / n * 1e6:8.1f} µs/orden -> {best * 1000:.0f} ms total")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/bench_async_routes.py
+"""
+Capacidad de requests concurrentes: rutas sync (threadpool) vs ASYNC_ROUTES=1.
+
+Levanta la API con uvicorn (un proceso, SQLite en un archivo temporal) en
+cada modo y, durante N segundos por escenario, mide las rutas calientes
+(GET /products y GET /cart) con muchos clientes concurrentes:
+
+- "rápidas":          sólo rutas calientes
+- "rápidas + lentas": además, clientes que piden los agregados de un mes
+                      del historial de ventas de un vendedor grande
+                      (/sales/history?aggregate=all, siempre sync, casi todo
+                      tiempo de SQL), suficientes para ocupar los ~40 hilos
+                      del threadpool
+
+Reporta req/s y p50 / p99 de las rutas calientes, y req/s de las lentas.
+
+Los carriles (lanes.py) van apagados para comparar sólo sync vs async;
+con LANES_ENABLED=1 se mide con la configuración por defecto de la app.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_async_routes [SEGUNDOS] [CLIENTES_RAPIDOS] [CLIENTES_LENTOS]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+import httpx
+import numpy as np
+from sqlalchemy import insert
+
+from backend.app.db import engine, init_db
+from backend.app.models.models import Cart, CartItem, Order, OrderItem, Product, User
+from backend.app.security.tokens import create_access_token
+
+PORT = 8765
+BASE = f"http://127.0.0.1:{PORT}"
+N_PRODUCTS = 2000
+N_ORDERS = 40_000
+MONTH = datetime(2024, 3, 1)
+
+
+def seed() -> None:
+    init_db()
+    span = 30 * 86400
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": f"u{i}", "nombre": "U", "apellido": str(i), "tipo_doc": "DNI",
+            "nro_doc": str(i), "email": f"u{i}@x.com", "password_hash": "x",
+        } for i in range(100)])
+        conn.execute(insert(Product), [{
+            "id": f"p{i}", "seller_id": "u0", "name": f"Producto {i}", "price": 100 + i, "stock": 10,
+        } for i in range(N_PRODUCTS)])
+        conn.execute(insert(Cart), [{"id": "c1", "user_id": "u1"}])
+        conn.execute(insert(CartItem), [{
+            "cart_id": "c1", "product_id": f"p{i}", "name": f"Producto {i}", "price": 100,
+            "qty": 1, "seller": "U 0",
+        } for i in range(5)])
+        conn.execute(insert(Order), [{
+            "id": f"o{i:07d}", "user_id": f"u{i % 100}", "status": "Entregado",
+            "created_at": MONTH + timedelta(seconds=span * i / N_ORDERS), "total_amount": 100,
+        } for i in range(N_ORDERS)])
+        # todas las ventas son del vendedor u0
+        conn.execute(insert(OrderItem), [{
+            "id": f"i{i:07d}", "order_id": f"o{i:07d}", "product_id": f"p{i % N_PRODUCTS}",
+            "product_name": "x", "category": f"Cat {i % 10}", "seller": "U 0",
+            "quantity": 1 + i % 3, "unit_price": 100,
+        } for i in range(N_ORDERS)])
+
+
+def start_server(async_routes: bool) -> subprocess.Popen:
+    env = {**os.environ, "ASYNC_ROUTES": "1" if async_routes else "0", "BACKGROUND_WORKERS": "0",
+           "RATE_LIMIT_ENABLED": "0", "LANES_ENABLED": os.getenv("LANES_ENABLED", "0")}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"{BASE}/health", timeout=0.5).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("uvicorn no arrancó")
+
+
+async def load(seconds: float, fast_clients: int, slow_clients: int) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'u1'})}"}
+    seller = {"Authorization": f"Bearer {create_access_token({'sub': 'u0'})}"}
+    history = {"start": "2024-03-01", "end": "2024-03-31", "aggregate": "all"}
+    fast_lat: list[float] = []
+    slow_done = 0
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=fast_clients + slow_clients + 10)
+
+    async with httpx.AsyncClient(base_url=BASE, limits=limits, timeout=60) as client:
+        async def fast(i: int):
+            nonlocal errors
+            path = "/products?limit=20" if i % 2 else "/cart"
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(path, headers=headers)
+                except httpx.TransportError:  # keep-alive que el server cerró justo
+                    r = None
+                if r is None or r.status_code != 200:
+                    errors += 1
+                fast_lat.append(time.perf_counter() - t0)
+
+        async def slow():
+            nonlocal slow_done
+            while time.perf_counter() < deadline:
+                await client.get("/sales/history", params=history, headers=seller)
+                slow_done += 1
+
+        await asyncio.gather(*(fast(i) for i in range(fast_clients)), *(slow() for _ in range(slow_clients)))
+
+    lat = np.array(fast_lat) * 1000 if fast_lat else np.zeros(1)
+    return {
+        "fast_rps": len(fast_lat) / seconds,
+        "p50": float(np.percentile(lat, 50)),
+        "p99": float(np.percentile(lat, 99)),
+        "slow_rps": slow_done / seconds,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    fast_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    slow_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 36
+    seed()
+    print(f"{seconds:.0f}s por escenario; {fast_clients} clientes rápidos, {slow_clients} lentos")
+    print(f"{'modo':>6} {'escenario':>17} {'rápidas/s':>10} {'p50 ms':>8} {'p99 ms':>9} {'lentas/s':>9} {'errores':>8}")
+    for async_routes in (False, True):
+        proc = start_server(async_routes)
+        try:
+            for name, slow in (("rápidas", 0), ("rápidas + lentas", slow_clients)):
+                r = asyncio.run(load(seconds, fast_clients, slow))
+                mode = "async" if async_routes else "sync"
+                print(f"{mode:>6} {name:>17} {r['fast_rps']:>10.0f} {r['p50']:>8.1f} {r['p99']:>9.1f} "
+                      f"{r['slow_rps']:>9.1f} {r['errors']:>8}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_checkout.py
+"""
+Latencia de checkout (order_crud.checkout + commit) según el tamaño del carrito.
+
+Para cada tamaño (1, 10 y 100 renglones) se llena el carrito con un INSERT
+directo (no se mide) y se mide el checkout completo, hasta el commit.
+Reporta p50 / p99 en milisegundos.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_checkout [REPETICIONES]
+"""
+import os
+import sys
+import time
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from sqlalchemy import insert
+
+from backend.app.crud import order_crud
+from backend.app.db import SessionLocal, engine, init_db
+from backend.app.models.models import Cart, CartItem, Product, User
+
+SIZES = (1, 10, 100)
+
+
+def seed() -> None:
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": "bench-seller", "nombre": "Bench", "apellido": "Seller", "tipo_doc": "DNI",
+             "nro_doc": "1", "email": "seller@x.com", "password_hash": "x"},
+            {"id": "bench-buyer", "nombre": "Bench", "apellido": "Buyer", "tipo_doc": "DNI",
+             "nro_doc": "2", "email": "buyer@x.com", "password_hash": "x"},
+        ])
+        conn.execute(insert(Product), [{
+            "id": f"p{i}", "seller_id": "bench-seller", "name": f"Producto {i}",
+            "price": 1000 + i, "stock": 10**6, "subcategory": "Audio",
+        } for i in range(max(SIZES))])
+        conn.execute(insert(Cart), [{"id": "bench-cart", "user_id": "bench-buyer"}])
+
+
+def fill_cart(n: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(CartItem), [{
+            "cart_id": "bench-cart", "product_id": f"p{i}", "name": f"Producto {i}",
+            "price": 1000 + i, "qty": 1, "seller": "bench-seller", "stock_snapshot": 0,
+        } for i in range(n)])
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+    return values[k]
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed()
+    print(f"{'renglones':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in SIZES:
+        samples = []
+        for _ in range(repeat):
+            fill_cart(size)
+            db = SessionLocal()
+            try:
+                t0 = time.perf_counter()
+                order_crud.checkout(db, "bench-buyer", "Bench Buyer")
+                db.commit()
+                samples.append((time.perf_counter() - t0) * 1000)
+            finally:
+                db.close()
+        print(f"{size:>9} {percentile(samples, 50):8.2f} {percentile(samples, 99):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_db_profile.py
+"""
+Lecturas y escrituras concurrentes en SQLite: perfil "basic" vs "tuned".
+
+basic = el engine de antes (journal DELETE, synchronous FULL, pre_ping).
+tuned = WAL + synchronous=NORMAL + mmap/cache + busy_timeout, sin pre_ping
+(ver app/db.py, make_engine).
+
+Durante N segundos, R hilos leen el listado de productos y W hilos escriben
+renglones de carrito con commit (como "agregar al carrito"). Reporta
+lecturas/s, escrituras/s, p99 de lectura y errores ("database is locked").
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_db_profile [SEGUNDOS] [LECTORES] [ESCRITORES]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend.app.db import Base, make_engine
+from backend.app.models.models import Cart, CartItem, Product, User
+
+N_PRODUCTS = 5000
+
+
+def seed(eng) -> None:
+    Base.metadata.create_all(eng)
+    with eng.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": "u1", "nombre": "Bench", "apellido": "User", "tipo_doc": "DNI",
+            "nro_doc": "1", "email": "u1@x.com", "password_hash": "x",
+        }])
+        conn.execute(insert(Product), [{
+            "id": f"p{i}", "seller_id": "u1", "name": f"Producto {i}", "price": 100 + i, "stock": 10,
+        } for i in range(N_PRODUCTS)])
+        conn.execute(insert(Cart), [{"id": f"c{w}", "user_id": "u1"} for w in range(64)])
+
+
+def run(profile: str, seconds: float, readers: int, writers: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    eng = make_engine(f"sqlite:///{path}", profile=profile)
+    seed(eng)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    out = {"reads": 0, "writes": 0, "errors": 0, "read_lat": []}
+
+    def reader():
+        reads, lat = 0, []
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                with Session(eng) as db:
+                    db.execute(
+                        select(Product.id, Product.name, Product.price)
+                        .where(Product.is_active.is_(True))
+                        .order_by(Product.created_at.desc(), Product.id.desc())
+                        .limit(20)
+                    ).all()
+                    db.execute(select(CartItem.id).where(CartItem.cart_id == "c0")).all()
+                reads += 1
+                lat.append(time.perf_counter() - t0)
+            except OperationalError:
+                with lock:
+                    out["errors"] += 1
+        with lock:
+            out["reads"] += reads
+            out["read_lat"] += lat
+
+    def writer(w: int):
+        writes, i = 0, 0
+        while not stop.is_set():
+            try:
+                with Session(eng) as db:
+                    db.add(CartItem(cart_id=f"c{w}", product_id=f"p{i % N_PRODUCTS}", name="x",
+                                    price=100, qty=1, seller="u1"))
+                    db.commit()
+                writes += 1
+                i += 1
+            except OperationalError:
+                with lock:
+                    out["errors"] += 1
+        with lock:
+            out["writes"] += writes
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    eng.dispose()
+
+    lat = sorted(out["read_lat"]) or [0.0]
+    return {
+        "reads_s": out["reads"] / seconds,
+        "writes_s": out["writes"] / seconds,
+        "p99_ms": lat[min(len(lat) - 1, int(0.99 * len(lat)))] * 1000,
+        "errors": out["errors"],
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{seconds:.0f}s, {readers} lectores, {writers} escritores")
+    print(f"{'perfil':>7} {'lect/s':>9} {'escr/s':>9} {'p99 lect ms':>12} {'errores':>8}")
+    for profile in ("basic", "tuned"):
+        r = run(profile, seconds, readers, writers)
+        print(f"{profile:>7} {r['reads_s']:>9.0f} {r['writes_s']:>9.0f} {r['p99_ms']:>12.1f} {r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
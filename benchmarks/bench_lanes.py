@@ -0,0 +1,198 @@
+# benchmarks/bench_lanes.py
+"""
+Checkout con reporting saturado: LANES_ENABLED=0 vs LANES_ENABLED=1.
+
+Levanta la API con uvicorn (un proceso, SQLite en un archivo temporal, sin
+rate limit ni workers) en cada modo y, durante N segundos por escenario,
+mide el flujo de compra: cada cliente de checkout (un comprador distinto)
+agrega un producto al carrito y hace POST /orders/checkout, en loop.
+
+- "solo checkout": sin otra carga
+- "con reporting": además, clientes que piden sin parar los agregados de un
+                   mes del historial de ventas de un vendedor grande y el
+                   listado de órdenes de /admin, suficientes para ocupar
+                   todos los hilos del threadpool. Respetan el Retry-After
+                   de los 503 y corren en otro proceso, como usuarios de
+                   otras máquinas.
+
+Reporta checkouts/s y p50 / p99 de cada checkout (agregar + confirmar), y
+reportes/s completados y rechazados (503).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_lanes [SEGUNDOS] [CLIENTES_CHECKOUT] [CLIENTES_REPORTING]
+"""
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+import httpx
+import numpy as np
+from sqlalchemy import insert
+
+from backend.app.db import engine, init_db
+from backend.app.models.models import Order, OrderItem, Product, User
+from backend.app.security.tokens import create_access_token, create_token_pair
+
+PORT = 8766
+BASE = f"http://127.0.0.1:{PORT}"
+N_PRODUCTS = 200
+N_BUYERS = 50
+N_ORDERS = 40_000
+MONTH = datetime(2024, 3, 1)
+
+
+def seed() -> None:
+    init_db()
+    span = 30 * 86400
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": f"u{i}", "nombre": "U", "apellido": str(i), "tipo_doc": "DNI",
+            "nro_doc": str(i), "email": f"u{i}@x.com", "password_hash": "x",
+        } for i in range(N_BUYERS + 1)])
+        conn.execute(insert(Product), [{
+            "id": f"p{i}", "seller_id": "u0", "name": f"Producto {i}", "price": 100 + i, "stock": 10**7,
+        } for i in range(N_PRODUCTS)])
+        conn.execute(insert(Order), [{
+            "id": f"o{i:07d}", "user_id": f"u{1 + i % N_BUYERS}", "status": "Entregado",
+            "created_at": MONTH + timedelta(seconds=span * i / N_ORDERS), "total_amount": 100,
+        } for i in range(N_ORDERS)])
+        # todas las ventas son del vendedor u0
+        conn.execute(insert(OrderItem), [{
+            "id": f"i{i:07d}", "order_id": f"o{i:07d}", "product_id": f"p{i % N_PRODUCTS}",
+            "product_name": "x", "category": f"Cat {i % 10}", "seller": "U 0",
+            "quantity": 1 + i % 3, "unit_price": 100,
+        } for i in range(N_ORDERS)])
+
+
+def start_server(lanes: bool) -> subprocess.Popen:
+    env = {**os.environ, "LANES_ENABLED": "1" if lanes else "0",
+           "RATE_LIMIT_ENABLED": "0", "BACKGROUND_WORKERS": "0"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"{BASE}/health", timeout=0.5).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("uvicorn no arrancó")
+
+
+async def _reporting(seconds: float, clients: int) -> tuple[int, int]:
+    """Clientes de reporting hasta el deadline; (completados, rechazados con 503)."""
+    seller = {"Authorization": f"Bearer {create_access_token({'sub': 'u0'})}"}
+    admin = {"Authorization": f"Bearer {create_token_pair('u0', ['ADMIN'], 'ACTIVO')['access_token']}"}
+    history = {"start": "2024-03-01", "end": "2024-03-31", "aggregate": "all"}
+    reports = rejected = 0
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(base_url=BASE, limits=httpx.Limits(max_connections=clients + 10),
+                                 timeout=60) as client:
+        async def reporting(i: int):
+            nonlocal reports, rejected
+            while time.perf_counter() < deadline:
+                try:
+                    if i % 2:
+                        r = await client.get("/sales/history", params=history, headers=seller)
+                    else:
+                        r = await client.get("/admin/orders", params={"limit": 200}, headers=admin)
+                except httpx.TransportError:  # keep-alive que el server cerró justo
+                    continue
+                if r.status_code == 503:
+                    rejected += 1
+                    await asyncio.sleep(float(r.headers.get("retry-after", 1)))
+                else:
+                    reports += 1
+
+        await asyncio.gather(*(reporting(i) for i in range(clients)))
+    return reports, rejected
+
+
+def run_reporting(seconds: float, clients: int) -> tuple[int, int]:
+    return asyncio.run(_reporting(seconds, clients))
+
+
+async def load(seconds: float, checkout_clients: int, reporting_clients: int) -> dict:
+    checkout_lat: list[float] = []
+    errors = 0
+    # el reporting corre en otro proceso (como otros usuarios, en otras
+    # máquinas): su ráfaga de respuestas no frena el event loop que mide checkout
+    reporting = None
+    if reporting_clients:
+        executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+        executor.submit(int).result()  # que el proceso ya esté arriba al medir
+        reporting = executor.submit(run_reporting, seconds, reporting_clients)
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(base_url=BASE, limits=httpx.Limits(max_connections=checkout_clients + 10),
+                                 timeout=60) as client:
+        async def buyer(i: int):
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {create_access_token({'sub': f'u{1 + i}'})}"}
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    r1 = await client.post("/cart/items", json={"product_id": f"p{i % N_PRODUCTS}"}, headers=headers)
+                    r2 = await client.post("/orders/checkout", headers=headers)
+                    ok = r1.status_code == 201 and r2.status_code == 201
+                except httpx.TransportError:
+                    ok = False
+                if not ok:
+                    errors += 1
+                checkout_lat.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(buyer(i) for i in range(checkout_clients)))
+
+    reports = rejected = 0
+    if reporting is not None:
+        reports, rejected = reporting.result()
+        executor.shutdown()
+
+    lat = np.array(checkout_lat) * 1000 if checkout_lat else np.zeros(1)
+    return {
+        "checkout_rps": len(checkout_lat) / seconds,
+        "p50": float(np.percentile(lat, 50)),
+        "p99": float(np.percentile(lat, 99)),
+        "reports_rps": reports / seconds,
+        "rejected": rejected,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    checkout_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    reporting_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 48
+    seed()
+    print(f"{seconds:.0f}s por escenario; {checkout_clients} clientes de checkout, {reporting_clients} de reporting")
+    print(f"{'carriles':>8} {'escenario':>14} {'checkout/s':>11} {'p50 ms':>8} {'p99 ms':>9} "
+          f"{'reportes/s':>11} {'503':>6} {'errores':>8}")
+    for lanes in (False, True):
+        proc = start_server(lanes)
+        try:
+            for name, reporting in (("solo checkout", 0), ("con reporting", reporting_clients)):
+                r = asyncio.run(load(seconds, checkout_clients, reporting))
+                mode = "sí" if lanes else "no"
+                print(f"{mode:>8} {name:>14} {r['checkout_rps']:>11.1f} {r['p50']:>8.1f} {r['p99']:>9.1f} "
+                      f"{r['reports_rps']:>11.1f} {r['rejected']:>6} {r['errors']:>8}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_local_dashboard.py
+"""
+Dashboard local del vendedor sobre el motor columnar (app/analytics/columnar.py).
+
+Carga N renglones de venta (un vendedor "grande" con la mitad y el resto
+repartido), mide la carga completa desde la base y la latencia del
+dashboard del vendedor grande: con todo en la base ordenada y con una cola
+de órdenes nuevas leídas del outbox.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_local_dashboard [N_RENGLONES]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+import numpy as np
+from sqlalchemy import insert
+
+from backend.app.analytics.columnar import ColumnarSales
+from backend.app.analytics.outbox import append_order_created
+from backend.app.db import SessionLocal, engine, init_db
+from backend.app.models.models import Order, OrderItem, Product, User
+
+START = datetime(2024, 1, 1)
+N_SELLERS = 50
+N_BUYERS = 5000
+PRODUCTS_PER_SELLER = 200
+LINES_PER_ORDER = 2
+
+
+def seed(n: int) -> None:
+    init_db()
+    rng = np.random.default_rng(7)
+    n_orders = n // LINES_PER_ORDER
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": f"u{i}", "nombre": "U", "apellido": str(i), "tipo_doc": "DNI",
+            "nro_doc": str(i), "email": f"u{i}@x.com", "password_hash": "x",
+        } for i in range(N_SELLERS + N_BUYERS)])
+        conn.execute(insert(Product), [{
+            "id": f"p{s}-{j}", "seller_id": f"u{s}", "name": f"Producto {s}-{j}",
+            "price": 100 + j, "stock": 10, "rating": 7,
+        } for s in range(N_SELLERS) for j in range(PRODUCTS_PER_SELLER)])
+        # la mitad de las órdenes son del vendedor u0
+        sellers = np.where(rng.random(n_orders) < 0.5, 0, rng.integers(1, N_SELLERS, n_orders))
+        conn.execute(insert(Order), [{
+            "id": f"o{i:08d}", "user_id": f"u{N_SELLERS + i % N_BUYERS}", "status": "Entregado",
+            "created_at": START + timedelta(minutes=5 * i), "total_amount": 0,
+        } for i in range(n_orders)])
+        conn.execute(insert(OrderItem), [{
+            "id": f"i{i:08d}-{k}", "order_id": f"o{i:08d}",
+            "product_id": f"p{sellers[i]}-{(i * 7 + k) % PRODUCTS_PER_SELLER}",
+            "product_name": "x", "category": f"Cat {k}", "seller": "U",
+            "quantity": 1 + k, "unit_price": 100 + k,
+        } for i in range(n_orders) for k in range(LINES_PER_ORDER)])
+
+
+def add_new_orders(n: int) -> None:
+    db = SessionLocal()
+    now = datetime.utcnow()
+    for i in range(n):
+        items = [{"product_id": "p0-1", "product_name": "x", "category": "Cat 0", "seller": "U",
+                  "quantity": 1, "unit_price": 101}]
+        append_order_created(db, f"n{i}", now, items, user_id=f"u{N_SELLERS}")
+    db.commit()
+    db.close()
+
+
+def measure(motor: ColumnarSales, db, runs: int = 200) -> tuple[float, float]:
+    lat = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        motor.seller_dashboard(db, "u0")
+        lat.append(time.perf_counter() - t0)
+    return float(np.percentile(lat, 50)) * 1000, float(np.percentile(lat, 99)) * 1000
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    seed(n)
+    db = SessionLocal()
+    motor = ColumnarSales(refresh_seconds=3600)
+
+    t0 = time.perf_counter()
+    snap = motor.refresh(force=True)
+    t_load = time.perf_counter() - t0
+    lines = int(np.count_nonzero(snap.base["seller"] == snap.sellers.get("u0")))
+    print(f"{n} renglones, vendedor grande con {lines} -> carga completa en {t_load:.2f}s")
+
+    p50, p99 = measure(motor, db)
+    print(f"solo base        p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+    add_new_orders(2000)
+    motor.refresh(force=True)
+    p50, p99 = measure(motor, db)
+    print(f"base + cola 2000 p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
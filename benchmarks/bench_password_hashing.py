@@ -0,0 +1,90 @@
+# benchmarks/bench_password_hashing.py
+"""
+Logins por segundo (verificación pbkdf2_sha256) por core.
+
+- "inline": C hilos verifican en el propio hilo, como antes del pool. El
+            GIL los serializa: no pasa de ~1 core por proceso de la API.
+- "pool":   los mismos C hilos mandan la verificación a HashPool con W
+            procesos (W = 1 .. cores), como hace ahora /auth/login.
+
+También corre el pool con HASH_MAX_PENDING chico para mostrar el descarte
+con 503 en lugar de cola. Usa PASSWORD_HASH_ROUNDS (app/passwords.py).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_password_hashing [SEGUNDOS] [CLIENTES]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from fastapi import HTTPException
+
+from backend.app import passwords
+from backend.app.security.hash_pool import HashPool
+
+PASSWORD = "Clave123!"
+
+
+def run(seconds: float, clients: int, pool: HashPool | None) -> dict:
+    stored = passwords.hash_password(PASSWORD)
+    if pool is not None:
+        pool.run(passwords.verify_and_update, PASSWORD, stored)  # arranca los procesos
+    stop = threading.Event()
+    lock = threading.Lock()
+    out = {"ok": 0, "rejected": 0}
+
+    def client():
+        ok = rejected = 0
+        while not stop.is_set():
+            try:
+                if pool is None:
+                    passwords.verify_and_update(PASSWORD, stored)
+                else:
+                    pool.run(passwords.verify_and_update, PASSWORD, stored)
+                ok += 1
+            except HTTPException:
+                rejected += 1
+                time.sleep(0.01)  # el cliente respeta el Retry-After (acotado)
+        with lock:
+            out["ok"] += ok
+            out["rejected"] += rejected
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    if pool is not None:
+        pool.shutdown()
+    return {"logins_s": out["ok"] / seconds, "rejected": out["rejected"]}
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    cores = os.cpu_count() or 1
+    print(f"{seconds:.0f}s por corrida, {clients} clientes, {cores} cores, "
+          f"{passwords.PASSWORD_HASH_ROUNDS} rondas")
+    print(f"{'modo':>8} {'procesos':>9} {'max pend.':>10} {'logins/s':>9} {'por core':>9} {'503':>6}")
+
+    def show(mode: str, w: int | None, max_pending: int | None, r: dict) -> None:
+        per_core = r["logins_s"] / (w or 1)
+        print(f"{mode:>8} {w or '-':>9} {max_pending or '-':>10} {r['logins_s']:>9.0f} {per_core:>9.0f} "
+              f"{r['rejected']:>6}")
+
+    show("inline", None, None, run(seconds, clients, None))
+    for w in sorted({1, max(cores // 2, 1), cores}):
+        show("pool", w, 8 * w, run(seconds, clients, HashPool(workers=w, max_pending=8 * w)))
+    show("pool", cores, cores, run(seconds, clients, HashPool(workers=cores, max_pending=cores)))
+
+
+if __name__ == "__main__":
+    main()
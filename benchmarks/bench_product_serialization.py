@@ -0,0 +1,100 @@
+# benchmarks/bench_product_serialization.py
+"""
+Costo por fila de serializar productos: camino viejo vs camino rápido.
+
+- viejo: ProductOut.model_validate(orm) + seller_name/imágenes a mano, después
+  FastAPI vuelve a validar contra response_model=List[ProductOut] y codifica.
+- rápido: dicts armados desde tuplas (routes_products._serialize_rows) y
+  codificados con orjson (responses.dumps).
+
+En los dos casos los datos ya están cargados: se mide sólo serialización.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_product_serialization [N_PRODUCTOS]
+"""
+import os
+import sys
+import time
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from backend.app.db import SessionLocal, engine, init_db
+from backend.app.models.models import Product, ProductImage, User
+from backend.app.responses import dumps
+from backend.app.routers.routes_products import (
+    _images_by_product, _product_rows_stmt, _serialize_rows,
+)
+from backend.app.schemas.product_schemas import ProductOut
+
+
+def seed(n: int) -> None:
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": "bench-seller", "nombre": "Bench", "apellido": "Seller", "tipo_doc": "DNI",
+            "nro_doc": "1", "email": "bench@x.com", "password_hash": "x",
+        }])
+        conn.execute(insert(Product), [{
+            "id": f"p{i}", "seller_id": "bench-seller", "name": f"Producto {i}",
+            "description": "Descripción de prueba " * 4, "price": 1000 + i, "stock": 10,
+            "rating": 8.5, "subcategory": "Audio", "image_url": "https://img/x.png",
+        } for i in range(n)])
+        conn.execute(insert(ProductImage), [{
+            "id": f"im{i}-{j}", "product_id": f"p{i}", "url": f"https://img/{i}/{j}.png",
+            "sort_order": j,
+        } for i in range(n) for j in range(2)])
+
+
+def bench(label: str, fn, n_rows: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    per_row = best / n_rows * 1e6
+    print(f"{label:<10} {best * 1000:8.2f} ms total  {per_row:7.2f} µs/fila")
+    return per_row
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed(n)
+    db = SessionLocal()
+    adapter = TypeAdapter(List[ProductOut])
+
+    products = db.query(Product).options(selectinload(Product.images)).all()
+    sellers = {u.id: u for u in db.query(User).all()}
+    rows = db.execute(_product_rows_stmt()).all()
+    images = _images_by_product(db, [r.id for r in rows])
+
+    def viejo():
+        outs = []
+        for p in products:
+            out = ProductOut.model_validate(p)
+            s = sellers.get(p.seller_id)
+            out.seller_name = f"{s.nombre} {s.apellido}".strip() if s else None
+            out.images = sorted(p.images, key=lambda im: im.sort_order or 0)
+            outs.append(out)
+        adapter.dump_json(adapter.validate_python(outs))
+
+    def rapido():
+        dumps(_serialize_rows(rows, images))
+
+    print(f"{n} productos, 2 imágenes c/u")
+    antes = bench("viejo", viejo, n)
+    despues = bench("rápido", rapido, n)
+    print(f"speedup x{antes / despues:.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
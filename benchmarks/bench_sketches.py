@@ -0,0 +1,116 @@
+# benchmarks/bench_sketches.py
+"""
+KPIs globales de un rango: sketches diarios combinados vs. consultas exactas.
+
+- compradores únicos: HyperLogLog vs COUNT(DISTINCT orders.user_id)
+- top 10 productos (unidades) / vendedores (GMV): Count-Min + lectura exacta
+  de los candidatos vs GROUP BY sobre todos los rollups del rango
+
+Imprime tiempos y error (relativo para compradores, coincidencias del top
+para productos/vendedores) para rangos de 30, 90 y 365 días.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_sketches [N_ORDENES]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from backend.app.analytics import rebuild_rollups
+from backend.app.analytics.sketches import range_sketches
+from backend.app.db import SessionLocal, engine, init_db
+from backend.app.models.models import Order, OrderItem
+from backend.app.routers.routes_analytics import _top_products, _top_sellers
+
+END = date(2024, 12, 31)
+DAYS = 365
+N_BUYERS = 200_000
+N_PRODUCTS = 20_000
+N_SELLERS = 500
+TOP = 10
+
+
+def seed(n: int) -> None:
+    init_db()
+    rng = np.random.default_rng(11)
+    start = datetime.combine(END - timedelta(days=DAYS - 1), dtime.min)
+    # popularidad tipo Zipf para compradores y productos
+    buyers = np.minimum(rng.zipf(1.3, n), N_BUYERS) - 1
+    products = np.minimum(rng.zipf(1.2, 2 * n), N_PRODUCTS) - 1
+    qty = rng.integers(1, 4, 2 * n)
+    with engine.begin() as conn:
+        conn.execute(insert(Order), [{
+            "id": f"o{i:08d}", "user_id": f"u{buyers[i]}", "status": "Entregado",
+            "created_at": start + timedelta(seconds=DAYS * 86400 * i / n), "total_amount": 0,
+        } for i in range(n)])
+        conn.execute(insert(OrderItem), [{
+            "id": f"i{j:09d}", "order_id": f"o{j // 2:08d}", "product_id": f"p{products[j]}",
+            "product_name": f"Producto {products[j]}", "category": f"Cat {products[j] % 20}",
+            "seller": f"Vendedor {products[j] % N_SELLERS}",
+            "quantity": int(qty[j]), "unit_price": 100 + int(products[j]) % 900,
+        } for j in range(2 * n)])
+    db = SessionLocal()
+    t0 = time.perf_counter()
+    rebuild_rollups(db)
+    db.commit()
+    db.close()
+    print(f"{n} órdenes / {2 * n} renglones en {DAYS} días; rollups + sketches en {time.perf_counter() - t0:.1f}s")
+
+
+def exact(db, start: date, end: date):
+    start_dt = datetime.combine(start, dtime.min)
+    end_dt = datetime.combine(end + timedelta(days=1), dtime.min)
+    buyers = db.execute(
+        select(func.count(func.distinct(Order.user_id)))
+        .where(Order.created_at >= start_dt, Order.created_at < end_dt)
+    ).scalar()
+    products = [p["product_id"] for p in _top_products(db, start, end, TOP, by="units")]
+    sellers = [s["seller"] for s in _top_sellers(db, start, end, TOP)]
+    return buyers, products, sellers
+
+
+def approx(db, start: date, end: date):
+    hll, product_sk, seller_sk = range_sketches(db, start, end)
+    products = [p["product_id"] for p in _top_products(
+        db, start, end, TOP, by="units", keys=[k for k, _ in product_sk.top(2 * TOP)])]
+    sellers = [s["seller"] for s in _top_sellers(
+        db, start, end, TOP, keys=[k for k, _ in seller_sk.top(2 * TOP)])]
+    return round(hll.count()), products, sellers
+
+
+def best_of(fn, *args, runs: int = 3):
+    best, out = float("inf"), None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    seed(n)
+    db = SessionLocal()
+    print(f"{'días':>5} {'exacto ms':>10} {'sketch ms':>10} {'compradores':>12} {'err %':>6} "
+          f"{'top prod':>9} {'top vend':>9}")
+    for days in (30, 90, 365):
+        start = END - timedelta(days=days - 1)
+        t_exact, (b_exact, p_exact, s_exact) = best_of(exact, db, start, END)
+        t_approx, (b_approx, p_approx, s_approx) = best_of(approx, db, start, END)
+        err = abs(b_approx - b_exact) / b_exact * 100
+        print(f"{days:>5} {t_exact * 1000:>10.1f} {t_approx * 1000:>10.1f} {b_exact:>12} {err:>6.2f} "
+              f"{len(set(p_exact) & set(p_approx)):>6}/{TOP} {len(set(s_exact) & set(s_approx)):>6}/{TOP}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
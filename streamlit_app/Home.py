@@ -9,6 +9,8 @@ from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
 
+from auth_helpers import ensure_fresh_token
+
 # Cargar variables desde .env (en la raíz del proyecto)
 load_dotenv()
 
@@ -76,6 +78,7 @@ def set_query_param_id(product_id: str | int):
             st.session_state["product_id"] = str(product_id)
 
 def auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
     tok = st.session_state.get("auth_token")
     return {"Authorization": f"Bearer {tok}"} if tok else {}
 
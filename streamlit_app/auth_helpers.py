@@ -1,5 +1,8 @@
 # streamlit_app/auth_helpers.py
 import os
+import time
+
+import requests
 import streamlit as st
 from dotenv import load_dotenv 
 
@@ -13,19 +16,44 @@ def set_auth_session(data: dict):
     """
     Guarda en session_state todo lo que venga del login.
     Espera al menos: access_token, user_id, email, roles.
+    También sirve para la respuesta de /auth/refresh (mismo formato).
     """
     st.session_state["auth_token"] = data.get("access_token")
+    st.session_state["auth_refresh_token"] = data.get("refresh_token")
+    # renovamos un minuto antes de que venza el access token (dura poco)
+    st.session_state["auth_token_renew_at"] = time.time() + max(data.get("expires_in", 900) - 60, 0)
     st.session_state["auth_user_id"] = data.get("user_id")
     st.session_state["auth_email"] = data.get("email")
     st.session_state["auth_roles"] = data.get("roles", [])
     st.session_state["is_authenticated"] = bool(data.get("access_token"))
 
+def ensure_fresh_token() -> None:
+    """
+    Si el access token está por vencer, lo renueva con el refresh token
+    (POST /auth/refresh). Si el refresh ya no vale, cierra la sesión.
+    """
+    refresh_token = st.session_state.get("auth_refresh_token")
+    if not refresh_token or time.time() < st.session_state.get("auth_token_renew_at", 0):
+        return
+    try:
+        r = requests.post(f"{BACKEND_URL}/auth/refresh", json={"refresh_token": refresh_token}, timeout=10)
+    except requests.RequestException:
+        return  # sin backend: seguimos con el token actual
+    if r.status_code == 200:
+        set_auth_session(r.json())
+    elif r.status_code == 401:
+        for key in ("auth_token", "auth_refresh_token", "auth_token_renew_at"):
+            st.session_state.pop(key, None)
+        st.session_state["is_authenticated"] = False
+
 def auth_headers() -> dict:
+    ensure_fresh_token()
     tok = st.session_state.get("auth_token")
     return {"Authorization": f"Bearer {tok}"} if tok else {}
 
 def require_login() -> bool:
     """Devuelve True si hay token, si no muestra aviso y devuelve False."""
+    ensure_fresh_token()
     if "auth_token" not in st.session_state or not st.session_state["auth_token"]:
         st.warning("Tenés que iniciar sesión para continuar.")
         st.page_link("pages/0_🔐_Login.py", label="Ir al Login", icon="🔐")
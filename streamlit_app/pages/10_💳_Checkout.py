@@ -1,8 +1,10 @@
 # streamlit_app/pages/4b_💳_Checkout.py
 # streamlit_app/pages/4b_💳_Checkout.py
 import os
+import uuid
 import requests
 import streamlit as st
+from auth_helpers import ensure_fresh_token
 from dotenv import load_dotenv
 
 # Cargar variables desde .env (en la raíz del proyecto)
@@ -16,6 +18,7 @@ BACKEND_URL = os.getenv("BACKEND_URL") or st.secrets.get("BACKEND_URL", "http://
 # ============== HELPERS API ==============
 
 def get_auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
     token = st.session_state.get("auth_token")
     if not token:
         return {}
@@ -39,11 +42,14 @@ def api_get_cart():
 
 def api_post_checkout(payload: dict):
     """Confirma la compra en el backend."""
+    # misma clave hasta que la orden se confirme: un doble clic o un reintento
+    # después de un timeout devuelve la misma orden en vez de crear otra
+    idem_key = st.session_state.setdefault("checkout_idem_key", str(uuid.uuid4()))
     try:
         r = requests.post(
             f"{BACKEND_URL}/orders/checkout",
             json=payload,
-            headers=get_auth_headers(),
+            headers={**get_auth_headers(), "Idempotency-Key": idem_key},
             timeout=15,
         )
         return r
@@ -370,6 +376,7 @@ with col_confirm1:
         if resp.status_code in (200, 201):
             data_resp = resp.json()
             order_id = data_resp.get("order_id", data_resp.get("id", ""))
+            st.session_state.pop("checkout_idem_key", None)
             st.success(f"🎉 ¡Pedido confirmado! Número de orden: {order_id}")
             st.balloons()
         else:
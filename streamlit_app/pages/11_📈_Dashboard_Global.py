@@ -1,5 +1,6 @@
 # streamlit_app/pages/0a_📊_Dashboard_Global.py
 import streamlit as st
+from auth_helpers import ensure_fresh_token
 import pandas as pd
 import requests
 from datetime import datetime, timedelta, date
@@ -21,6 +22,7 @@ except Exception:
 # ========================================
 
 def get_auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
     token = st.session_state.get("auth_token")
     return {"Authorization": f"Bearer {token}"} if token else {}
 
@@ -31,7 +33,8 @@ def api_get_global_metrics():
     except:
         return None
 
-def api_get_orders(from_date: date, to_date: date):
+def api_get_orders_summary(from_date: date, to_date: date):
+    """Resumen ya agregado en el backend (rollups diarios): KPIs, serie y rankings."""
     try:
         params = {
             "from": from_date.isoformat(),
@@ -40,9 +43,9 @@ def api_get_orders(from_date: date, to_date: date):
         r = requests.get(f"{BACKEND_URL}/analytics/orders", params=params, headers=get_auth_headers(), timeout=15)
         if r.status_code == 200:
             return r.json()
-        return []
+        return {}
     except:
-        return []
+        return {}
 
 # ========================================
 # FILTROS LATERALES
@@ -63,22 +66,7 @@ if isinstance(hasta, list):
 # ========================================
 
 global_data = api_get_global_metrics() or {}
-orders_data = api_get_orders(desde, hasta)
-
-# Convertir órdenes a DataFrame seguro
-if orders_data:
-    df_orders = pd.DataFrame(orders_data)
-else:
-    df_orders = pd.DataFrame(columns=["order_date", "seller_name", "product_name", "qty", "total_paid", "payment_method", "status"])
-
-# Normalizar campos esperados
-if "order_date" in df_orders:
-    df_orders["order_date"] = pd.to_datetime(df_orders["order_date"])
-else:
-    df_orders["order_date"] = pd.to_datetime([])
-
-df_orders["qty"] = df_orders.get("qty", 1)
-df_orders["total_paid"] = df_orders.get("total_paid", 0)
+summary = api_get_orders_summary(desde, hasta)
 
 # ========================================
 # KPIs
@@ -87,9 +75,8 @@ df_orders["total_paid"] = df_orders.get("total_paid", 0)
 total_users = global_data.get("total_users", 0)
 total_products = global_data.get("total_products", 0)
 
-gmv = float(df_orders["total_paid"].sum()) if not df_orders.empty else 0.0
-orders_count = len(df_orders)
-aov = gmv / orders_count if orders_count else 0.0
+gmv = float(summary.get("gmv", 0))
+aov = float(summary.get("aov", 0))
 
 c1, c2, c3, c4 = st.columns(4)
 c1.metric("Usuarios totales", f"{total_users:,}".replace(",", "."))
@@ -104,14 +91,10 @@ st.divider()
 # ========================================
 st.subheader("Evolución de ventas")
 
-if not df_orders.empty:
-    df_orders["day"] = df_orders["order_date"].dt.floor("D")
-    daily = df_orders.groupby("day", as_index=False).agg(
-        gmv=("total_paid", "sum"),
-        orders=("order_date", "count")
-    )
-
-    chart_df = daily.set_index("day")[["gmv", "orders"]]
+daily = pd.DataFrame(summary.get("daily", []))
+if not daily.empty and daily["orders"].sum() > 0:
+    daily["day"] = pd.to_datetime(daily["date"])
+    chart_df = daily.rename(columns={"total": "gmv"}).set_index("day")[["gmv", "orders"]]
     st.line_chart(chart_df, height=260)
 else:
     st.info("Sin datos en el rango seleccionado.")
@@ -124,19 +107,17 @@ colA, colB = st.columns(2)
 
 with colA:
     st.subheader("Top vendedores por GMV")
-    if not df_orders.empty:
-        df_sellers = df_orders.groupby("seller_name", as_index=False)["total_paid"].sum()
-        df_sellers = df_sellers.sort_values("total_paid", ascending=False).head(10)
-        st.bar_chart(df_sellers.set_index("seller_name")["total_paid"], height=260)
+    df_sellers = pd.DataFrame(summary.get("top_sellers", []))
+    if not df_sellers.empty:
+        st.bar_chart(df_sellers.set_index("seller")["sales"], height=260)
     else:
         st.info("Sin datos de órdenes.")
 
 with colB:
     st.subheader("Top productos por unidades")
-    if not df_orders.empty:
-        df_products = df_orders.groupby("product_name", as_index=False)["qty"].sum()
-        df_products = df_products.sort_values("qty", ascending=False).head(10)
-        st.bar_chart(df_products.set_index("product_name")["qty"], height=260)
+    df_products = pd.DataFrame(summary.get("top_products", []))
+    if not df_products.empty:
+        st.bar_chart(df_products.set_index("product")["units"], height=260)
     else:
         st.info("Sin datos de órdenes.")
 
@@ -158,15 +139,16 @@ with col1:
 
 with col2:
     st.subheader("Métodos de pago")
-    if not df_orders.empty and "payment_method" in df_orders:
-        st.bar_chart(df_orders["payment_method"].value_counts(), height=260)
+    by_method = summary.get("payments_by_method", {})
+    if by_method:
+        st.bar_chart(pd.Series(by_method), height=260)
     else:
         st.info("Sin datos de pagos.")
 
 with col3:
     st.subheader("Calidad de órdenes")
-    if not df_orders.empty and "status" in df_orders:
-        fail_rate = (df_orders["status"].str.lower() == "failed").mean() * 100
+    if summary.get("orders"):
+        fail_rate = summary.get("payment_fail_rate", 0) * 100
         st.metric("Tasa de fallos de pago", f"{fail_rate:.1f}%")
     else:
         st.info("Sin estados de orden.")
@@ -1,5 +1,6 @@
 # streamlit_app/pages/8_📊_Dashboard_Local.py
 import streamlit as st
+from auth_helpers import ensure_fresh_token
 import pandas as pd
 import requests
 
@@ -14,6 +15,7 @@ except Exception:
     BACKEND_URL = "http://localhost:8000"
 
 def get_auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
     token = st.session_state.get("auth_token")
     return {"Authorization": f"Bearer {token}"} if token else {}
 
@@ -1,9 +1,11 @@
 ##streamlit_app/pages/12_🛡️_Admin_Usuarios_y_Órdenes.py
 import os
+import json
 from datetime import date, timedelta
 
 import requests
 import streamlit as st
+from auth_helpers import ensure_fresh_token
 
 st.set_page_config(page_title="Panel Admin - Ecom MKT Lab", layout="wide")
 
@@ -16,10 +18,47 @@ def K(s: str) -> str: return f"{PAGE_NS}:{s}"
 # Helpers de auth
 # ============================
 def auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
     tok = st.session_state.get("auth_token")
     return {"Authorization": f"Bearer {tok}"} if tok else {}
 
 
+# Cuántas tarjetas se dibujan como máximo; las métricas cuentan todo el export
+MAX_CARDS = 200
+
+
+def stream_ndjson(path: str, params: dict):
+    """
+    Lee un export NDJSON del backend fila por fila, a medida que llega,
+    sin cargar la respuesta completa en memoria.
+    """
+    with requests.get(
+        f"{BACKEND_URL}{path}",
+        params={**params, "format": "ndjson"},
+        headers=auth_headers(),
+        stream=True,
+        timeout=60,
+    ) as r:
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}: {r.text}")
+        for line in r.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def fetch_csv(path: str, params: dict) -> bytes:
+    """Descarga el export CSV (en streaming) para el botón de descarga."""
+    with requests.get(
+        f"{BACKEND_URL}{path}",
+        params={**params, "format": "csv"},
+        headers=auth_headers(),
+        stream=True,
+        timeout=120,
+    ) as r:
+        r.raise_for_status()
+        return b"".join(r.iter_content(chunk_size=64 * 1024))
+
+
 def require_admin():
     if "auth_token" not in st.session_state:
         st.warning("Tenés que iniciar sesión como administrador.")
@@ -136,32 +175,45 @@ with tab_users:
         params["solo_nuevos"] = "true"
         params["dias"] = dias
 
+    users = []
+    total_users = bloqueados = dni_block = 0
+    progreso_u = st.empty()
     try:
-        resp = requests.get(
-            f"{BACKEND_URL}/admin/users",
-            params=params,
-            headers=auth_headers(),
-            timeout=20,
-        )
-        if resp.status_code != 200:
-            st.error(f"Error al cargar usuarios (HTTP {resp.status_code}): {resp.text}")
-        else:
-            users = resp.json()
+        for u in stream_ndjson("/admin/users/export", params):
+            total_users += 1
+            bloqueados += u.get("estado") == "BLOQUEADO"
+            dni_block += bool(u.get("dni_bloqueado"))
+            if len(users) < MAX_CARDS:
+                users.append(u)
+            if total_users % 5000 == 0:
+                progreso_u.caption(f"Cargando usuarios... {total_users}")
     except Exception as e:
-        st.error(f"Error de conexión al backend: {e}")
-        users = []
+        st.error(f"Error al cargar usuarios: {e}")
+    progreso_u.empty()
 
-    total_users = len(users)
     col_u1, col_u2, col_u3 = st.columns(3)
     with col_u1:
         st.metric("Usuarios listados", total_users)
     with col_u2:
-        bloqueados = sum(1 for u in users if u.get("estado") == "BLOQUEADO")
         st.metric("Bloqueados", bloqueados)
     with col_u3:
-        dni_block = sum(1 for u in users if u.get("dni_bloqueado"))
         st.metric("DNI bloqueados", dni_block)
 
+    if st.button("⬇️ Preparar CSV de usuarios", key=K("csv_users")):
+        try:
+            st.download_button(
+                "Descargar usuarios.csv",
+                data=fetch_csv("/admin/users/export", params),
+                file_name="usuarios.csv",
+                mime="text/csv",
+                key=K("dl_users"),
+            )
+        except Exception as e:
+            st.error(f"No se pudo exportar: {e}")
+
+    if total_users > len(users):
+        st.caption(f"Mostrando {len(users)} de {total_users} usuarios (el CSV trae todos).")
+
     st.markdown("<div class='table-header'>Listado</div>", unsafe_allow_html=True)
 
     for idx, u in enumerate(users):
@@ -290,25 +342,21 @@ with tab_orders:
         "to_date": to_date.isoformat(),
     }
 
+    orders = []
+    total_orders = total_monto = aprobadas = 0
+    progreso_o = st.empty()
     try:
-        resp_o = requests.get(
-            f"{BACKEND_URL}/admin/orders",
-            params=params_o,
-            headers=auth_headers(),
-            timeout=20,
-        )
-        if resp_o.status_code != 200:
-            st.error(f"Error al cargar órdenes (HTTP {resp_o.status_code}): {resp_o.text}")
-            orders = []
-        else:
-            orders = resp_o.json()
+        for o in stream_ndjson("/admin/orders/export", params_o):
+            total_orders += 1
+            total_monto += o.get("total_amount") or 0
+            aprobadas += o.get("payment_status") == "APROBADO"
+            if len(orders) < MAX_CARDS:
+                orders.append(o)
+            if total_orders % 5000 == 0:
+                progreso_o.caption(f"Cargando órdenes... {total_orders}")
     except Exception as e:
-        st.error(f"Error de conexión al backend: {e}")
-        orders = []
-
-    total_orders = len(orders)
-    total_monto = sum(o.get("total_amount", 0) for o in orders)
-    aprobadas = sum(1 for o in orders if o.get("payment_status") == "APROBADO")
+        st.error(f"Error al cargar órdenes: {e}")
+    progreso_o.empty()
 
     col_o1, col_o2, col_o3 = st.columns(3)
     with col_o1:
@@ -318,6 +366,21 @@ with tab_orders:
     with col_o3:
         st.metric("Pagos aprobados", aprobadas)
 
+    if st.button("⬇️ Preparar CSV de órdenes", key=K("csv_orders")):
+        try:
+            st.download_button(
+                "Descargar órdenes.csv",
+                data=fetch_csv("/admin/orders/export", params_o),
+                file_name=f"ordenes_{from_date}_{to_date}.csv",
+                mime="text/csv",
+                key=K("dl_orders"),
+            )
+        except Exception as e:
+            st.error(f"No se pudo exportar: {e}")
+
+    if total_orders > len(orders):
+        st.caption(f"Mostrando {len(orders)} de {total_orders} órdenes (el CSV trae todas).")
+
     st.markdown("<div class='table-header'>Listado de órdenes</div>", unsafe_allow_html=True)
 
     for idx, o in enumerate(orders):
@@ -1,5 +1,6 @@
 # streamlit_app/pages/4_🛒_Mi_Carrito.py
 import time
+import uuid
 import streamlit as st
 import requests
 from auth_helpers import get_backend_url, auth_headers, require_login
@@ -76,12 +77,17 @@ def remove_item(item_id: str) -> bool:
     return True
 
 def checkout():
+    # misma clave hasta que la orden se confirme: un doble clic o un reintento
+    # después de un timeout no crea una segunda orden
+    idem_key = st.session_state.setdefault(K("checkout_idem_key"), str(uuid.uuid4()))
     r = requests.post(
         f"{BACKEND_URL}/orders/checkout",
-        headers=auth_headers(),
+        headers={**auth_headers(), "Idempotency-Key": idem_key},
         timeout=30,
     )
     ok = r.status_code == 201
+    if ok:
+        st.session_state.pop(K("checkout_idem_key"), None)
     data = None
     try:
         data = r.json()
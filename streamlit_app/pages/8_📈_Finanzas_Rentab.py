@@ -45,7 +45,8 @@ params = {
     "start": str(rangos[0]),
     "end": str(rangos[1]),
     "currency": moneda,
-    "channels": ",".join(canales)
+    "channels": ",".join(canales),
+    "limit": top_n,
 }
 
 # =======================
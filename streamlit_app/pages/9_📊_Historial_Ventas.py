@@ -1,5 +1,6 @@
 # streamlit_app/pages/9_📈_Historial_Ventas.py
 import streamlit as st
+from auth_helpers import ensure_fresh_token
 import pandas as pd
 import requests
 from datetime import datetime, timedelta, date
@@ -98,32 +99,59 @@ st.markdown("""
 
 
 # =============== Helper API ===============
-def api_get_sales_history(start: date, end: date, status: str, search: str):
-    """Llama al backend /sales/history con filtros."""
+PAGE_SIZE = 20
+STATUS_CODES = {
+    "Entregados": "DELIVERED",
+    "En camino": "SHIPPED",
+    "Pendientes": "PENDING",
+}
+
+
+def get_auth_headers():
+    ensure_fresh_token()  # renueva el access token si está por vencer
+    token = st.session_state.get("auth_token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def _sales_params(start: date, end: date, status: str, search: str) -> dict:
     params = {
         "start": start.isoformat(),
         "end": end.isoformat(),
     }
     if status and status != "Todos":
         # mapeamos estados visuales -> códigos backend
-        mapping = {
-            "Entregados": "DELIVERED",
-            "En camino": "SHIPPED",
-            "Pendientes": "PENDING",
-        }
-        params["status"] = mapping.get(status, status)
+        params["status"] = STATUS_CODES.get(status, status)
     if search:
         params["search"] = search
+    return params
 
+
+def api_get_sales_history(params: dict, cursor: str | None = None):
+    """Una página de /sales/history. Devuelve (ventas, cursor de la siguiente o None)."""
+    params = {**params, "limit": PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
     try:
-        r = requests.get(f"{BACKEND_URL}/sales/history", params=params, timeout=10)
+        r = requests.get(f"{BACKEND_URL}/sales/history", params=params,
+                         headers=get_auth_headers(), timeout=10)
         if r.status_code == 200:
-            return r.json()
+            return r.json(), r.headers.get("X-Next-Cursor")
         st.error(f"Error al obtener ventas ({r.status_code}): {r.text}")
-        return []
     except Exception as e:
         st.error(f"No se pudo conectar al backend: {e}")
-        return []
+    return [], None
+
+
+def api_get_sales_aggregates(params: dict) -> dict:
+    """Resumen, distribución por categoría y por día, calculados en el backend."""
+    try:
+        r = requests.get(f"{BACKEND_URL}/sales/history", params={**params, "aggregate": "all"},
+                         headers=get_auth_headers(), timeout=10)
+        if r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return {}
 
 
 # =============== Encabezado ===============
@@ -163,28 +191,29 @@ else:
 end_date = hoy
 
 # =============== Traer datos del backend ===============
-sales_data = api_get_sales_history(start_date, end_date, status_filter, search_query)
+params = _sales_params(start_date, end_date, status_filter, search_query)
+
+# las páginas ya traídas se guardan mientras no cambien los filtros
+filtros = tuple(sorted(params.items()))
+if st.session_state.get("sales_filters") != filtros:
+    st.session_state["sales_filters"] = filtros
+    st.session_state["sales_rows"], st.session_state["sales_cursor"] = api_get_sales_history(params)
 
-# Normalizar en DataFrame
+sales_data = st.session_state["sales_rows"]
+aggregates = api_get_sales_aggregates(params)
+summary = aggregates.get("summary", {})
+by_category = aggregates.get("by_category", [])
+
+# Normalizar en DataFrame (sólo las ventas que se muestran)
 df_sales = pd.DataFrame(sales_data) if sales_data else pd.DataFrame()
 
-# Esperamos algo así desde el backend para cada venta:
+# Cada venta que devuelve el backend:
 # {
-#   "id": "V-001",
-#   "product_name": "...",
-#   "category": "...",
-#   "subcategory": "...",
-#   "date": "2024-03-15T14:30:00",
-#   "client_name": "...",
-#   "client_address": "...",
-#   "quantity": 1,
-#   "unit_price": 25999,
-#   "total": 25999,
-#   "invoice": "FAC-2024-001",
-#   "status": "DELIVERED",
-#   "product_rating": 9.5,
-#   "client_rating": 10,
-#   "stock_at_sale": 15
+#   "id": "...", "order_id": "...", "invoice": "...",
+#   "product_name": "...", "category": "...", "subcategory": "...",
+#   "date": "2024-03-15T14:30:00", "client_name": "...",
+#   "quantity": 1, "unit_price": 25999, "total": 25999,
+#   "status": "DELIVERED", "product_rating": 9.5
 # }
 
 # Si hay fecha en ISO, separamos fecha y hora para mostrar lindo
@@ -197,33 +226,10 @@ if not df_sales.empty and "date" in df_sales.columns:
         df_sales["date_str"] = df_sales["date"].astype(str)
         df_sales["time_str"] = ""
 
-# =============== Resumen automático ===============
-if df_sales.empty:
-    total_ventas = 0
-    ingresos_totales = 0
-    valoracion_prom = 0
-    clientes_satisfechos = 0
-else:
-    total_ventas = len(df_sales)
-    ingresos_totales = float(df_sales.get("total", 0).sum())
-    # Rating de producto
-    if "product_rating" in df_sales.columns:
-        # ignoramos None / NaN
-        valoracion_prom = float(
-            df_sales["product_rating"].dropna().astype(float).mean()
-        ) if df_sales["product_rating"].notna().any() else 0
-    else:
-        valoracion_prom = 0
-
-    # % clientes satisfechos (cliente_rating >= 8)
-    if "client_rating" in df_sales.columns:
-        cr = df_sales["client_rating"].dropna()
-        if len(cr) > 0:
-            clientes_satisfechos = float((cr.astype(float) >= 8).mean() * 100)
-        else:
-            clientes_satisfechos = 0
-    else:
-        clientes_satisfechos = 0
+# =============== Resumen (calculado en el backend) ===============
+total_ventas = summary.get("sales", 0)
+ingresos_totales = float(summary.get("revenue", 0))
+valoracion_prom = float(summary.get("avg_product_rating") or 0)
 
 st.markdown(
     f"**📊 RESUMEN:** {total_ventas} VENTAS • "
@@ -348,6 +354,13 @@ else:
 
         st.markdown("</div>", unsafe_allow_html=True)
 
+if st.session_state.get("sales_cursor"):
+    if st.button("⬇️ CARGAR MÁS VENTAS", key="btn_more", use_container_width=True):
+        mas, cursor = api_get_sales_history(params, st.session_state["sales_cursor"])
+        st.session_state["sales_rows"] = sales_data + mas
+        st.session_state["sales_cursor"] = cursor
+        st.rerun()
+
 st.markdown('</div>', unsafe_allow_html=True)  # /list
 
 # =============== Pie ===============
@@ -368,12 +381,11 @@ with st.expander("📊 ESTADÍSTICAS DETALLADAS"):
     with col_stat3:
         st.metric("Valoración Promedio", f"{valoracion_prom:.1f}/10")
     with col_stat4:
-        st.metric("Clientes Satisfechos", f"{clientes_satisfechos:.0f}%")
+        st.metric("Unidades Vendidas", f"{summary.get('units', 0)}")
 
-    if not df_sales.empty and "category" in df_sales.columns:
+    if by_category:
         st.markdown("**📈 Distribución por Categoría:**")
-        dist = df_sales.groupby("category")["total"].sum().sort_values(ascending=False)
-        for cat, monto in dist.items():
-            st.markdown(f"- {cat}: ${monto:,.0f}".replace(",", "."))
+        for row in by_category:
+            st.markdown(f"- {row['category']}: ${row['revenue']:,.0f}".replace(",", "."))
     else:
         st.markdown("No hay datos suficientes para mostrar distribución por categoría.")
@@ -7,3 +7,7 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # Esto garantiza que pytest pueda importar backend.app.main SIEMPRE
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+
+# los tests pegan muchas veces desde el mismo cliente; el rate limit se
+# prueba aparte, con su propia app (tests/test_ratelimit.py)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
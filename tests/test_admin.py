@@ -0,0 +1,157 @@
+# tests/test_admin.py
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.app.main import app
+from backend.app.db import SessionLocal, engine
+from backend.app.models.models import User, Order, Payment
+from backend.app.security.revocation import revocations
+from backend.app.security.tokens import create_token_pair
+
+# token de admin con roles en los claims: require_admin no consulta la base
+ADMIN_TOKEN = create_token_pair("admin-tests", ["ADMIN"], "ACTIVO")["access_token"]
+client = TestClient(app, headers={"Authorization": f"Bearer {ADMIN_TOKEN}"})
+
+DIA = datetime(2023, 6, 15)
+PARAMS = {"from_date": "2023-06-15", "to_date": "2023-06-15"}
+
+
+def crear_ordenes_del_dia(n: int = 6):
+    """n órdenes el mismo día; las pares con dos pagos (el último APROBADO)."""
+    db = SessionLocal()
+    try:
+        ids = [o.id for o in db.query(Order.id).filter(Order.id.like("adm-%"))]
+        db.query(Payment).filter(Payment.order_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+        u = db.query(User).filter_by(email="admin_orders@mktlab.com").first()
+        if not u:
+            u = User(nombre="Ad", apellido="Min", tipo_doc="DNI", nro_doc="44440001",
+                     email="admin_orders@mktlab.com", tel="555", palabra_seg="gato",
+                     password_hash="x", acepta_terminos=True)
+            db.add(u)
+            db.flush()
+        for i in range(n):
+            created = DIA + timedelta(hours=i)
+            db.add(Order(id=f"adm-{i}", user_id=u.id, created_at=created, total_amount=100 * i))
+            db.add(Payment(order_id=f"adm-{i}", status="PENDIENTE", created_at=created, tx_ref=f"a{i}"))
+            if i % 2 == 0:
+                db.add(Payment(order_id=f"adm-{i}", status="APROBADO",
+                               created_at=created + timedelta(minutes=5), tx_ref=f"b{i}"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_admin_orders_una_consulta_y_ultimo_pago():
+    crear_ordenes_del_dia(6)
+    revocations.ensure_loaded()  # el filtro de revocados se arma una vez, al primer uso
+    selects = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        resp = client.get("/admin/orders", params=PARAMS)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [o["id"] for o in data] == [f"adm-{i}" for i in range(5, -1, -1)]
+    assert len(selects) == 1, selects
+    por_id = {o["id"]: o for o in data}
+    assert por_id["adm-4"]["payment_status"] == "APROBADO"
+    assert por_id["adm-4"]["tx_ref"] == "b4"
+    assert por_id["adm-3"]["payment_status"] == "PENDIENTE"
+    assert por_id["adm-3"]["user_email"] == "admin_orders@mktlab.com"
+
+
+def test_admin_orders_paginado_y_stream():
+    crear_ordenes_del_dia(6)
+    todas = client.get("/admin/orders", params=PARAMS).json()
+
+    vistas, params = [], {**PARAMS, "limit": 4}
+    while True:
+        resp = client.get("/admin/orders", params=params)
+        vistas.extend(resp.json())
+        nxt = resp.headers.get("X-Next-Cursor")
+        if not nxt:
+            break
+        params = {**PARAMS, "limit": 4, "cursor": nxt}
+    assert vistas == todas
+
+    resp = client.get("/admin/orders", params={**PARAMS, "stream": True})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in resp.text.splitlines()] == todas
+
+
+def test_export_ordenes_ndjson_y_csv():
+    import csv
+    import io
+
+    crear_ordenes_del_dia(6)
+    todas = client.get("/admin/orders", params=PARAMS).json()
+
+    resp = client.get("/admin/orders/export", params=PARAMS)
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in resp.text.splitlines()] == todas
+
+    resp = client.get("/admin/orders/export", params={**PARAMS, "format": "csv"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    filas = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [f["id"] for f in filas] == [o["id"] for o in todas]
+    assert filas[1]["payment_status"] == todas[1]["payment_status"]
+    assert filas[0]["created_at"] == todas[0]["created_at"]
+
+    vacio = client.get("/admin/orders/export",
+                       params={"from_date": "1990-01-01", "to_date": "1990-01-01", "format": "csv"})
+    assert vacio.text.strip() == "id,created_at,user_id,user_email,total_amount,payment_status,tx_ref"
+
+
+def test_export_usuarios_en_lotes(monkeypatch):
+    """El export lee de a lotes (yield_per) y devuelve lo mismo que el listado."""
+    from backend.app import streaming
+
+    lotes = []
+    original = streaming.iter_row_batches
+
+    def espiar(stmt, batch_size=streaming.STREAM_BATCH_SIZE):
+        for rows in original(stmt, 2):
+            lotes.append(len(rows))
+            yield rows
+
+    monkeypatch.setattr(streaming, "iter_row_batches", espiar)
+    db = SessionLocal()
+    try:
+        for i in range(3):  # al menos dos lotes, sin depender de otros tests
+            email = f"export_lotes_{i}@mktlab.com"
+            if not db.query(User).filter_by(email=email).first():
+                db.add(User(nombre="Ex", apellido=f"Port {i}", tipo_doc="DNI", nro_doc=f"4444001{i}",
+                            email=email, tel="555", palabra_seg="gato", password_hash="x",
+                            acepta_terminos=True))
+        db.commit()
+    finally:
+        db.close()
+
+    listado = client.get("/admin/users").json()
+    resp = client.get("/admin/users/export")
+    exportados = [json.loads(line) for line in resp.text.splitlines()]
+    assert exportados == listado
+    assert len(listado) >= 3
+    assert max(lotes) == 2 and sum(lotes) == len(listado)
+
+
+def test_admin_requiere_rol_admin_en_el_token():
+    anonimo = TestClient(app)
+    assert anonimo.get("/admin/users").status_code == 401
+    vendedor = create_token_pair("vendedor-tests", ["VENDEDOR"], "ACTIVO")["access_token"]
+    resp = anonimo.get("/admin/users", headers={"Authorization": f"Bearer {vendedor}"})
+    assert resp.status_code == 403
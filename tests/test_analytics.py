@@ -0,0 +1,396 @@
+# tests/test_analytics.py
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from backend.app.main import app
+from backend.app.db import SessionLocal
+from backend.app.analytics import append_order_created, consume_batch
+from backend.app.analytics.backfill import backfill, day_chunks
+from backend.app.analytics.sketches import range_sketches
+from backend.app.models.models import (
+    Order, OrderEvent, OrderItem, OutboxOffset, Product, SalesDayTotal, SalesRollup, SalesSketch, User,
+)
+from backend.app.security.tokens import create_token_pair
+from backend.app.workers import RollupOutboxWorker
+
+client = TestClient(app)
+# métricas del marketplace: sólo admin (roles en los claims, sin ir a la base)
+ADMIN_TOKEN = create_token_pair("admin-tests", ["ADMIN"], "ACTIVO")["access_token"]
+admin_client = TestClient(app, headers={"Authorization": f"Bearer {ADMIN_TOKEN}"})
+
+DIA = date(2022, 2, 10)
+
+
+def crear_ordenes(db):
+    """Dos órdenes el mismo día, con su evento en el outbox (como el checkout)."""
+    ids = [o.id for o in db.query(Order.id).filter(Order.id.like("anl-%"))]
+    db.query(OrderItem).filter(OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+    db.query(SalesRollup).filter(SalesRollup.day == DIA).delete()
+    db.query(SalesDayTotal).filter(SalesDayTotal.day == DIA).delete()
+    db.query(SalesSketch).filter(SalesSketch.day == DIA).delete()
+
+    ordenes = {
+        "anl-1": [("p1", "Mouse", "Tecno", "Ana", 2, 100), ("p2", "Remera", None, "Beto", 1, 50)],
+        "anl-2": [("p1", "Mouse", "Tecno", "Ana", 1, 100)],
+    }
+    for i, (oid, lineas) in enumerate(ordenes.items()):
+        created = datetime.combine(DIA, datetime.min.time()).replace(hour=10 + i)
+        items = [
+            {"order_id": oid, "product_id": pid, "product_name": name, "category": cat,
+             "seller": seller, "quantity": qty, "unit_price": price}
+            for pid, name, cat, seller, qty, price in lineas
+        ]
+        db.add(Order(id=oid, user_id=f"{oid}-buyer", created_at=created,
+                     total_amount=sum(it["quantity"] * it["unit_price"] for it in items)))
+        db.flush()
+        db.add_all(OrderItem(**it) for it in items)
+        append_order_created(db, oid, created, items, user_id=f"{oid}-buyer")
+    db.commit()
+    RollupOutboxWorker(batch_size=2).run_once()
+
+
+def rollup_del_dia(db):
+    """Rollup del día sumando los dos orígenes (stream + backfill)."""
+    rollup = db.execute(
+        select(SalesRollup.seller, SalesRollup.product_id, SalesRollup.category,
+               func.sum(SalesRollup.units), func.sum(SalesRollup.gmv), func.sum(SalesRollup.orders))
+        .where(SalesRollup.day == DIA)
+        .group_by(SalesRollup.seller, SalesRollup.product_id, SalesRollup.category)
+        .order_by(SalesRollup.product_id)
+    ).all()
+    total = db.execute(
+        select(func.sum(SalesDayTotal.orders), func.sum(SalesDayTotal.units), func.sum(SalesDayTotal.gmv))
+        .where(SalesDayTotal.day == DIA)
+    ).one()
+    return [tuple(r) for r in rollup], tuple(total)
+
+
+def test_outbox_igual_a_backfill():
+    esperado = (
+        [("Ana", "p1", "Tecno", 3, 300, 2), ("Beto", "p2", "", 1, 50, 1)],
+        (2, 4, 350),
+    )
+    db = SessionLocal()
+    try:
+        crear_ordenes(db)
+        assert rollup_del_dia(db) == esperado
+
+        # el backfill no cuenta órdenes que ya vinieron por el outbox
+        backfill(DIA, DIA, log=lambda *_: None)
+        db.expire_all()
+        assert rollup_del_dia(db) == esperado
+
+        # como si fueran órdenes viejas (sin evento): las recalcula el backfill
+        db.query(OrderEvent).filter(OrderEvent.order_id.like("anl-%")).delete(synchronize_session=False)
+        db.query(SalesRollup).filter(SalesRollup.day == DIA, SalesRollup.source == "stream").delete()
+        db.query(SalesDayTotal).filter(SalesDayTotal.day == DIA, SalesDayTotal.source == "stream").delete()
+        db.query(SalesSketch).filter(SalesSketch.day == DIA, SalesSketch.source == "stream").delete()
+        db.commit()
+        backfill(DIA - timedelta(days=3), DIA + timedelta(days=3), chunk_days=2, workers=3,
+                 log=lambda *_: None)
+        db.expire_all()
+        assert rollup_del_dia(db) == esperado
+        buyers, productos, vendedores = range_sketches(db, DIA, DIA)
+        assert round(buyers.count()) == 2
+        assert productos.top(1) == [("p1", 3)] and vendedores.top(1) == [("Ana", 300)]
+    finally:
+        db.close()
+
+
+def test_outbox_retoma_desde_el_offset_y_espera_huecos():
+    consumer = "test_huecos"
+    db = SessionLocal()
+    try:
+        db.query(OutboxOffset).filter_by(consumer=consumer).delete()
+        ultimo = db.execute(select(func.max(OrderEvent.id))).scalar() or 0
+        db.add(OutboxOffset(consumer=consumer, last_event_id=ultimo))
+        ahora = datetime.utcnow()
+        for i in range(1, 5):
+            db.add(OrderEvent(id=ultimo + i, order_id=f"hueco-{i}", event_type="otro",
+                              created_at=ahora, payload="{}"))
+        db.commit()
+        # id ultimo+2 "todavía no se confirmó"
+        db.query(OrderEvent).filter(OrderEvent.id == ultimo + 2).delete()
+        db.commit()
+
+        assert consume_batch(db, consumer) == (1, ultimo + 1)
+        assert consume_batch(db, consumer) == (0, ultimo + 1)
+
+        # pasado OUTBOX_GAP_WAIT el hueco se da por perdido; otra sesión retoma del offset
+        db2 = SessionLocal()
+        try:
+            assert consume_batch(db2, consumer, now=ahora + timedelta(hours=1)) == (2, ultimo + 4)
+        finally:
+            db2.close()
+    finally:
+        db.query(OrderEvent).filter(OrderEvent.order_id.like("hueco-%")).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def test_tramos_del_backfill():
+    assert day_chunks(date(2024, 1, 1), date(2024, 1, 5), 2) == [
+        (date(2024, 1, 1), date(2024, 1, 2)),
+        (date(2024, 1, 3), date(2024, 1, 4)),
+        (date(2024, 1, 5), date(2024, 1, 5)),
+    ]
+
+
+def test_endpoints_de_analytics():
+    db = SessionLocal()
+    try:
+        crear_ordenes(db)
+        vendedor = db.query(User).filter_by(email="anl_seller@mktlab.com").first()
+        if not vendedor:
+            vendedor = User(nombre="Anl", apellido="Seller", tipo_doc="DNI", nro_doc="33330021",
+                            email="anl_seller@mktlab.com", tel="555", palabra_seg="gato",
+                            password_hash="x", acepta_terminos=True)
+            db.add(vendedor)
+            db.flush()
+            db.add(Product(seller_id=vendedor.id, name="Producto anl", price=1, stock=1))
+        db.commit()
+    finally:
+        db.close()
+    rango = {"from": "2022-02-09", "to": "2022-02-11"}
+
+    resumen = admin_client.get("/analytics/orders", params=rango).json()
+    assert (resumen["gmv"], resumen["orders"], resumen["units"], resumen["aov"]) == (350, 2, 4, 175)
+    assert resumen["unique_buyers"] == 2
+    assert [d["total"] for d in resumen["daily"]] == [0, 350, 0]
+    assert resumen["top_sellers"][0] == {"seller": "Ana", "units": 3, "sales": 300}
+    assert resumen["top_products"][0]["product"] == "Mouse"
+
+    diario = admin_client.get("/analytics/sales-daily", params={"start": "2022-02-10", "end": "2022-02-10"}).json()
+    assert diario == [{"date": "2022-02-10", "total": 350, "orders": 2, "units": 4}]
+
+    top = admin_client.get("/analytics/top-products", params={**rango, "limit": 1}).json()
+    assert top == [{"product_id": "p1", "product": "Mouse", "units": 3, "sales": 300}]
+
+    margenes = admin_client.get("/analytics/category-margins", params=rango).json()
+    assert [m["category"] for m in margenes] == ["Tecno", "Sin categoría"]
+    assert margenes[0]["margin"] == 45  # 15% de 300
+
+    resumen = admin_client.get("/analytics/sales-summary", params=rango).json()
+    assert resumen["total_sales"] == 350 and resumen["ticket_avg"] == 175
+
+    glob = admin_client.get("/analytics/global").json()
+    assert glob["total_users"] > 0 and glob["total_products"] > 0
+    assert isinstance(glob["top_categories"], list)
+
+    assert admin_client.get("/analytics/orders", params={"from": "2022-02-11", "to": "2022-02-01"}).status_code == 400
+
+
+def test_analytics_del_marketplace_requiere_admin():
+    assert client.get("/analytics/global").status_code == 401
+    vendedor = create_token_pair("vendedor-tests", ["VENDEDOR"], "ACTIVO")["access_token"]
+    for path in ("/analytics/global", "/analytics/orders", "/analytics/top-sellers",
+                 "/analytics/category-margins"):
+        resp = client.get(path, headers={"Authorization": f"Bearer {vendedor}"})
+        assert resp.status_code == 403, path
+
+
+def crear_ventas_de_vendedor(db, hoy):
+    """Vendedor con dos productos, un comprador y dos órdenes (con evento en el outbox)."""
+    for email in ("dash_seller@mktlab.com", "dash_buyer@mktlab.com"):
+        viejo = db.query(User).filter_by(email=email).first()
+        if viejo:
+            db.query(Product).filter(Product.seller_id == viejo.id).delete()
+            db.delete(viejo)
+    ids = [o.id for o in db.query(Order.id).filter(Order.id.like("dash-%"))]
+    db.query(OrderItem).filter(OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+
+    seller, buyer = (
+        User(nombre=n, apellido="Dash", tipo_doc="DNI", nro_doc=doc, email=email, tel="555",
+             palabra_seg="gato", password_hash="x", acepta_terminos=True)
+        for n, doc, email in (("Vera", "33330001", "dash_seller@mktlab.com"),
+                              ("Bruno", "33330002", "dash_buyer@mktlab.com"))
+    )
+    db.add_all([seller, buyer])
+    db.flush()
+    pa = Product(seller_id=seller.id, name="Mate", price=100, stock=50, rating=8)
+    pb = Product(seller_id=seller.id, name="Bombilla", price=50, stock=50)
+    db.add_all([pa, pb])
+    db.flush()
+    productos = {"A": (pa.id, "Mate", "Hogar", 100), "B": (pb.id, "Bombilla", "Hogar", 50)}
+    db.commit()
+
+    def orden(oid, cuando, lineas):
+        items = [
+            {"order_id": oid, "product_id": productos[p][0], "product_name": productos[p][1],
+             "category": productos[p][2], "seller": "Vera", "quantity": q, "unit_price": productos[p][3]}
+            for p, q in lineas
+        ]
+        db.add(Order(id=oid, user_id=buyer.id, user_name="Bruno Dash", status="En camino",
+                     created_at=cuando, total_amount=sum(i["quantity"] * i["unit_price"] for i in items)))
+        db.flush()
+        db.add_all(OrderItem(**it) for it in items)
+        append_order_created(db, oid, cuando, items, user_id=buyer.id)
+        db.commit()
+
+    ayer = datetime.combine(hoy - timedelta(days=1), datetime.min.time())
+    orden("dash-1", ayer, [("A", 2), ("B", 1)])
+    orden("dash-2", ayer - timedelta(days=40), [("A", 1)])
+    return seller.id, buyer.id, orden
+
+
+def test_dashboard_columnar_vendedor_y_comprador():
+    from backend.app.analytics.columnar import ColumnarSales
+
+    hoy = date.today()
+    db = SessionLocal()
+    try:
+        seller_id, buyer_id, orden = crear_ventas_de_vendedor(db, hoy)
+        motor = ColumnarSales(refresh_seconds=0)
+        antes = motor.seller_dashboard(db, seller_id, hoy)
+        assert antes["kpis"]["total_sales"] == 350 and antes["kpis"]["orders_count"] == 2
+
+        # la orden nueva entra por el outbox a la cola, sin recargar todo
+        orden("dash-3", datetime.utcnow(), [("B", 4)])
+        dash = motor.seller_dashboard(db, seller_id, hoy)
+        assert len(motor.refresh().tail["seller"]) == 1
+
+        kpis = dash["kpis"]
+        assert (kpis["total_sales"], kpis["orders_count"], kpis["units"]) == (550, 3, 8)
+        assert kpis["rating"] == 8.0
+        assert kpis["sales_delta_label"] == "+350% vs 30 días anteriores"
+        assert dash["series"]["monthly_sales"][-1]["period"] == f"{hoy.year}-{hoy.month:02d}"
+        assert sum(m["total"] for m in dash["series"]["monthly_sales"]) == 550
+        assert dash["series"]["orders_by_category"] == [{"category": "Hogar", "orders": 3}]
+        top = dash["lists"]["top_products"]
+        assert [(p["name"], p["sold"], p["sales"], p["price"]) for p in top] == [
+            ("Bombilla", 5, 250, 50), ("Mate", 3, 300, 100),
+        ]
+        recientes = dash["lists"]["recent_orders"]
+        assert [r["id"] for r in recientes] == ["dash-3", "dash-1", "dash-2"]
+        assert recientes[1] == {
+            "id": "dash-1", "code": "dash-1", "product_name": "Mate (+1)", "total": 250,
+            "status": "EN_CAMINO", "status_label": "En camino", "client_name": "Bruno Dash",
+        }
+
+        # carga completa desde cero == base + cola
+        assert ColumnarSales().seller_dashboard(db, seller_id, hoy) == dash
+
+        compras = motor.buyer_dashboard(db, buyer_id, hoy)
+        assert (compras["kpis"]["total_spent"], compras["kpis"]["orders_count"]) == (550, 3)
+        assert compras["kpis"]["fav_products_count"] == 2
+        assert compras["lists"]["top_brands"][0]["name"] == "Vera Dash"
+        assert compras["lists"]["top_brands"][0]["orders"] == 3
+        assert motor.seller_dashboard(db, "no-existe", hoy)["kpis"]["total_sales"] == 0
+    finally:
+        db.close()
+
+    from backend.app.security.tokens import create_access_token
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': seller_id})}"}
+    resp = client.get("/analytics/seller/dashboard", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["kpis"]["total_sales"] == 550
+    assert client.get("/analytics/buyer/dashboard").status_code == 401
+
+
+def test_compras_recientes_en_orden_cronologico_con_varios_vendedores():
+    from backend.app.analytics.columnar import ColumnarSales
+
+    hoy = date.today()
+    db = SessionLocal()
+    try:
+        emails = ("cron_a@mktlab.com", "cron_b@mktlab.com", "cron_buyer@mktlab.com")
+        for viejo in db.query(User).filter(User.email.in_(emails)):
+            db.query(Product).filter(Product.seller_id == viejo.id).delete()
+            db.delete(viejo)
+        ids = [o.id for o in db.query(Order.id).filter(Order.id.like("cron-%"))]
+        db.query(OrderItem).filter(OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+        vend_a, vend_b, buyer = (
+            User(nombre=n, apellido="Cron", tipo_doc="DNI", nro_doc=doc, email=email, tel="555",
+                 palabra_seg="gato", password_hash="x", acepta_terminos=True)
+            for n, doc, email in zip(("Ana", "Beto", "Caro"), ("33330031", "33330032", "33330033"), emails)
+        )
+        db.add_all([vend_a, vend_b, buyer])
+        db.flush()
+        productos = [Product(seller_id=v.id, name=f"Prod {v.nombre}", price=10, stock=50) for v in (vend_a, vend_b)]
+        db.add_all(productos)
+        db.flush()
+        # una orden por mes, alternando vendedor: la base agrupa por vendedor, no por fecha
+        for mes in range(1, 8):
+            oid, prod = f"cron-{mes}", productos[mes % 2]
+            cuando = datetime.combine(hoy - timedelta(days=30 * (8 - mes)), datetime.min.time())
+            db.add(Order(id=oid, user_id=buyer.id, user_name="Caro Cron", status="En camino",
+                         created_at=cuando, total_amount=10))
+            db.flush()
+            db.add(OrderItem(order_id=oid, product_id=prod.id, product_name=prod.name, category="Hogar",
+                             seller=prod.name, quantity=1, unit_price=10))
+        db.commit()
+
+        compras = ColumnarSales(refresh_seconds=0).buyer_dashboard(db, buyer.id, hoy)
+        recientes = [r["id"] for r in compras["lists"]["recent_purchases"]]
+        assert recientes == ["cron-7", "cron-6", "cron-5", "cron-4", "cron-3"]
+    finally:
+        db.close()
+
+
+def test_motor_columnar_publica_snapshots_sin_hacer_esperar():
+    from backend.app.analytics.columnar import ColumnarSales
+
+    db = SessionLocal()
+    try:
+        _, _, orden = crear_ventas_de_vendedor(db, date.today())
+        motor = ColumnarSales(refresh_seconds=0)
+        viejo = motor.refresh()
+        n = len(viejo.order_ids)
+
+        orden("dash-4", datetime.utcnow(), [("A", 1)])
+        # otro hilo está refrescando: el request usa el snapshot publicado, no espera
+        with motor._lock:
+            assert motor.snapshot() is viejo
+        nuevo = motor.snapshot()
+        assert len(nuevo.order_ids) == n + 1
+        assert len(viejo.order_ids) == n and len(viejo.tail["seller"]) == 0  # no se tocó
+
+        # con el worker andando, los requests sólo leen
+        motor.background = True
+        orden("dash-5", datetime.utcnow(), [("A", 1)])
+        assert motor.snapshot() is nuevo
+    finally:
+        db.close()
+
+
+def test_sketches_hll_y_count_min():
+    from backend.app.analytics.sketches import HLL_STD_ERROR, CountMinTopK, HyperLogLog
+
+    # HLL: error dentro de 3σ y la combinación es la unión
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(30_000):
+        a.add(f"u{i}")
+    for i in range(20_000, 50_000):
+        b.add(f"u{i}")
+    assert abs(a.count() - 30_000) / 30_000 < 3 * HLL_STD_ERROR
+    union = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+    assert abs(union.count() - 50_000) / 50_000 < 3 * HLL_STD_ERROR
+    chico = HyperLogLog()
+    for u in ("x", "y", "z", "x"):
+        chico.add(u)
+    assert round(chico.count()) == 3
+
+    # Count-Min: nunca subestima y los pesados quedan arriba al combinar días
+    dias = []
+    for d in range(3):
+        cm = CountMinTopK()
+        for i in range(2000):
+            cm.add(f"p{i}", 1)
+        cm.add("estrella", 5000)
+        cm.add(f"del-dia-{d}", 3000)
+        data, keys = cm.to_row()
+        dias.append(CountMinTopK.from_row(data, keys))
+    total = dias[0].merge(dias[1]).merge(dias[2])
+    top = total.top(4)
+    assert [k for k, _ in top[:1]] == ["estrella"]
+    assert {k for k, _ in top[1:]} == {"del-dia-0", "del-dia-1", "del-dia-2"}
+    assert all(total.estimate(f"p{i}") >= 3 for i in range(50))
+    assert top[0][1] >= 15_000
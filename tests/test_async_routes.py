@@ -0,0 +1,89 @@
+# tests/test_async_routes.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("aiosqlite")
+
+from backend.app.db import SessionLocal
+from backend.app.models.models import Cart, CartItem, Product, User
+from backend.app.routers import routes_async
+from backend.app.search import index_product
+from backend.app.security import hash_password
+
+# sólo el router async: si algo cayera en una ruta sync daría 404
+app_async = FastAPI()
+app_async.include_router(routes_async.router)
+
+BUYER_EMAIL = "buyer_async@mktlab.com"
+SELLER_EMAIL = "seller_async@mktlab.com"
+
+
+def crear_comprador_y_producto():
+    db = SessionLocal()
+    try:
+        for email in (BUYER_EMAIL, SELLER_EMAIL):
+            u = db.query(User).filter_by(email=email).first()
+            if u:
+                cart_ids = [c.id for c in db.query(Cart.id).filter(Cart.user_id == u.id)]
+                db.query(CartItem).filter(CartItem.cart_id.in_(cart_ids)).delete(synchronize_session=False)
+                db.query(Cart).filter(Cart.user_id == u.id).delete(synchronize_session=False)
+                db.query(Product).filter(Product.seller_id == u.id).delete(synchronize_session=False)
+                db.delete(u)
+        db.commit()
+        buyer = User(nombre="Asy", apellido="Nc", tipo_doc="DNI", nro_doc="66620001", email=BUYER_EMAIL,
+                     tel="555", palabra_seg="gato", password_hash=hash_password("Async123!"),
+                     acepta_terminos=True)
+        seller = User(nombre="Vende", apellido="Async", tipo_doc="DNI", nro_doc="66620002",
+                      email=SELLER_EMAIL, tel="555", palabra_seg="gato", password_hash="x",
+                      acepta_terminos=True)
+        db.add_all([buyer, seller])
+        db.flush()
+        p = Product(seller_id=seller.id, name="Producto async", price=250, stock=5)
+        db.add(p)
+        db.commit()
+        index_product(db, p)
+        db.commit()
+        return buyer.id, p.id
+    finally:
+        db.close()
+
+
+def test_rutas_async_login_productos_y_carrito():
+    buyer_id, pid = crear_comprador_y_producto()
+
+    with TestClient(app_async) as client:
+        assert client.post("/auth/login", json={"email": BUYER_EMAIL, "password": "mal"}).status_code == 401
+        r = client.post("/auth/login", json={"email": BUYER_EMAIL, "password": "Async123!"})
+        assert r.status_code == 200, r.text
+        assert r.json()["user_id"] == buyer_id
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        r = client.get(f"/products/{pid}")
+        assert r.status_code == 200 and r.json()["seller_name"] == "Vende Async"
+        assert client.get("/products/no-existe").status_code == 404
+        assert any(p["id"] == pid for p in client.get("/products", params={"limit": 100}).json())
+        # páginas grandes se arman en el threadpool: misma respuesta
+        grande = client.get("/products", params={"limit": routes_async.ASYNC_SERIALIZE_ROWS + 1})
+        assert grande.status_code == 200 and len(grande.json()) >= 1
+        # búsqueda: el índice corre en el threadpool
+        encontrados = client.get("/products", params={"q": "async", "limit": 100}).json()
+        assert pid in [p["id"] for p in encontrados]
+
+        # primera visita: crea el carrito vacío
+        vacio = client.get("/cart", headers=headers)
+        assert vacio.status_code == 200, vacio.text
+        assert vacio.json()["items"] == [] and vacio.json()["total"] == 0
+
+        db = SessionLocal()
+        try:
+            db.add(CartItem(cart_id=vacio.json()["id"], product_id=pid, name="Producto async",
+                            price=250, qty=3, image="", seller="Vende Async", stock_snapshot=5))
+            db.commit()
+        finally:
+            db.close()
+
+        r = client.get("/cart", headers=headers)
+        assert r.json()["id"] == vacio.json()["id"]
+        assert r.json()["items"][0]["qty"] == 3 and r.json()["total"] == 750
+        assert client.get("/cart").status_code == 401
@@ -1,11 +1,13 @@
 # tests/test_auth_login.py
 
 from fastapi.testclient import TestClient
+from passlib.hash import pbkdf2_sha256
 
 from backend.app.main import app
 from backend.app.db import SessionLocal
 from backend.app.models.models import User
-from backend.app.security import hash_password  # usa el mismo scheme que verify_password
+from backend.app.security import decode_token, hash_password  # usa el mismo scheme que verify_password
+from backend.app.passwords import PASSWORD_HASH_ROUNDS
 
 client = TestClient(app)
 
@@ -105,3 +107,54 @@ def test_login_password_incorrecta():
     # En tu router devolvés:
     # raise HTTPException(status_code=401, detail="Credenciales inválidas")
     assert resp.status_code == 401, f"Status: {resp.status_code}, body: {resp.text}"
+
+
+def test_refresh_renueva_claims_y_rechaza_access_token():
+    """
+    El access token trae roles/estado firmados; /auth/refresh devuelve un par
+    nuevo con los datos releídos de la base. Un refresh token no sirve como
+    access token ni al revés.
+    """
+    crear_usuario_de_prueba()
+    data = client.post("/auth/login", json={"email": "login_test@mktlab.com", "password": "Test123!"}).json()
+    claims = decode_token(data["access_token"])
+    assert claims["roles"] == [] and claims["estado"] == "ACTIVO"
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter_by(email="login_test@mktlab.com").update({"estado": "REVISION"})
+        db.commit()
+    finally:
+        db.close()
+
+    resp = client.post("/auth/refresh", json={"refresh_token": data["refresh_token"]})
+    assert resp.status_code == 200, resp.text
+    assert decode_token(resp.json()["access_token"])["estado"] == "REVISION"
+
+    assert client.post("/auth/refresh", json={"refresh_token": data["access_token"]}).status_code == 401
+    refresh_como_access = {"Authorization": f"Bearer {data['refresh_token']}"}
+    assert client.get("/cart", headers=refresh_como_access).status_code == 401
+
+
+def test_login_rehashea_al_costo_configurado():
+    """Un hash con menos rondas que PASSWORD_HASH_ROUNDS se reemplaza en el login."""
+    u = crear_usuario_de_prueba()
+    viejo = pbkdf2_sha256.using(rounds=1000).hash("Test123!")
+    db = SessionLocal()
+    try:
+        db.query(User).filter_by(id=u.id).update({"password_hash": viejo})
+        db.commit()
+    finally:
+        db.close()
+
+    resp = client.post("/auth/login", json={"email": "login_test@mktlab.com", "password": "Test123!"})
+    assert resp.status_code == 200, resp.text
+
+    db = SessionLocal()
+    try:
+        nuevo = db.get(User, u.id).password_hash
+    finally:
+        db.close()
+    assert nuevo != viejo
+    assert pbkdf2_sha256.from_string(nuevo).rounds == PASSWORD_HASH_ROUNDS
+    assert client.post("/auth/login", json={"email": "login_test@mktlab.com", "password": "Test123!"}).status_code == 200
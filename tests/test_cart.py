@@ -0,0 +1,239 @@
+# tests/test_cart.py
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from backend.app.db import SessionLocal
+from backend.app.models.models import User, Product, Cart, CartItem
+from backend.app.crud import cart_crud
+
+STOCK = 40
+HILOS = 16
+INTENTOS_POR_HILO = 5
+
+
+def crear_escenario():
+    """Un producto con STOCK unidades y un comprador por hilo."""
+    db = SessionLocal()
+    try:
+        seller = db.query(User).filter_by(email="seller_stress@mktlab.com").first()
+        if seller:
+            buyers = db.query(User.id).filter(User.email.like("buyer_stress_%")).all()
+            buyer_ids = [b.id for b in buyers]
+            carts = db.query(Cart.id).filter(Cart.user_id.in_(buyer_ids)).all()
+            db.query(CartItem).filter(CartItem.cart_id.in_([c.id for c in carts])).delete(synchronize_session=False)
+            db.query(Cart).filter(Cart.user_id.in_(buyer_ids)).delete(synchronize_session=False)
+            db.query(User).filter(User.id.in_(buyer_ids)).delete(synchronize_session=False)
+            db.query(Product).filter(Product.seller_id == seller.id).delete(synchronize_session=False)
+            db.delete(seller)
+            db.commit()
+
+        def usuario(email: str, doc: str) -> User:
+            return User(
+                nombre="Stress", apellido="Test", tipo_doc="DNI", nro_doc=doc,
+                email=email, tel="555", palabra_seg="gato",
+                password_hash="x", acepta_terminos=True,
+            )
+
+        seller = usuario("seller_stress@mktlab.com", "66660000")
+        db.add(seller)
+        buyers = [usuario(f"buyer_stress_{i}@mktlab.com", f"6666{i + 1:04d}") for i in range(HILOS)]
+        db.add_all(buyers)
+        db.flush()
+
+        product = Product(seller_id=seller.id, name="Producto stress", price=100, stock=STOCK)
+        db.add(product)
+        db.commit()
+        return product.id, [b.id for b in buyers]
+    finally:
+        db.close()
+
+
+def test_reserva_concurrente_no_sobrevende():
+    product_id, buyer_ids = crear_escenario()
+    ok, sin_stock, errores = [], [], []
+    barrera = threading.Barrier(HILOS)
+
+    def comprar(user_id: str):
+        barrera.wait()
+        for _ in range(INTENTOS_POR_HILO):
+            db = SessionLocal()
+            try:
+                cart_crud.add_item_reserving_stock(db, user_id, product_id, 1)
+                db.commit()
+                ok.append(user_id)
+            except HTTPException as e:
+                sin_stock.append(e.status_code)
+            except Exception as e:  # pragma: no cover - sólo para reportar
+                db.rollback()
+                errores.append(repr(e))
+            finally:
+                db.close()
+
+    hilos = [threading.Thread(target=comprar, args=(uid,)) for uid in buyer_ids]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    elapsed = time.perf_counter() - t0
+
+    total = HILOS * INTENTOS_POR_HILO
+    print(f"{total} intentos en {elapsed:.2f}s ({total / elapsed:.0f} ops/s)")
+
+    assert errores == []
+    assert len(ok) == STOCK
+    assert sin_stock == [400] * (total - STOCK)
+
+    db = SessionLocal()
+    try:
+        assert db.get(Product, product_id).stock == 0
+        en_carritos = (
+            db.query(func.sum(CartItem.qty))
+            .filter(CartItem.product_id == product_id)
+            .scalar()
+        )
+        assert en_carritos == STOCK
+        # cada comprador tiene un solo renglón para el producto (se suma qty)
+        renglones = db.query(CartItem).filter(CartItem.product_id == product_id).count()
+        assert renglones == len(set(ok))
+    finally:
+        db.close()
+
+
+def test_reserva_producto_inexistente_o_sin_stock():
+    product_id, buyer_ids = crear_escenario()
+    db = SessionLocal()
+    try:
+        try:
+            cart_crud.add_item_reserving_stock(db, buyer_ids[0], "no-existe", 1)
+            assert False, "debería fallar"
+        except HTTPException as e:
+            assert e.status_code == 404
+
+        try:
+            cart_crud.add_item_reserving_stock(db, buyer_ids[0], product_id, STOCK + 1)
+            assert False, "debería fallar"
+        except HTTPException as e:
+            assert e.status_code == 400
+        assert db.get(Product, product_id).stock == STOCK
+    finally:
+        db.close()
+
+
+def test_quitar_y_cambiar_cantidad_devuelven_stock():
+    product_id, buyer_ids = crear_escenario()
+    uid = buyer_ids[0]
+    db = SessionLocal()
+    try:
+        cart_crud.add_item_reserving_stock(db, uid, product_id, 5)
+        db.commit()
+        item = db.query(CartItem).filter_by(product_id=product_id).one()
+        assert item.reserved_until is not None
+        item_id = item.id
+        assert db.get(Product, product_id).stock == STOCK - 5
+
+        assert cart_crud.update_cart_item_qty(db, uid, item_id, 2)
+        db.expire_all()
+        assert db.get(Product, product_id).stock == STOCK - 2
+
+        assert cart_crud.update_cart_item_qty(db, uid, item_id, 7)
+        db.expire_all()
+        assert db.get(Product, product_id).stock == STOCK - 7
+
+        try:
+            cart_crud.update_cart_item_qty(db, uid, item_id, STOCK + 1)
+            assert False, "debería fallar"
+        except HTTPException as e:
+            assert e.status_code == 400
+
+        assert cart_crud.remove_cart_item(db, uid, item_id)
+        db.expire_all()
+        assert db.get(Product, product_id).stock == STOCK
+        assert not cart_crud.remove_cart_item(db, uid, item_id)
+    finally:
+        db.close()
+
+
+def test_sweeper_libera_reservas_vencidas():
+    from datetime import datetime, timedelta
+    from backend.app import metrics
+    from backend.app.workers import ReservationSweeper
+
+    product_id, buyer_ids = crear_escenario()
+    db = SessionLocal()
+    try:
+        for uid in buyer_ids[:5]:
+            cart_crud.add_item_reserving_stock(db, uid, product_id, 3)
+            db.commit()
+        assert db.get(Product, product_id).stock == STOCK - 15
+
+        # vencemos 3 de las 5 reservas
+        vencidas = [
+            c.id for c in db.query(Cart.id).filter(Cart.user_id.in_(buyer_ids[:3]))
+        ]
+        db.query(CartItem).filter(CartItem.cart_id.in_(vencidas)).update(
+            {CartItem.reserved_until: datetime.utcnow() - timedelta(minutes=1)},
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    antes = metrics.get("cart_reservation_units_released_total")
+    items, units = ReservationSweeper(interval=60, batch_size=2).run_once()
+    assert (items, units) == (3, 9)
+    assert metrics.get("cart_reservation_last_sweep_units") == 9
+    assert metrics.get("cart_reservation_units_released_total") - antes == 9
+
+    db = SessionLocal()
+    try:
+        assert db.get(Product, product_id).stock == STOCK - 6
+        assert db.query(CartItem).filter_by(product_id=product_id).count() == 2
+    finally:
+        db.close()
+
+
+def test_sweeper_no_borra_reservas_renovadas_en_el_medio():
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+
+    product_id, buyer_ids = crear_escenario()
+    db = SessionLocal()
+    try:
+        for uid in buyer_ids[:2]:
+            cart_crud.add_item_reserving_stock(db, uid, product_id, 2)
+            db.commit()
+        db.query(CartItem).filter_by(product_id=product_id).update(
+            {CartItem.reserved_until: datetime.utcnow() - timedelta(minutes=1)},
+            synchronize_session=False,
+        )
+        db.commit()
+        renovado = db.query(CartItem).filter_by(product_id=product_id).first().id
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    execute = db.execute
+
+    def execute_con_renovacion(stmt, *args, **kwargs):
+        # justo antes del DELETE, "otro request" renueva y cambia la cantidad de un ítem
+        if stmt.is_delete:
+            execute(update(CartItem).where(CartItem.id == renovado).values(
+                qty=1, reserved_until=datetime.utcnow() + timedelta(minutes=30)))
+        return execute(stmt, *args, **kwargs)
+
+    db.execute = execute_con_renovacion
+    try:
+        assert cart_crud.release_expired_reservations(db) == (1, 2)
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        assert [i.id for i in db.query(CartItem).filter_by(product_id=product_id)] == [renovado]
+        assert db.get(Product, product_id).stock == STOCK - 2  # sólo volvieron las 2 unidades del vencido
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+# tests/test_db.py
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.app.db import make_engine, pool_stats
+from backend.app.main import app
+
+client = TestClient(app)
+
+
+def test_perfil_sqlite_aplica_pragmas_y_pool(tmp_path):
+    eng = make_engine(f"sqlite:///{tmp_path / 'perfil.db'}", profile="tuned")
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1   # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+        assert pool_stats(eng)["checked_out"] == 1
+    assert pool_stats(eng)["checked_out"] == 0
+    assert eng.pool._pre_ping is False
+    eng.dispose()
+
+    basico = make_engine(f"sqlite:///{tmp_path / 'basico.db'}", profile="basic")
+    with basico.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    basico.dispose()
+
+
+def test_metrics_publica_el_pool():
+    data = client.get("/metrics").json()
+    assert {"db_pool_size", "db_pool_checked_out", "db_pool_checked_in", "db_pool_overflow"} <= set(data)
@@ -0,0 +1,43 @@
+# tests/test_hash_pool.py
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app import passwords
+from backend.app.security.hash_pool import HashPool
+
+
+def test_pool_de_procesos_hashea_y_verifica():
+    pool = HashPool(workers=1, max_pending=4)
+    try:
+        h = pool.run(passwords.hash_password, "Clave123!")
+        assert pool.run(passwords.verify_and_update, "Clave123!", h) == (True, None)
+        assert pool.run(passwords.verify_and_update, "otra", h)[0] is False
+    finally:
+        pool.shutdown()
+
+
+def test_pool_saturado_rechaza_con_503():
+    pool = HashPool(workers=0, max_pending=1)
+    pool._pending = 1  # un hash en curso
+    with pytest.raises(HTTPException) as exc:
+        pool.submit(time.sleep, 0)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+    pool._pending = 0
+    assert pool.run(passwords.verify_password, "x", passwords.hash_password("x")) is True
+    assert pool.stats()["pending"] == 0
+
+
+def test_worker_del_pool_no_importa_la_app():
+    # lo mismo que hace un proceso spawn al deserializar passwords.verify_and_update
+    codigo = (
+        "import sys, backend.app.passwords; "
+        "print(sorted(m for m in sys.modules if m.startswith('backend.app.') and m != 'backend.app.passwords'))"
+    )
+    out = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
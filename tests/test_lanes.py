@@ -0,0 +1,105 @@
+# tests/test_lanes.py
+import asyncio
+
+from backend.app.lanes import LANE_RETRY_AFTER_MAX, Lane, LaneMiddleware
+
+
+def test_reporting_saturado_no_frena_al_carril_critico():
+    async def escenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/admin/orders":
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        middleware = LaneMiddleware(app, lanes=[
+            Lane("reporting", ("/admin",), 1, 0.1, methods=frozenset({"GET"})),
+            Lane("critical", ("/cart",), 1, 0.1),
+        ])
+
+        async def request(path: str, method: str = "GET") -> list[dict]:
+            enviados: list[dict] = []
+            scope = {"type": "http", "method": method, "path": path, "headers": []}
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(msg):
+                enviados.append(msg)
+
+            await middleware(scope, receive, send)
+            return enviados
+
+        primero = asyncio.create_task(request("/admin/orders"))
+        await asyncio.sleep(0.02)
+        assert middleware.stats()["reporting_in_flight"] == 1
+
+        # reporting lleno: el segundo espera queue_timeout y sale con 503
+        segundo = await request("/admin/orders")
+        assert segundo[0]["status"] == 503
+        retry_after = int(dict(segundo[0]["headers"])[b"retry-after"])
+        assert 1 <= retry_after <= LANE_RETRY_AFTER_MAX
+        # el carril crítico tiene sus propios lugares
+        assert (await request("/cart"))[0]["status"] == 200
+        # las escrituras de admin no son reporting: no hacen cola detrás del listado
+        assert (await request("/admin/users/u1/estado", "PATCH"))[0]["status"] == 200
+        # sin carril: pasa directo
+        assert (await request("/otra"))[0]["status"] == 200
+
+        release.set()
+        assert (await primero)[0]["status"] == 200
+        assert middleware.stats()["reporting_in_flight"] == 0
+        assert middleware.stats()["reporting_waiting"] == 0
+
+    asyncio.run(escenario())
+
+
+def test_carril_con_duty_retiene_el_lugar_sólo_con_el_carril_crítico_ocupado():
+    async def escenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"].startswith("/cart"):
+                await release.wait()
+            else:
+                await asyncio.sleep(0.05)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        middleware = LaneMiddleware(app, lanes=[
+            Lane("reporting", ("/admin",), 1, 0.01, duty=0.5, yields_to="critical"),
+            Lane("critical", ("/cart",), 1, 0.1),
+        ])
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        def request(path: str, enviados: list[dict]):
+            async def send(msg):
+                enviados.append(msg)
+
+            scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+            return asyncio.create_task(middleware(scope, receive, send))
+
+        # sin checkout en curso: el lugar se libera apenas sale la respuesta
+        enviados: list[dict] = []
+        await request("/admin/orders", enviados)
+        assert enviados[0]["status"] == 200
+        assert middleware.stats()["reporting_in_flight"] == 0
+
+        # con checkout en curso: ya respondió, pero el lugar sigue tomado (~0.05 s más)
+        checkout = request("/cart", [])
+        enviados = []
+        tarea = request("/admin/orders", enviados)
+        await asyncio.sleep(0.08)
+        assert enviados[0]["status"] == 200
+        assert middleware.stats()["reporting_in_flight"] == 1
+        # el checkout termina: el lugar se suelta sin esperar el resto
+        release.set()
+        await checkout
+        await asyncio.wait_for(tarea, 0.03)
+        assert middleware.stats()["reporting_in_flight"] == 0
+
+    asyncio.run(escenario())
@@ -0,0 +1,33 @@
+# tests/test_migrations.py
+import os
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+from backend.app.db import Base
+from backend.app.models import models  # noqa: F401
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_migraciones_llegan_al_esquema_de_los_modelos(tmp_path):
+    """upgrade head en una base vacía == create_all de los modelos; y downgrade vuelve."""
+    url = f"sqlite:///{tmp_path / 'migraciones.db'}"
+    cfg = Config()   # sin alembic.ini: no toca la config de logging de pytest
+    cfg.set_main_option("script_location", os.path.join(ROOT, "backend", "migrations"))
+    cfg.set_main_option("sqlalchemy.url", url)
+
+    command.upgrade(cfg, "head")
+    eng = create_engine(url)
+    with eng.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert diff == []
+
+    command.downgrade(cfg, "base")
+    with eng.connect() as conn:
+        tablas = conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").scalars().all()
+    assert tablas == ["alembic_version"]
+    eng.dispose()
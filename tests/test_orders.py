@@ -0,0 +1,180 @@
+# tests/test_orders.py
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.app.main import app
+from backend.app.db import SessionLocal, engine
+from backend.app.models.models import User, Product, Cart, CartItem, Order, OrderItem
+from backend.app.security.tokens import create_access_token
+
+client = TestClient(app)
+
+BUYER_EMAIL = "buyer_checkout@mktlab.com"
+
+
+def crear_comprador_y_productos(n: int = 3):
+    """Comprador + vendedor con n productos; devuelve (headers, product_ids)."""
+    db = SessionLocal()
+    try:
+        for email in (BUYER_EMAIL, "seller_checkout@mktlab.com"):
+            u = db.query(User).filter_by(email=email).first()
+            if u:
+                cart_ids = [c.id for c in db.query(Cart.id).filter(Cart.user_id == u.id)]
+                db.query(CartItem).filter(CartItem.cart_id.in_(cart_ids)).delete(synchronize_session=False)
+                db.query(Cart).filter(Cart.user_id == u.id).delete(synchronize_session=False)
+                db.query(Product).filter(Product.seller_id == u.id).delete(synchronize_session=False)
+                db.delete(u)
+        db.commit()
+
+        buyer = User(nombre="Com", apellido="Prador", tipo_doc="DNI", nro_doc="55550001",
+                     email=BUYER_EMAIL, tel="555", palabra_seg="gato",
+                     password_hash="x", acepta_terminos=True)
+        seller = User(nombre="Vende", apellido="Dor", tipo_doc="DNI", nro_doc="55550002",
+                      email="seller_checkout@mktlab.com", tel="555", palabra_seg="gato",
+                      password_hash="x", acepta_terminos=True)
+        db.add_all([buyer, seller])
+        db.flush()
+        products = [
+            Product(seller_id=seller.id, name=f"Producto checkout {i}", price=100 * (i + 1),
+                    stock=10, subcategory="Sub")
+            for i in range(n)
+        ]
+        db.add_all(products)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': buyer.id})}"}
+        return headers, [p.id for p in products]
+    finally:
+        db.close()
+
+
+def test_checkout_una_transaccion():
+    headers, product_ids = crear_comprador_y_productos(3)
+    for i, pid in enumerate(product_ids):
+        resp = client.post("/cart/items", json={"product_id": pid, "qty": i + 1}, headers=headers)
+        assert resp.status_code == 201, resp.text
+
+    escrituras, commits = [], []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            escrituras.append(statement)
+
+    def contar_commit(conn):
+        commits.append(1)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    event.listen(engine, "commit", contar_commit)
+    try:
+        resp = client.post("/orders/checkout", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+        event.remove(engine, "commit", contar_commit)
+    assert resp.status_code == 201, resp.text
+    # orden + ítems (multi-fila) + delete del carrito + evento del outbox, en un solo commit
+    assert len(escrituras) == 4, escrituras
+    assert len(commits) == 1
+    data = resp.json()
+    assert data["total"] == 100 * 1 + 200 * 2 + 300 * 3
+    assert sorted((it["product_id"], it["qty"]) for it in data["items"]) == sorted(
+        (pid, i + 1) for i, pid in enumerate(product_ids)
+    )
+
+    db = SessionLocal()
+    try:
+        order = db.get(Order, data["id"])
+        assert order.total_amount == 1400
+        assert order.user_name == "Com Prador"
+        items = db.query(OrderItem).filter_by(order_id=order.id).all()
+        assert {it.seller for it in items} == {"Vende"}
+        assert {it.subcategory for it in items} == {"Sub"}
+        # el carrito quedó vacío y el stock sigue descontado
+        assert client.get("/cart", headers=headers).json()["items"] == []
+        assert [db.get(Product, pid).stock for pid in product_ids] == [9, 8, 7]
+    finally:
+        db.close()
+
+    resp = client.post("/orders/checkout", headers=headers)
+    assert resp.status_code == 400
+
+
+def test_checkout_con_idempotency_key_no_duplica():
+    headers, product_ids = crear_comprador_y_productos(2)
+    for pid in product_ids:
+        client.post("/cart/items", json={"product_id": pid, "qty": 2}, headers=headers)
+
+    h = {**headers, "Idempotency-Key": "checkout-1"}
+    primera = client.post("/orders/checkout", headers=h)
+    assert primera.status_code == 201, primera.text
+    reintento = client.post("/orders/checkout", headers=h)
+    assert reintento.status_code == 201
+    assert reintento.json() == primera.json()
+    assert reintento.headers.get("Idempotent-Replayed") == "true"
+
+    # misma clave con otro body -> error; sin clave se ejecuta (carrito vacío)
+    otra = client.post("/orders/checkout", headers=h, json={"notes": "otra cosa"})
+    assert otra.status_code == 422
+    assert client.post("/orders/checkout", headers=headers).status_code == 400
+
+    db = SessionLocal()
+    try:
+        buyer_id = db.query(User.id).filter_by(email=BUYER_EMAIL).scalar()
+        assert db.query(Order).filter_by(user_id=buyer_id).count() == 1
+    finally:
+        db.close()
+
+
+def test_add_item_idempotente_concurrente():
+    """Dos requests simultáneos con la misma clave reservan stock una sola vez."""
+    import threading
+
+    headers, product_ids = crear_comprador_y_productos(1)
+    h = {**headers, "Idempotency-Key": "add-1"}
+    barrera = threading.Barrier(4)
+    respuestas = []
+
+    def agregar():
+        barrera.wait()
+        respuestas.append(client.post("/cart/items", json={"product_id": product_ids[0], "qty": 3}, headers=h))
+
+    hilos = [threading.Thread(target=agregar) for _ in range(4)]
+    for t in hilos:
+        t.start()
+    for t in hilos:
+        t.join()
+
+    assert [r.status_code for r in respuestas] == [201] * 4
+    assert len({r.text for r in respuestas}) == 1
+    db = SessionLocal()
+    try:
+        assert db.get(Product, product_ids[0]).stock == 7
+    finally:
+        db.close()
+
+
+def test_purga_de_claves_vencidas():
+    from datetime import datetime, timedelta
+    from backend.app.models.models import IdempotencyKey
+    from backend.app.workers import IdempotencyPurger
+
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(IdempotencyKey.user_id == "purga").delete()
+        vencida = datetime.utcnow() - timedelta(minutes=1)
+        db.add_all(
+            [IdempotencyKey(user_id="purga", key=f"k{i}", fingerprint="x", expires_at=vencida)
+             for i in range(5)]
+            + [IdempotencyKey(user_id="purga", key="viva", fingerprint="x",
+                              expires_at=datetime.utcnow() + timedelta(hours=1))]
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    assert IdempotencyPurger(interval=60, batch_size=2).run_once() >= 5
+
+    db = SessionLocal()
+    try:
+        keys = [k for (k,) in db.query(IdempotencyKey.key).filter_by(user_id="purga")]
+        assert keys == ["viva"]
+    finally:
+        db.close()
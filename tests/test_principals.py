@@ -0,0 +1,82 @@
+# tests/test_principals.py
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend.app.crud.user_crud import assign_roles, seed_roles
+from backend.app.db import SessionLocal, engine
+from backend.app.main import app
+from backend.app.models.models import Product, User
+from backend.app.principals import principal_cache
+from backend.app.security.tokens import create_access_token, create_token_pair
+
+client = TestClient(app)
+
+EMAIL = "principal_seller@mktlab.com"
+
+
+def crear_vendedor():
+    db = SessionLocal()
+    try:
+        seed_roles(db)
+        viejo = db.query(User).filter_by(email=EMAIL).first()
+        if viejo:
+            db.query(Product).filter(Product.seller_id == viejo.id).delete()
+            db.delete(viejo)
+            db.commit()
+        u = User(nombre="Prin", apellido="Cipal", tipo_doc="DNI", nro_doc="66630001", email=EMAIL,
+                 tel="555", palabra_seg="gato", password_hash="x", acepta_terminos=True)
+        db.add(u)
+        db.commit()
+        assign_roles(db, u.id, ["VENDEDOR"])
+        p = Product(seller_id=u.id, name="Producto principal", price=100, stock=1)
+        db.add(p)
+        db.commit()
+        return u.id, p.id
+    finally:
+        db.close()
+
+
+def contar_selects_de_users():
+    selects = []
+
+    def _antes(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            selects.append(statement)
+
+    return selects, _antes
+
+
+def test_principal_cacheado_e_invalidado_al_cambiar_roles_y_estado():
+    uid, pid = crear_vendedor()
+    principal_cache.clear()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': uid})}"}
+
+    assert client.get("/cart", headers=headers).status_code == 200
+    assert len(principal_cache) == 1
+
+    # con el principal en cache, GET /cart no toca la tabla users
+    selects, antes = contar_selects_de_users()
+    event.listen(engine, "before_cursor_execute", antes)
+    try:
+        assert client.get("/cart", headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", antes)
+    assert selects == []
+
+    # sin VENDEDOR ya no puede dar de baja su producto: la cache se invalidó
+    db = SessionLocal()
+    try:
+        assign_roles(db, uid, ["COMPRADOR"])
+    finally:
+        db.close()
+    assert len(principal_cache) == 0
+    assert client.delete(f"/products/{pid}", headers=headers).status_code == 403
+
+    admin = create_token_pair("admin-tests", ["ADMIN"], "ACTIVO")["access_token"]
+    r = client.patch(f"/admin/users/{uid}/estado", json={"estado": "REVISION"},
+                     headers={"Authorization": f"Bearer {admin}"})
+    assert r.status_code == 200, r.text
+    assert len(principal_cache) == 0
+    assert client.get("/cart", headers=headers).status_code == 200
+    token_id = next(iter(principal_cache._entries))
+    assert principal_cache.get(token_id).estado == "REVISION"
@@ -0,0 +1,278 @@
+# tests/test_products.py
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.db import SessionLocal
+from backend.app.models.models import User, Product
+from backend.app.security import hash_password
+
+client = TestClient(app)
+
+SELLER_EMAIL = "seller_paginacion@mktlab.com"
+
+
+def crear_vendedor_con_productos(n: int = 7):
+    """
+    Crea (o recrea) un vendedor con n productos activos.
+    Dos productos comparten created_at para probar el desempate por id.
+    """
+    db = SessionLocal()
+    try:
+        existing = db.query(User).filter_by(email=SELLER_EMAIL).first()
+        if existing:
+            db.query(Product).filter(Product.seller_id == existing.id).delete()
+            db.delete(existing)
+            db.commit()
+
+        seller = User(
+            nombre="Pagi",
+            apellido="Nación",
+            tipo_doc="DNI",
+            nro_doc="77777777",
+            email=SELLER_EMAIL,
+            tel="555",
+            palabra_seg="gato",
+            password_hash=hash_password("Pagi123!"),
+            acepta_terminos=True,
+        )
+        db.add(seller)
+        db.flush()
+
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(n):
+            created = base if i in (2, 3) else base + timedelta(minutes=i)
+            db.add(Product(
+                seller_id=seller.id,
+                name=f"Producto paginado {i}",
+                price=1000 + i,
+                stock=10,
+                created_at=created,
+            ))
+        db.commit()
+        return seller.id
+    finally:
+        db.close()
+
+
+def test_list_products_cursor_recorre_todo_sin_repetir():
+    seller_id = crear_vendedor_con_productos(7)
+
+    # referencia: una sola página grande por offset
+    ref = client.get("/products", params={"seller_id": seller_id, "limit": 50})
+    assert ref.status_code == 200
+    esperados = [p["id"] for p in ref.json()]
+    assert len(esperados) == 7
+
+    vistos = []
+    params = {"seller_id": seller_id, "limit": 3}
+    for _ in range(10):
+        resp = client.get("/products", params=params)
+        assert resp.status_code == 200, resp.text
+        vistos.extend(p["id"] for p in resp.json())
+        nxt = resp.headers.get("X-Next-Cursor")
+        if not nxt:
+            break
+        params = {"seller_id": seller_id, "limit": 3, "cursor": nxt}
+
+    assert vistos == esperados
+
+
+def test_list_products_cursor_invalido():
+    resp = client.get("/products", params={"cursor": "no-es-un-cursor"})
+    assert resp.status_code == 400
+
+
+def test_busqueda_por_prefijo_y_sin_tildes():
+    from backend.app.search import index_product
+
+    seller_id = crear_vendedor_con_productos(0)
+    db = SessionLocal()
+    try:
+        p1 = Product(seller_id=seller_id, name="Zapatillas Runner Xbusq",
+                     description="Calzado liviano", subcategory="Calzado", price=1, stock=1)
+        p2 = Product(seller_id=seller_id, name="Campera Xbusq",
+                     description="Abrigo para zapatillas de trekking", subcategory="Abrigos",
+                     price=1, stock=1)
+        db.add_all([p1, p2])
+        db.commit()
+        for p in (p1, p2):
+            index_product(db, p)
+        db.commit()
+        ids = (p1.id, p2.id)
+    finally:
+        db.close()
+
+    # prefijo + AND: "zapat xbus" matchea ambos, pero el que lo tiene en el nombre va primero
+    resp = client.get("/products", params={"q": "zapat xbus", "seller_id": seller_id})
+    assert resp.status_code == 200, resp.text
+    assert [p["id"] for p in resp.json()] == list(ids)
+
+    # sin tildes / mayúsculas
+    resp = client.get("/products", params={"q": "CAMPÉRA", "seller_id": seller_id})
+    assert [p["id"] for p in resp.json()] == [ids[1]]
+
+    resp = client.get("/products", params={"q": "inexistentexyz"})
+    assert resp.json() == []
+
+
+def test_busqueda_filtra_y_pagina_dentro_del_indice():
+    from backend.app.search import index_product
+
+    seller_id = crear_vendedor_con_productos(0)
+    db = SessionLocal()
+    try:
+        prods = [Product(seller_id=seller_id, name=f"Linterna Ypagin {i}", description="ypagin " * i,
+                         price=1, stock=1) for i in range(1, 4)]
+        db.add_all(prods)
+        db.commit()
+        for p in prods:
+            index_product(db, p)
+        db.commit()
+    finally:
+        db.close()
+
+    todos = client.get("/products", params={"q": "ypagin", "seller_id": seller_id}).json()
+    assert len(todos) == 3
+    paginas = [client.get("/products", params={"q": "ypagin", "seller_id": seller_id,
+                                               "limit": 1, "offset": i}).json() for i in range(4)]
+    assert [p["id"] for pagina in paginas for p in pagina] == [p["id"] for p in todos]
+    assert client.get("/products", params={"q": "ypagin", "seller_id": "otro"}).json() == []
+
+
+def test_indice_en_memoria_ve_cambios_de_otros_procesos(monkeypatch):
+    from backend.app.search import memory_index
+    from backend.app.search.memory_index import MemoryProductIndex
+
+    seller_id = crear_vendedor_con_productos(0)
+    idx = MemoryProductIndex()
+    db = SessionLocal()
+    try:
+        idx.rebuild(db)
+        assert idx.search(db, "zotroproc", 10) == []
+
+        # alta hecha "en otro worker": no pasa por idx.upsert
+        p = Product(seller_id=seller_id, name="Mate Zotroproc", price=1, stock=1)
+        db.add(p)
+        db.commit()
+        monkeypatch.setattr(memory_index, "SEARCH_MEMORY_SYNC_SECONDS", 0)
+        assert [pid for pid, _ in idx.search(db, "zotroproc", 10, seller_id=seller_id)] == [p.id]
+
+        p.is_active = False
+        db.commit()
+        assert idx.search(db, "zotroproc", 10) == []
+    finally:
+        db.close()
+
+
+def test_indice_en_memoria_bm25_y_bajas():
+    from types import SimpleNamespace
+    from backend.app.search.memory_index import MemoryProductIndex
+
+    idx = MemoryProductIndex()
+    idx._loaded = True  # sin base: lo llenamos a mano
+
+    def prod(pid, name, description=None, active=True):
+        return SimpleNamespace(id=pid, name=name, description=description,
+                               features=None, subcategory=None, is_active=active)
+
+    idx.upsert(None, prod("a", "Mouse Gamer RGB"))
+    idx.upsert(None, prod("b", "Teclado", "compatible con mouse"))
+    idx.upsert(None, prod("c", "Monitor"))
+
+    hits = idx.search(None, "mou", 10)
+    assert [pid for pid, _ in hits] == ["a", "b"]
+
+    idx.upsert(None, prod("a", "Mouse Gamer RGB", active=False))
+    assert [pid for pid, _ in idx.search(None, "mouse", 10)] == ["b"]
+
+    idx.remove(None, "b")
+    assert idx.search(None, "mouse", 10) == []
+
+
+def test_indice_en_memoria_prefijo_corto_no_pierde_resultados(monkeypatch):
+    from types import SimpleNamespace
+    from backend.app.search import memory_index
+    from backend.app.search.memory_index import MemoryProductIndex
+
+    idx = MemoryProductIndex()
+    idx._loaded = True
+
+    # 100 términos distintos con "m": más que MAX_PREFIX_EXPANSIONS
+    for i in range(100):
+        idx.upsert(None, SimpleNamespace(id=f"p{i:03d}", name=f"m{i:03d}x", description="rojo" if i % 3 else "azul",
+                                         features=None, subcategory=None, is_active=True))
+    todos = idx.search(None, "m", 200)
+    assert len(todos) == 100
+    rojos = idx.search(None, "rojo m", 200)
+    assert len(rojos) == 66
+
+    # escaneando candidatos da lo mismo (y con el mismo puntaje) que expandir todo
+    monkeypatch.setattr(memory_index, "MAX_PREFIX_EXPANSIONS", 10_000)
+    assert idx.search(None, "rojo m", 200) == rojos
+
+
+def test_listado_sin_n_mas_1():
+    """
+    Listar N productos (con imágenes y vendedor) tiene que costar una cantidad
+    fija de SELECTs: productos+vendedor y una tanda de imágenes.
+    """
+    from sqlalchemy import event
+    from backend.app.db import engine
+    from backend.app.models.models import ProductImage
+
+    seller_id = crear_vendedor_con_productos(25)
+    db = SessionLocal()
+    try:
+        for p in db.query(Product).filter(Product.seller_id == seller_id):
+            db.add_all([
+                ProductImage(product_id=p.id, url=f"https://img/{p.id}/2", sort_order=2),
+                ProductImage(product_id=p.id, url=f"https://img/{p.id}/1", sort_order=1),
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+    statements = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        resp = client.get("/products", params={"seller_id": seller_id, "limit": 25})
+        detalle = resp.json()[0]["id"]
+        n_listado = len(statements)
+        client.get(f"/products/{detalle}")
+        n_detalle = len(statements) - n_listado
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    data = resp.json()
+    assert len(data) == 25
+    assert data[0]["seller_name"] == "Pagi Nación"
+    assert [im["sort_order"] for im in data[0]["images"]] == [1, 2]
+    assert n_listado <= 2, statements
+    assert n_detalle <= 2, statements[n_listado:]
+
+
+def test_serializacion_rapida_igual_a_product_out():
+    """La salida armada desde tuplas tiene que coincidir con ProductOut."""
+    from backend.app.schemas.product_schemas import ProductOut
+
+    seller_id = crear_vendedor_con_productos(3)
+    resp = client.get("/products", params={"seller_id": seller_id, "limit": 10})
+    assert resp.status_code == 200
+
+    db = SessionLocal()
+    try:
+        for item in resp.json():
+            p = db.get(Product, item["id"])
+            esperado = ProductOut.model_validate(p)
+            esperado.seller_name = f"{p.seller.nombre} {p.seller.apellido}"
+            assert item == esperado.model_dump(mode="json")
+            assert client.get(f"/products/{p.id}").json() == item
+    finally:
+        db.close()
@@ -0,0 +1,95 @@
+# tests/test_query_plans.py
+"""
+Snapshot de planes (EXPLAIN QUERY PLAN de SQLite) de las consultas calientes.
+
+Cada consulta tiene que usar el índice esperado y no degradar a un SCAN de
+la tabla completa ni ordenar en un B-tree temporal. Si un cambio de modelo o
+de consulta rompe alguno, este test lo marca antes que la latencia.
+"""
+import re
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.app.db import engine
+from backend.app.models.models import Cart, CartItem, Order, OrderItem, Payment, ProductComment
+from backend.app.routers.routes_admin import _orders_stmt, _users_stmt
+from backend.app.routers.routes_sales import _base, _filters
+
+AHORA = datetime(2024, 6, 1)
+
+
+def plan(stmt) -> list[str]:
+    compiled = stmt.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params)]
+
+
+CONSULTAS = {
+    # admin de usuarios
+    "usuarios_por_estado_nuevos": (_users_stmt("REVISION", True, 7), ["ix_users_estado_creado_en"], False),
+    "usuarios_por_estado": (_users_stmt("BLOQUEADO", False, 7), ["ix_users_estado_creado_en"], False),
+    "usuarios_nuevos": (_users_stmt(None, True, 7), ["ix_users_creado_en"], False),
+    # admin de órdenes: rango + último pago por orden
+    "ordenes_admin": (
+        _orders_stmt(AHORA, AHORA).limit(50),
+        ["ix_orders_created_id", "ix_payments_order_created_id"],
+        False,
+    ),
+    # carrito vigente (cart_crud._get_or_create_cart / order_crud.checkout)
+    "carrito_vigente": (
+        select(Cart.id).where(Cart.user_id == "u").order_by(Cart.created_at.desc()).limit(1),
+        ["ix_carts_user_created"],
+        False,
+    ),
+    "items_de_orden": (select(OrderItem.id).where(OrderItem.order_id == "o"), ["ix_order_items_order_id"], False),
+    "comentarios_de_producto": (
+        select(ProductComment.id)
+        .where(ProductComment.product_id == "p")
+        .order_by(ProductComment.created_at.desc()),
+        ["ix_product_comments_product_created"],
+        False,
+    ),
+    # sweeper de reservas (índice parcial)
+    "reservas_vencidas": (
+        select(CartItem.id)
+        .where(CartItem.reserved_until.is_not(None), CartItem.reserved_until < AHORA)
+        .order_by(CartItem.reserved_until)
+        .limit(500),
+        ["ix_cart_items_reserved"],
+        False,
+    ),
+    # analytics: pagos del rango
+    "pagos_del_rango": (
+        select(Payment.provider, Payment.status, func.count())
+        .where(Payment.created_at >= AHORA, Payment.created_at < AHORA)
+        .group_by(Payment.provider, Payment.status),
+        ["ix_payments_created_at"],
+        False,
+    ),
+    # historial de ventas del vendedor (el orden final sí necesita sort)
+    "historial_de_ventas": (
+        _base(OrderItem.id)
+        .where(*_filters("s", date(2024, 1, 1), date(2024, 1, 31), None, None))
+        .order_by(Order.created_at.desc(), OrderItem.id.desc())
+        .limit(50),
+        ["ix_products_seller_id", "ix_order_items_product_id"],
+        True,
+    ),
+}
+
+
+@pytest.mark.parametrize("nombre", list(CONSULTAS))
+def test_plan_usa_indices(nombre):
+    stmt, indices, permite_sort = CONSULTAS[nombre]
+    detalle = plan(stmt)
+    texto = "\n".join(detalle)
+
+    for linea in detalle:
+        assert not re.fullmatch(r"SCAN \w+", linea), f"{nombre}: full scan\n{texto}"
+    for indice in indices:
+        assert re.search(rf"USING (COVERING )?INDEX {indice}\b", texto), f"{nombre}: no usa {indice}\n{texto}"
+    if not permite_sort:
+        assert "TEMP B-TREE FOR ORDER BY" not in texto, f"{nombre}: ordena sin índice\n{texto}"
@@ -0,0 +1,120 @@
+# tests/test_ratelimit.py
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.ratelimit import RATE_RULES, ConcurrencyLimit, RateLimitMiddleware, RateRule, TokenBucketStore
+from backend.app.security.revocation import revocations
+from backend.app.security.tokens import create_token_pair
+
+
+def test_token_bucket_recarga_y_evicta_sin_perder_limites():
+    store = TokenBucketStore(per_minute=60, burst=2, capacity=2)
+    assert store.take("a", now=0) == 0
+    assert store.take("a", now=0) == 0
+    assert store.take("a", now=0) == 1.0  # 1 token por segundo
+    assert store.take("a", now=1) == 0
+
+    # lleno: se liberan los baldes que ya se recargaron (equivalen a uno nuevo)
+    assert store.take("b", now=1) == 0
+    assert store.take("b", now=1) == 0
+    assert store.take("c", now=1.5) == 0
+    assert set(store._slots) == {"b", "c"}
+    assert store.take("b", now=1.5) > 0  # "b" siguió sin tokens: no se perdió su estado
+
+
+def crear_app():
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    def login():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=[
+            RateRule("login", frozenset({"POST"}), "/auth/login", 60, 2, by_ip=True),
+            RateRule("default", frozenset(), "/", 60, 1),
+        ],
+        concurrency=[],
+    )
+    return app
+
+
+def test_login_limitado_por_ip_y_default_por_usuario():
+    client = TestClient(crear_app())
+    assert [client.post("/auth/login").status_code for _ in range(3)] == [200, 200, 429]
+    r = client.post("/auth/login")
+    assert r.status_code == 429 and int(r.headers["Retry-After"]) >= 1
+    assert all(client.get("/health").status_code == 200 for _ in range(5))  # exento
+
+    # la regla default va por usuario: cada uno tiene su balde
+    for uid in ("u1", "u2"):
+        token = create_token_pair(uid, [], "ACTIVO")["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/nada", headers=headers).status_code == 404
+        assert client.get("/nada", headers=headers).status_code == 429
+
+
+def test_analytics_con_un_request_en_curso_rechaza_el_segundo():
+    async def escenario():
+        release = asyncio.Event()
+
+        async def analytics(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        middleware = RateLimitMiddleware(analytics, rules=[],
+                                         concurrency=[ConcurrencyLimit("analytics", ("/analytics",), 1)])
+        enviados: list[list[dict]] = [[], []]
+
+        def request(i):
+            scope = {"type": "http", "method": "GET", "path": "/analytics/global", "headers": [],
+                     "client": ("1.2.3.4", 1)}
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(msg):
+                enviados[i].append(msg)
+
+            return middleware(scope, receive, send)
+
+        primero = asyncio.create_task(request(0))
+        await asyncio.sleep(0.05)
+        await request(1)
+        assert enviados[1][0]["status"] == 503
+        assert middleware.stats()["analytics_in_flight"] == 1
+        release.set()
+        await primero
+        assert enviados[0][0]["status"] == 200
+        assert middleware.stats()["analytics_in_flight"] == 0
+
+    asyncio.run(escenario())
+
+
+def test_alta_de_usuario_no_comparte_balde_con_subrutas():
+    registro = next(r for r in RATE_RULES if r.name == "register")
+    assert registro.matches("POST", "/users")
+    assert not registro.matches("POST", "/users/u1/kyc")
+    assert not registro.matches("POST", "/users/seed-roles")
+
+
+def test_clave_por_usuario_sin_consultar_revocaciones(monkeypatch):
+    def sin_base(_claims):
+        raise AssertionError("la clave del rate limit no tiene que ir a la base")
+
+    monkeypatch.setattr(revocations, "is_revoked", sin_base)
+    regla = RateRule("default", frozenset(), "/", 60, 1)
+    token = create_token_pair("u-clave", [], "ACTIVO")["access_token"]
+    scope = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("1.2.3.4", 1)}
+    assert RateLimitMiddleware._client_key(scope, regla) == "user:u-clave"
+
+    scope["headers"] = [(b"authorization", b"Bearer no-es-un-jwt")]
+    assert RateLimitMiddleware._client_key(scope, regla) == "ip:1.2.3.4"
@@ -0,0 +1,66 @@
+# tests/test_replica.py
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import db as database
+from backend.app.db import SessionLocal, make_engine
+from backend.app.main import app
+from backend.app.models.models import Product, User
+from backend.app.replica import recent_writers
+from backend.app.security.tokens import create_access_token
+from backend.app.workers.replica import copy_sqlite, sqlite_path
+
+client = TestClient(app)
+
+
+def _usuario(db, email: str, doc: str) -> User:
+    viejo = db.query(User).filter_by(email=email).first()
+    if viejo:
+        db.query(Product).filter(Product.seller_id == viejo.id).delete()
+        db.delete(viejo)
+        db.commit()
+    u = User(nombre="Rep", apellido="Lica", tipo_doc="DNI", nro_doc=doc, email=email, tel="555",
+             palabra_seg="gato", password_hash="x", acepta_terminos=True)
+    db.add(u)
+    db.flush()
+    return u
+
+
+def test_lecturas_van_a_la_replica_salvo_despues_de_escribir(tmp_path, monkeypatch):
+    primario = sqlite_path(os.environ["DATABASE_URL"])
+    replica = str(tmp_path / "replica.db")
+    copy_sqlite(primario, replica)
+    replica_engine = make_engine(f"sqlite:///{replica}")
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica_engine, autoflush=False))
+    recent_writers.clear()
+
+    # producto nuevo en el primario: la réplica todavía no lo tiene
+    db = SessionLocal()
+    try:
+        seller = _usuario(db, "replica_seller@mktlab.com", "66610001")
+        comprador = _usuario(db, "replica_buyer@mktlab.com", "66610002")
+        p = Product(seller_id=seller.id, name="Producto réplica", price=100, stock=5)
+        db.add(p)
+        db.commit()
+        pid, buyer_id = p.id, comprador.id
+    finally:
+        db.close()
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': buyer_id})}"}
+
+    assert client.get(f"/products/{pid}").status_code == 404
+    assert client.get(f"/products/{pid}", headers=auth).status_code == 404
+
+    # el comprador escribe (agrega al carrito): sus lecturas pasan al primario
+    r = client.post("/cart/items", json={"product_id": pid, "qty": 1}, headers=auth)
+    assert r.status_code == 201, r.text
+    assert recent_writers.is_recent(buyer_id)
+    assert client.get(f"/products/{pid}", headers=auth).status_code == 200
+    assert client.get(f"/products/{pid}").status_code == 404
+
+    # con la réplica al día, todos lo ven
+    copy_sqlite(primario, replica)
+    assert client.get(f"/products/{pid}").status_code == 200
+    replica_engine.dispose()
+    recent_writers.clear()
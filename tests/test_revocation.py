@@ -0,0 +1,168 @@
+# tests/test_revocation.py
+import math
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from backend.app import security
+from backend.app.db import SessionLocal
+from backend.app.main import app
+from backend.app.models.models import RevokedToken, User
+from backend.app.security import hash_password
+from backend.app.security.revocation import BloomFilter, RevocationList, revocations, user_key
+from backend.app.security.tokens import create_token_pair
+
+client = TestClient(app)
+
+EMAIL = "revocacion@mktlab.com"
+
+
+def crear_usuario() -> str:
+    db = SessionLocal()
+    try:
+        viejo = db.query(User).filter_by(email=EMAIL).first()
+        if viejo:
+            db.delete(viejo)
+            db.commit()
+        u = User(nombre="Revo", apellido="Cado", tipo_doc="DNI", nro_doc="66640001", email=EMAIL, tel="555",
+                 palabra_seg="gato", password_hash=hash_password("Revo123!"), acepta_terminos=True)
+        db.add(u)
+        db.commit()
+        return u.id
+    finally:
+        db.close()
+
+
+def login() -> dict:
+    r = client.post("/auth/login", json={"email": EMAIL, "password": "Revo123!"})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_bloom_sin_falsos_negativos():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    falsos = sum(f"otro-{i}" in bloom for i in range(10_000))
+    assert falsos < 300  # ~1 % esperado
+
+
+def test_token_verificado_se_cachea(monkeypatch):
+    crear_usuario()
+    headers = bearer(login()["access_token"])
+    assert client.get("/cart", headers=headers).status_code == 200
+
+    llamadas = []
+    monkeypatch.setattr(security, "decode_token", lambda t: llamadas.append(t))
+    assert client.get("/cart", headers=headers).status_code == 200
+    assert llamadas == []
+
+
+def test_logout_revoca_access_y_refresh():
+    crear_usuario()
+    sesion = login()
+    otra = login()
+    assert client.get("/cart", headers=bearer(sesion["access_token"])).status_code == 200
+
+    r = client.post("/auth/logout", json={"refresh_token": sesion["refresh_token"]},
+                    headers=bearer(sesion["access_token"]))
+    assert r.status_code == 204, r.text
+
+    r = client.get("/cart", headers=bearer(sesion["access_token"]))
+    assert r.status_code == 401 and r.json()["detail"] == "Token revocado"
+    assert client.post("/auth/refresh", json={"refresh_token": sesion["refresh_token"]}).status_code == 401
+    # la otra sesión sigue andando
+    assert client.get("/cart", headers=bearer(otra["access_token"])).status_code == 200
+
+
+def test_refresh_rota_y_bloqueo_revoca_todo():
+    uid = crear_usuario()
+    sesion = login()
+    nuevo = client.post("/auth/refresh", json={"refresh_token": sesion["refresh_token"]})
+    assert nuevo.status_code == 200
+    # el refresh usado no sirve dos veces
+    assert client.post("/auth/refresh", json={"refresh_token": sesion["refresh_token"]}).status_code == 401
+
+    assert client.get("/cart", headers=bearer(nuevo.json()["access_token"])).status_code == 200
+
+    admin = create_token_pair("admin-tests", ["ADMIN"], "ACTIVO")["access_token"]
+    r = client.patch(f"/admin/users/{uid}/estado", json={"estado": "BLOQUEADO"}, headers=bearer(admin))
+    assert r.status_code == 200, r.text
+
+    # aunque el token esté en token_cache: la revocación nueva fuerza el chequeo
+    assert client.get("/cart", headers=bearer(nuevo.json()["access_token"])).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": nuevo.json()["refresh_token"]}).status_code == 401
+    # y no puede volver a entrar
+    r = client.post("/auth/login", json={"email": EMAIL, "password": "Revo123!"})
+    assert r.status_code == 403 and r.json()["detail"] == "Usuario bloqueado"
+
+
+def test_token_emitido_en_el_mismo_segundo_despues_del_bloqueo_vale():
+    uid = crear_usuario()
+    db = SessionLocal()
+    try:
+        revocations.revoke_user(db, uid)
+        db.commit()
+        revoked_at = db.get(RevokedToken, user_key(uid)).revoked_at.replace(tzinfo=timezone.utc).timestamp()
+    finally:
+        db.close()
+
+    # login enseguida (como tras un desbloqueo): el token nuevo no cae en la revocación
+    sesion = login()
+    claims = security.decode_token(sesion["access_token"])
+    assert claims["iat"] >= revoked_at
+    assert client.get("/cart", headers=bearer(sesion["access_token"])).status_code == 200
+
+    # mismo segundo entero que la revocación: decide el orden, no el segundo
+    mismo_segundo = math.floor(revoked_at)
+    base = {"jti": "mismo-segundo", "sub": uid}
+    assert not revocations.is_revoked({**base, "iat": revoked_at + 1e-4})
+    assert revocations.is_revoked({**base, "iat": revoked_at - 1e-4})
+    # tokens viejos con iat entero del mismo segundo: cuentan como anteriores
+    assert revocations.is_revoked({**base, "iat": mismo_segundo})
+    # sin iat: se deduce de exp (no quedan todos revocados)
+    vence = int(revoked_at) + 3600
+    assert not revocations.is_revoked({**base, "exp": vence, "typ": "access"})
+    assert revocations.is_revoked({**base, "exp": int(revoked_at) + 60, "typ": "access"})
+
+
+def test_revocacion_entra_al_filtro_recien_al_commitear():
+    vence = datetime.utcnow() + timedelta(hours=1)
+    db = SessionLocal()
+    try:
+        revocations.revoke(db, "jti-rollback", vence)
+        version = revocations.version
+        db.rollback()
+        assert revocations.version == version and "jti-rollback" not in revocations.bloom
+
+        revocations.revoke(db, "jti-commit", vence)
+        db.flush()
+        # todavía sin commit: otro request no tiene que ir a buscarla a la tabla
+        assert revocations.version == version and "jti-commit" not in revocations.bloom
+        db.commit()
+        assert revocations.version == version + 1 and "jti-commit" in revocations.bloom
+    finally:
+        db.close()
+
+
+def test_load_no_pierde_revocaciones_publicadas_durante_el_select():
+    lista = RevocationList()
+    db = SessionLocal()
+    execute = db.execute
+
+    def execute_con_revocacion_en_el_medio(*args, **kwargs):
+        result = execute(*args, **kwargs)
+        lista.publish(["jti-tardio"])  # commiteada después de que arrancó el SELECT
+        return result
+
+    db.execute = execute_con_revocacion_en_el_medio
+    try:
+        lista.load(db)
+    finally:
+        db.close()
+    assert "jti-tardio" in lista.bloom
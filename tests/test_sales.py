@@ -0,0 +1,131 @@
+# tests/test_sales.py
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.db import SessionLocal
+from backend.app.models.models import Order, OrderItem, Product, User
+from backend.app.security.tokens import create_access_token
+
+client = TestClient(app)
+
+HOY = date.today()
+
+
+def crear_ventas():
+    """
+    Vendedor con 2 productos y 6 órdenes en los últimos días, más una venta
+    de otro vendedor (no tiene que aparecer).
+    """
+    db = SessionLocal()
+    try:
+        for email in ("hist_seller@mktlab.com", "hist_otro@mktlab.com"):
+            viejo = db.query(User).filter_by(email=email).first()
+            if viejo:
+                db.query(Product).filter(Product.seller_id == viejo.id).delete()
+                db.delete(viejo)
+        ids = [o.id for o in db.query(Order.id).filter(Order.id.like("hist-%"))]
+        db.query(OrderItem).filter(OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+        seller, otro = (
+            User(nombre=n, apellido="Hist", tipo_doc="DNI", nro_doc=doc, email=email, tel="555",
+                 palabra_seg="gato", password_hash="x", acepta_terminos=True)
+            for n, doc, email in (("Sel", "22220001", "hist_seller@mktlab.com"),
+                                  ("Otro", "22220002", "hist_otro@mktlab.com"))
+        )
+        db.add_all([seller, otro])
+        db.flush()
+        mate = Product(seller_id=seller.id, name="Mate imperial", price=100, stock=5, rating=9)
+        yerba = Product(seller_id=seller.id, name="Yerba", price=10, stock=5, rating=7)
+        ajeno = Product(seller_id=otro.id, name="Mate ajeno", price=999, stock=5)
+        db.add_all([mate, yerba, ajeno])
+        db.flush()
+
+        ayer = datetime.combine(HOY, datetime.min.time()) - timedelta(hours=12)
+        ordenes = [
+            # (id, cliente, estado, hace_dias, [(producto, cat, qty)])
+            ("hist-1", "Ana Pérez", "Entregado", 0, [(mate, "Mates", 1), (yerba, None, 3)]),
+            ("hist-2", "Beto Gómez", "En camino", 1, [(mate, "Mates", 2)]),
+            ("hist-3", "Ana Pérez", "Pendiente", 1, [(yerba, None, 1)]),
+            ("hist-4", "Carla 100%", "Entregado", 2, [(mate, "Mates", 1)]),
+            ("hist-5", "Dani", "Entregado", 3, [(yerba, None, 2)]),
+            ("hist-6", "Viejo", "Entregado", 60, [(mate, "Mates", 1)]),
+            ("hist-7", "Ana Pérez", "Entregado", 0, [(ajeno, "Mates", 1)]),
+        ]
+        for oid, cliente, estado, dias, lineas in ordenes:
+            db.add(Order(id=oid, user_name=cliente, status=estado,
+                         created_at=ayer - timedelta(days=dias), total_amount=0))
+            db.flush()
+            db.add_all(
+                OrderItem(order_id=oid, product_id=p.id, product_name=p.name, category=cat,
+                          quantity=q, unit_price=p.price)
+                for p, cat, q in lineas
+            )
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': seller.id})}"}
+    finally:
+        db.close()
+
+
+def test_historial_filtros_y_paginacion():
+    headers = crear_ventas()
+    rango = {"start": (HOY - timedelta(days=7)).isoformat(), "end": HOY.isoformat()}
+
+    resp = client.get("/sales/history", params=rango, headers=headers)
+    assert resp.status_code == 200, resp.text
+    todas = resp.json()
+    assert {(v["order_id"], v["product_name"]) for v in todas[:2]} == {
+        ("hist-1", "Mate imperial"), ("hist-1", "Yerba"),
+    }
+    assert len(todas) == 6  # ni la venta vieja ni la del otro vendedor
+    assert todas[0]["status"] == "DELIVERED" and todas[0]["date"]
+
+    # cursor: páginas de 2 sin repetir ni saltear
+    vistos, params = [], {**rango, "limit": 2}
+    while True:
+        resp = client.get("/sales/history", params=params, headers=headers)
+        vistos += [v["id"] for v in resp.json()]
+        nxt = resp.headers.get("X-Next-Cursor")
+        if not nxt:
+            break
+        params = {**rango, "limit": 2, "cursor": nxt}
+    assert vistos == [v["id"] for v in todas]
+
+    enviadas = client.get("/sales/history", params={**rango, "status": "SHIPPED"}, headers=headers).json()
+    assert [v["order_id"] for v in enviadas] == ["hist-2"]
+
+    # búsqueda por producto, cliente y nro. de orden; el % es literal
+    buscar = lambda q: {v["order_id"] for v in client.get(
+        "/sales/history", params={**rango, "search": q}, headers=headers).json()}
+    assert buscar("imperial") == {"hist-1", "hist-2", "hist-4"}
+    assert buscar("ana pér") == {"hist-1", "hist-3"}
+    assert buscar("hist-5") == {"hist-5"}
+    assert buscar("100%") == {"hist-4"}
+
+    assert client.get("/sales/history", params=rango).status_code == 401
+    assert client.get("/sales/history", params={"start": "2024-02-02", "end": "2024-01-01"},
+                      headers=headers).status_code == 400
+
+
+def test_historial_agregado_en_sql():
+    headers = crear_ventas()
+    rango = {"start": (HOY - timedelta(days=7)).isoformat(), "end": HOY.isoformat()}
+
+    data = client.get("/sales/history", params={**rango, "aggregate": "all"}, headers=headers).json()
+    assert data["summary"] == {
+        "sales": 6, "orders": 5, "units": 10, "revenue": 460, "avg_product_rating": 8.0,
+    }
+    assert data["by_category"] == [
+        {"category": "Mates", "sales": 3, "units": 4, "revenue": 400},
+        {"category": "Sin categoría", "sales": 3, "units": 6, "revenue": 60},
+    ]
+    assert sum(d["revenue"] for d in data["by_day"]) == 460
+    assert [d["date"] for d in data["by_day"]] == sorted(d["date"] for d in data["by_day"])
+
+    solo = client.get("/sales/history", params={**rango, "aggregate": "category", "status": "DELIVERED"},
+                      headers=headers).json()
+    assert list(solo) == ["by_category"]
+    assert solo["by_category"][0] == {"category": "Mates", "sales": 2, "units": 2, "revenue": 200}